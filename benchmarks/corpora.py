@@ -0,0 +1,138 @@
+'''
+ * Reproducible corpora of broken JSON, one per repair category of the README.
+ *
+ * generate(category, size) returns a document of about size characters that
+ * needs the repairs of that category. The same category, size and seed give
+ * the same document.
+'''
+import json
+import random
+
+_words = ['alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf', 'hotel', 'india', 'juliett']
+
+
+def record(rand, index):
+    return {
+        'id': index,
+        'name': ' '.join(rand.choice(_words) for _ in range(rand.randrange(1, 4))),
+        'active': rand.random() < 0.5,
+        'score': round(rand.uniform(-1000, 1000), 3),
+        'tags': [rand.choice(_words) for _ in range(rand.randrange(0, 4))],
+        'parent': None if rand.random() < 0.3 else rand.randrange(index + 1),
+        'nested': {'level': rand.randrange(10), 'label': rand.choice(_words)},
+    }
+
+
+def records(rand, size, render, separator=',\n'):
+    '''
+     * Render records until the text has about size characters
+    '''
+    parts = []
+    total = 0
+    index = 0
+    while total < size:
+        part = render(record(rand, index))
+        parts.append(part)
+        total += len(part) + len(separator)
+        index += 1
+    return separator.join(parts)
+
+
+def dumps(value):
+    return json.dumps(value, ensure_ascii=False)
+
+
+def truncated(rand, size):
+    text = '[\n' + records(rand, size, dumps) + '\n]'
+    # // cut off in the middle of the last records
+    return text[0:max(1, len(text) - rand.randrange(1, 80))]
+
+
+def singleQuoted(rand, size):
+    return '[\n' + records(rand, size, lambda value: dumps(value).replace('"', "'")) + '\n]'
+
+
+def comments(rand, size):
+    def render(value):
+        return '/* record ' + str(value['id']) + ' */ ' + dumps(value)
+    return '[\n' + records(rand, size, render, ', // ' + rand.choice(_words) + '\n') + '\n]'
+
+
+def missingCommas(rand, size):
+    def render(value):
+        return dumps(value).replace(', "', ' "')
+    return '[\n' + records(rand, size, render, '\n') + '\n]'
+
+
+def pythonConstants(rand, size):
+    def render(value):
+        return dumps(value).replace('true', 'True').replace('false', 'False').replace('null', 'None')
+    return '[\n' + records(rand, size, render) + '\n]'
+
+
+def mongoTypes(rand, size):
+    def render(value):
+        return (dumps(value)[0:-1] + ', "count": NumberLong(' + str(rand.randrange(1 << 40)) + ')' +
+                ', "created": ISODate("2012-12-19T06:01:17.171Z")}')
+    return '[\n' + records(rand, size, render) + '\n]'
+
+
+def jsonp(rand, size):
+    return 'callback([\n' + records(rand, size, dumps) + '\n]);'
+
+
+def concatenatedStrings(rand, size):
+    def render(value):
+        name = dumps(value['name'])
+        return dumps(value).replace(name, name[0:-1] + '" +\n  "' + rand.choice(_words) + '"', 1)
+    return '[\n' + records(rand, size, render) + '\n]'
+
+
+def ndjson(rand, size):
+    return records(rand, size, dumps, '\n')
+
+
+def hugeStrings(rand, size):
+    # // strings with unescaped control characters, which need to be escaped
+    count = max(1, size // (1 << 20))
+    length = max(1, size // count - 20)
+    values = []
+    for index in range(count):
+        words = []
+        total = 0
+        while total < length:
+            word = rand.choice(_words) + rand.choice(' \t\n ')
+            words.append(word)
+            total += len(word)
+        values.append('"s' + str(index) + '": "' + ''.join(words)[0:length] + '"')
+    return '{' + ', '.join(values) + '}'
+
+
+def deepNesting(rand, size):
+    # // nested objects and arrays, truncated so all brackets need to be closed
+    parts = []
+    total = 0
+    while total < size:
+        part = '{"k": ' if rand.random() < 0.5 else '['
+        parts.append(part)
+        total += len(part)
+    return ''.join(parts) + '1'
+
+
+CATEGORIES = {
+    'truncated': truncated,
+    'single-quoted': singleQuoted,
+    'comments': comments,
+    'missing-commas': missingCommas,
+    'python-constants': pythonConstants,
+    'mongodb-types': mongoTypes,
+    'jsonp': jsonp,
+    'concatenated-strings': concatenatedStrings,
+    'ndjson': ndjson,
+    'huge-strings': hugeStrings,
+    'deep-nesting': deepNesting,
+}
+
+
+def generate(category, size, seed=0):
+    return CATEGORIES[category](random.Random(f'{category}/{size}/{seed}'), size)
@@ -0,0 +1,94 @@
+'''
+ * Adversarial benchmark of the string repair: documents full of stray quotes
+ * and comments after quotes, which made earlier versions take quadratic time.
+ *
+ * Run from the repository root:
+ *
+ *   python -m benchmarks.linearity                 # report the time per size and the growth
+ *   python -m benchmarks.linearity --check         # fail when a case grows faster than linear
+ *   python -m benchmarks.linearity --sizes 64KB,256KB,1MB,4MB --cases inner-quotes
+ *
+ * The growth is the exponent of the time as a function of the size, between
+ * the smallest and the largest size: 1.0 is linear, 2.0 quadratic.
+'''
+import argparse
+import math
+import sys
+
+from benchmarks.throughput import formatSize, measure, parseSize
+from ssm_jsonrepair import JsonRepair
+
+DEFAULT_SIZES = '16KB,64KB,256KB,1MB'
+
+# growth that --check accepts, linear plus room for the noise of the timings
+MAX_GROWTH = 1.25
+
+
+def repeat(prefix, part, size, suffix):
+    return prefix + part * max(1, (size - len(prefix) - len(suffix)) // len(part)) + suffix
+
+
+CASES = {
+    # // unescaped quotes inside a string, like in the text of a language model
+    'inner-quotes': lambda size: repeat('{"text": "', 'he said "hi" to ', size, '"}'),
+    'single-quoted-inner': lambda size: repeat("{'text': '", 'it\'s "so" ', size, "'}"),
+    # // quotes that are followed by a delimiter or preceded by one: end quotes or missing ones
+    'stray-quotes': lambda size: repeat('["a', 'b"c', size, ','),
+    'quote-delimiters': lambda size: repeat('[', '"a, ', size, ']'),
+    'truncated-strings': lambda size: repeat('[', '"a, b"c', size, ','),
+    # // comments after quote candidates, which have to be looked over
+    'quote-comments': lambda size: repeat('["a" ', '/*"/**/', size, 'x]'),
+    'nested-comments': lambda size: repeat('["a"', '/*"', size, '*/x]'),
+    'line-comments': lambda size: repeat('["a"', ' //"\n', size, 'x]'),
+}
+
+
+def growth(sizes, times):
+    return math.log(times[-1] / times[0]) / math.log(sizes[-1] / sizes[0])
+
+
+def run(cases, sizes, minTime=0.2, report=print):
+    '''
+     * Returns the growth of every case
+    '''
+    engine = JsonRepair(validateFirst=False)
+    results = {}
+    report(f'{"case":<22}' + ''.join(f'{formatSize(size):>10}' for size in sizes) + f'{"growth":>9}')
+    for case in cases:
+        times = [measure(engine.jsonrepair, CASES[case](size), minTime) for size in sizes]
+        results[case] = growth(sizes, times)
+        report(f'{case:<22}' + ''.join(f'{seconds * 1000:>8.1f}ms' for seconds in times) +
+               f'{results[case]:>9.2f}')
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.linearity')
+    parser.add_argument('--cases', default=','.join(CASES))
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='comma separated sizes, like 16KB,1MB')
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds to repeat every document')
+    parser.add_argument('--check', action='store_true', help='fail when a case grows faster than --max-growth')
+    parser.add_argument('--max-growth', type=float, default=MAX_GROWTH)
+    args = parser.parse_args(argv)
+
+    cases = [case.strip() for case in args.cases.split(',')]
+    for case in cases:
+        if case not in CASES:
+            parser.error(f'unknown case {case}, choose from {", ".join(CASES)}')
+    sizes = sorted(parseSize(size) for size in args.sizes.split(','))
+    if len(sizes) < 2:
+        parser.error('give at least two sizes')
+    results = run(cases, sizes, args.min_time)
+
+    if args.check:
+        superlinear = [case for case, value in results.items() if value > args.max_growth]
+        for case in superlinear:
+            print(f'SUPERLINEAR {case}: growth {results[case]:.2f}', file=sys.stderr)
+        if superlinear:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+'''
+ * Micro-benchmark of the character predicates in ssm_jsonrepair.stringutils.
+ *
+ * Compares the table driven predicates against the regex and comparison
+ * chain implementations they replaced. isDigit keeps its comparison chain:
+ * it is compared against a lookup in the character class table, which is
+ * not faster for it. Run from the repository root:
+ *
+ *   python -m benchmarks.predicates
+'''
+import re
+import timeit
+
+from ssm_jsonrepair import stringutils
+
+# // the implementations before the character class table
+_regexDelimiter = re.compile("^[,:[\\]/{}()\n+]$")
+_regexStartOfValue = re.compile(r'^[\[\{\w\-]$')
+
+
+def legacyIsDelimiter(char):
+    return _regexDelimiter.match(char)
+
+
+def legacyIsStartOfValue(char):
+    return _regexStartOfValue.match(char) or (char and legacyIsQuote(ord(char)))
+
+
+def legacyIsHex(code):
+    return (
+        ((code >= 0x30) and (code <= 0x39)) or
+        ((code >= 0x41) and (code <= 0x46)) or
+        ((code >= 0x61) and (code <= 0x66))
+    )
+
+
+def legacyIsWhitespace(code):
+    return (code == 0x20) or (code == 0x0a) or (code == 0x09) or (code == 0x0d)
+
+
+def legacyIsControlCharacter(code):
+    return (code == 0x0a) or (code == 0x0d) or (code == 0x09) or (code == 0x08) or (code == 0x0c)
+
+
+def legacyIsValidStringCharacter(code):
+    return (code >= 0x20) and (code <= 0x10ffff)
+
+
+def legacyIsDoubleQuoteLike(code):
+    return (code == 0x22) or (code == 0x201c) or (code == 0x201d)
+
+
+def legacyIsSingleQuoteLike(code):
+    return (code == 0x27) or (code == 0x2018) or (code == 0x2019) or (code == 0x60) or (code == 0xb4)
+
+
+def tableIsDigit(code):
+    return stringutils._codeClass(code, 0) & stringutils.classDigit
+
+
+def legacyIsQuote(code):
+    return (
+        (code == 0x22) or (code == 0x201c) or (code == 0x201d) or
+        (code == 0x27) or (code == 0x2018) or (code == 0x2019) or (code == 0x60) or (code == 0xb4)
+    )
+
+
+def legacyEndsWithCommaOrNewline(text):
+    regex = re.compile('[,\n][ \t\r]*$')
+    return regex.search(text)
+
+
+# // a mix of the characters that the parser inspects most often
+SAMPLE = '{"key": [1, 2.5, -3e4], \'other\': null, “q”: true}\n  abc_def\t'
+SAMPLE_CODES = [ord(char) for char in SAMPLE]
+
+# name, the implementation it is compared with, the one of stringutils, argument kind
+PREDICATES = [
+    ('isDelimiter', legacyIsDelimiter, stringutils.isDelimiter, 'char'),
+    ('isStartOfValue', legacyIsStartOfValue, stringutils.isStartOfValue, 'char'),
+    ('isHex', legacyIsHex, stringutils.isHex, 'code'),
+    ('isDigit', tableIsDigit, stringutils.isDigit, 'code'),
+    ('isValidStringCharacter', legacyIsValidStringCharacter, stringutils.isValidStringCharacter, 'code'),
+    ('isWhitespace', legacyIsWhitespace, stringutils.isWhitespace, 'code'),
+    ('isControlCharacter', legacyIsControlCharacter, stringutils.isControlCharacter, 'code'),
+    ('isQuote', legacyIsQuote, stringutils.isQuote, 'code'),
+    ('isDoubleQuoteLike', legacyIsDoubleQuoteLike, stringutils.isDoubleQuoteLike, 'code'),
+    ('isSingleQuoteLike', legacyIsSingleQuoteLike, stringutils.isSingleQuoteLike, 'code'),
+]
+
+
+def checkEquivalence():
+    for name, compared, used, kind in PREDICATES:
+        for code in range(0x3100):
+            arg = chr(code) if kind == 'char' else code
+            if bool(compared(arg)) != bool(used(arg)):
+                raise AssertionError(f'{name} differs for {hex(code)}')
+
+
+def timePredicate(predicate, args, repeat):
+    def run():
+        for arg in args:
+            predicate(arg)
+    return min(timeit.repeat(run, number=repeat, repeat=5)) / (repeat * len(args))
+
+
+def main(repeat=2000):
+    checkEquivalence()
+    print(f'{"predicate":<24}{"compared ns":>12}{"used ns":>12}{"speedup":>10}')
+    for name, compared, used, kind in PREDICATES:
+        args = SAMPLE if kind == 'char' else SAMPLE_CODES
+        before = timePredicate(compared, args, repeat) * 1e9
+        after = timePredicate(used, args, repeat) * 1e9
+        print(f'{name:<24}{before:>12.1f}{after:>12.1f}{before / after:>9.2f}x')
+
+    text = '[1, 2, 3,\n   '
+    before = min(timeit.repeat(lambda: legacyEndsWithCommaOrNewline(text), number=repeat * 10, repeat=5))
+    after = min(timeit.repeat(lambda: stringutils.endsWithCommaOrNewline(text), number=repeat * 10, repeat=5))
+    print(f'{"endsWithCommaOrNewline":<24}{before / repeat / 10 * 1e9:>12.1f}'
+          f'{after / repeat / 10 * 1e9:>12.1f}{before / after:>9.2f}x')
+
+
+if __name__ == '__main__':
+    main()
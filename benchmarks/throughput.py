@@ -0,0 +1,184 @@
+'''
+ * Throughput benchmark of jsonrepair per repair category and document size.
+ *
+ * Run from the repository root:
+ *
+ *   python -m benchmarks.throughput                  # report MB/s and documents/s
+ *   python -m benchmarks.throughput --save           # store the results as baseline
+ *   python -m benchmarks.throughput --check          # fail when slower than or missing from the baseline
+ *   python -m benchmarks.throughput --sizes 1KB,100MB --categories ndjson,jsonp
+ *   python -m benchmarks.throughput --compare-index  # with and without the structural index
+ *
+ * Baselines depend on the machine, save them on the machine that checks them.
+'''
+import argparse
+import json
+import os
+import sys
+import time
+
+from benchmarks.corpora import CATEGORIES, generate
+from ssm_jsonrepair import JsonRepair, structuralindex
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# sizes used when --sizes is not given
+DEFAULT_SIZES = '1KB,100KB,1MB'
+
+_units = {'KB': 1 << 10, 'MB': 1 << 20, 'B': 1}
+
+
+def parseSize(text):
+    text = text.strip().upper()
+    for unit, factor in _units.items():
+        if text.endswith(unit):
+            return int(float(text[0:-len(unit)]) * factor)
+    return int(text)
+
+
+def formatSize(size):
+    for unit in ('MB', 'KB'):
+        if size >= _units[unit] and size % _units[unit] == 0:
+            return f'{size // _units[unit]}{unit}'
+    return f'{size}B'
+
+
+def measure(repair, text, minTime):
+    '''
+     * Repair the text until minTime seconds have passed, at least once.
+     * Returns the average number of seconds per repair.
+    '''
+    count = 0
+    start = time.perf_counter()
+    elapsed = 0
+    while count == 0 or elapsed < minTime:
+        repair(text)
+        count += 1
+        elapsed = time.perf_counter() - start
+    return elapsed / count
+
+
+def run(categories, sizes, minTime=0.5, validateFirst=True, report=print, index=True):
+    '''
+     * Measure the repair of a generated document per category and size. With
+     * index False, the structural index is not used at any size, see
+     * ssm_jsonrepair.structuralindex.
+    '''
+    engine = JsonRepair(validateFirst=validateFirst)
+    results = {}
+    threshold = structuralindex.INDEX_THRESHOLD
+    if not index:
+        structuralindex.INDEX_THRESHOLD = float('inf')
+    try:
+        report(f'{"category":<22}{"size":>8}{"MB/s":>10}{"docs/s":>12}')
+        for category in categories:
+            for size in sizes:
+                text = generate(category, size)
+                seconds = measure(engine.jsonrepair, text, minTime)
+                megabytes = len(text.encode('utf-8')) / (1 << 20)
+                result = {'mbps': megabytes / seconds, 'docsps': 1 / seconds}
+                results[f'{category}/{formatSize(size)}'] = result
+                report(f'{category:<22}{formatSize(size):>8}{result["mbps"]:>10.3f}{result["docsps"]:>12.1f}')
+    finally:
+        structuralindex.INDEX_THRESHOLD = threshold
+    return results
+
+
+def _silent(line):
+    pass
+
+
+def compareIndex(categories, sizes, minTime=0.5, validateFirst=True, report=print):
+    '''
+     * Report the throughput without and with the structural index, which is
+     * only used for documents from structuralindex.INDEX_THRESHOLD characters
+     * on, and only when NumPy is installed
+    '''
+    if not structuralindex.available():
+        report('NumPy is not installed, the structural index is not used')
+    report(f'{"category":<22}{"size":>8}{"walk MB/s":>12}{"index MB/s":>12}{"speedup":>10}')
+    for category in categories:
+        for size in sizes:
+            name = f'{category}/{formatSize(size)}'
+            walk = run([category], [size], minTime, validateFirst, _silent, index=False)[name]['mbps']
+            index = run([category], [size], minTime, validateFirst, _silent)[name]['mbps']
+            report(f'{category:<22}{formatSize(size):>8}{walk:>12.3f}{index:>12.3f}{index / walk:>10.2f}')
+
+
+def compare(results, baseline, threshold):
+    '''
+     * Returns the names of the results that are more than threshold (a
+     * fraction) slower than their baseline
+    '''
+    regressions = []
+    for name, result in results.items():
+        if name in baseline and result['mbps'] < baseline[name]['mbps'] * (1 - threshold):
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.throughput')
+    parser.add_argument('--categories', default=','.join(CATEGORIES))
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='comma separated sizes, like 1KB,1MB,100MB')
+    parser.add_argument('--min-time', type=float, default=0.5, help='seconds to repeat every document')
+    parser.add_argument('--no-validate-first', action='store_true')
+    parser.add_argument('--no-index', action='store_true', help='do not use the structural index')
+    parser.add_argument('--compare-index', action='store_true',
+                        help='report the throughput without and with the structural index')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save', action='store_true', help='store the results in the baseline file')
+    parser.add_argument('--check', action='store_true', help='compare the results with the baseline file')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='fraction of throughput that may be lost before --check fails')
+    args = parser.parse_args(argv)
+
+    categories = [category.strip() for category in args.categories.split(',')]
+    for category in categories:
+        if category not in CATEGORIES:
+            parser.error(f'unknown category {category}, choose from {", ".join(CATEGORIES)}')
+    sizes = [parseSize(size) for size in args.sizes.split(',')]
+    if args.compare_index and (args.check or args.save):
+        parser.error('--compare-index reports the throughput only, it cannot be combined with --check or --save')
+    if args.check:
+        # // before the measurements, which take a while
+        try:
+            with open(args.baseline) as file:
+                baseline = json.load(file)
+        except FileNotFoundError:
+            parser.error(f'no baseline file {args.baseline}, store one with --save first')
+        except (OSError, ValueError) as err:
+            parser.error(f'cannot read the baseline file {args.baseline}: {err}')
+    if args.compare_index:
+        compareIndex(categories, sizes, args.min_time, not args.no_validate_first)
+        return 0
+    results = run(categories, sizes, args.min_time, not args.no_validate_first, index=not args.no_index)
+
+    if args.check:
+        regressions = compare(results, baseline, args.threshold)
+        for name in regressions:
+            print(f'REGRESSION {name}: {results[name]["mbps"]:.3f} MB/s, '
+                  f'baseline {baseline[name]["mbps"]:.3f} MB/s', file=sys.stderr)
+        # // a result without a baseline is not checked at all, which must not pass unnoticed
+        missing = [name for name in results if name not in baseline]
+        for name in missing:
+            print(f'MISSING {name}: not in the baseline file {args.baseline}, store it with --save',
+                  file=sys.stderr)
+        if regressions or missing:
+            return 1
+
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as file:
+                baseline = json.load(file)
+        baseline.update(results)
+        with open(args.baseline, 'w') as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+            file.write('\n')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,12 @@
+from ssm_jsonrepair.jsonrepair import JsonRepair, JSONRepairError, RepairContext, repair, repair_edits, repair_loads
+from ssm_jsonrepair.aio import arepair, arepair_iter
+from ssm_jsonrepair.batch import repair_many
+from ssm_jsonrepair.cache import RepairCache
+from ssm_jsonrepair.diagnosis import Diagnosis, diagnose
+from ssm_jsonrepair.editlist import apply_edits, iter_apply_edits
+from ssm_jsonrepair.files import repair_file
+from ssm_jsonrepair.incremental import IncrementalJsonRepair
+from ssm_jsonrepair.limits import JSONRepairLimitError, RepairLimits
+from ssm_jsonrepair.ndjson import iter_repair_ndjson, repair_ndjson
+from ssm_jsonrepair.parallel import repair_parallel
+from ssm_jsonrepair.telemetry import RepairTelemetry
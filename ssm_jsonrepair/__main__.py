@@ -0,0 +1,316 @@
+'''
+ * Command line tool to repair JSON documents:
+ *
+ *   python -m ssm_jsonrepair < broken.json > repaired.json
+ *   python -m ssm_jsonrepair broken.json                        # write the repaired document to stdout
+ *   python -m ssm_jsonrepair dumps/ 'exports/**/*.json' -o repaired/
+ *   python -m ssm_jsonrepair dumps/ --in-place --workers 8
+ *   python -m ssm_jsonrepair --ndjson --skip-errors < events.ndjson > repaired.ndjson
+ *   python -m ssm_jsonrepair --compact < pretty.json > compact.json
+ *
+ * Directories are searched recursively for the files that match --pattern,
+ * and many files are repaired in parallel by a pool of worker processes. A
+ * summary of the files, bytes, repairs, errors and MB/s is written to stderr
+ * at the end. The exit status is 1 when a document could not be repaired.
+ *
+ * A document on stdin is read as a whole, newline delimited JSON on stdin is
+ * repaired and written record by record as it comes in. A file of more than
+ * STREAM_SIZE bytes is repaired a chunk at a time by repair_file instead,
+ * unless it is formatted with --compact or --indent or repaired with --ndjson.
+'''
+import argparse
+import fnmatch
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from ssm_jsonrepair.files import repair_file
+from ssm_jsonrepair.jsonrepair import JsonRepair, JSONRepairError
+from ssm_jsonrepair.ndjson import iter_repair_ndjson
+
+DEFAULT_PATTERN = '*.json'
+DEFAULT_NDJSON_PATTERN = '*.ndjson,*.jsonl'
+
+# size in bytes from which a file is repaired a chunk at a time, without the
+# validation by the json module first that needs the whole text in memory
+STREAM_SIZE = 64 << 20
+
+# maximum number of files sent to a worker process at a time
+_maxChunksize = 16
+
+
+class _CountingRepair(JsonRepair):
+    '''
+     * JsonRepair that counts the repairs it applies, without the cost of the
+     * timed parse functions of a RepairTelemetry
+    '''
+    __slots__ = ('repairs',)
+
+    def __init__(self, indent=None, separators=None):
+        super().__init__(indent=indent, separators=separators)
+        self.repairs = 0
+
+    def context(self, text, output):
+        context = super().context(text, output)
+        context.onRepair = self.recordRepair
+        return context
+
+    def recordRepair(self, kind, offset):
+        self.repairs += 1
+
+
+def _singleLine(record):
+    # // a repaired record has no line breaks inside of its strings, only around its values
+    if '\n' not in record:
+        return record
+    return ' '.join(line.strip(' \t\r') for line in record.split('\n')).strip()
+
+
+def _repairStream(source, write, ndjson, skipErrors, indent=None, separators=None):
+    '''
+     * Repair the binary file source and write the output with write. Returns
+     * (bytes read, repairs, messages of the documents or records that could
+     * not be repaired, whether the output is complete)
+    '''
+    engine = _CountingRepair(indent, separators)
+    if not ndjson:
+        data = source.read()
+        try:
+            write(engine.jsonrepair(data))
+        except JSONRepairError as err:
+            message, position = err.args
+            return len(data), engine.repairs, [f'{message} at position {position}'], False
+        return len(data), engine.repairs, [], True
+
+    size = 0
+
+    def lines():
+        nonlocal size
+        for line in source:
+            size += len(line)
+            yield line
+
+    skipped = [] if skipErrors else None
+    try:
+        for record in iter_repair_ndjson(lines(), engine=engine, skipped=skipped):
+            write(_singleLine(record) + '\n')
+    except JSONRepairError as err:
+        # // the message has the line number of the record
+        return size, engine.repairs, [err.args[0]], False
+    except UnicodeDecodeError as err:
+        return size, engine.repairs, [f'Invalid UTF-8 byte sequence in line: {err.reason}'], False
+    messages = [f'{error.args[0]} (skipped)' for offset, line, error in skipped or ()]
+    return size, engine.repairs, messages, True
+
+
+def _streamed(path, ndjson, indent, separators):
+    return not ndjson and indent is None and separators is None and os.path.getsize(path) > STREAM_SIZE
+
+
+def _repairFile(path, output):
+    '''
+     * Repair the file at path with repair_file into output, a path or a text
+     * file. Returns (bytes read, repairs, messages, whether the output is complete)
+    '''
+    engine = _CountingRepair()
+    size = os.path.getsize(path)
+    try:
+        repair_file(path, output, engine=engine)
+    except JSONRepairError as err:
+        message, position = err.args
+        return size, engine.repairs, [f'{message} at position {position}'], False
+    return size, engine.repairs, [], True
+
+
+def _repairPath(task):
+    '''
+     * Repair the file at path into target, runs in a worker process. Returns
+     * (path, bytes read, repairs, messages, whether the output was written)
+    '''
+    path, target, ndjson, skipErrors, indent, separators = task
+    try:
+        directory = os.path.dirname(os.path.abspath(target))
+        os.makedirs(directory, exist_ok=True)
+        if _streamed(path, ndjson, indent, separators):
+            # // repair_file writes through a temporary file itself
+            size, repairs, messages, complete = _repairFile(path, target)
+            if complete:
+                shutil.copymode(path, target)
+            return path, size, repairs, messages, complete
+        # // write to a temporary file first, so a failing repair leaves the target as it was
+        handle, temporary = tempfile.mkstemp(dir=directory, prefix='.jsonrepair-')
+        try:
+            # // the handle is owned by output before the source is opened, which can fail
+            with open(handle, 'w', encoding='utf-8') as output, open(path, 'rb') as source:
+                size, repairs, messages, complete = _repairStream(source, output.write, ndjson, skipErrors, indent,
+                                                                   separators)
+            if complete:
+                shutil.copymode(path, temporary)
+                os.replace(temporary, target)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+    except OSError as err:
+        return path, 0, 0, [str(err)], False
+    return path, size, repairs, messages, complete
+
+
+def _matches(name, patterns):
+    return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def _expand(paths, patterns):
+    '''
+     * The (file, path relative to its input) of the files of the inputs:
+     * files as they are, the matching files of directories, and glob patterns
+    '''
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, directories, names in os.walk(path):
+                directories.sort()
+                for name in sorted(names):
+                    if _matches(name, patterns):
+                        file = os.path.join(root, name)
+                        files.append((file, os.path.relpath(file, path)))
+        elif os.path.exists(path) or not glob.has_magic(path):
+            files.append((path, os.path.basename(path)))
+        else:
+            for file in sorted(glob.glob(path, recursive=True)):
+                if os.path.isfile(file):
+                    files.append((file, os.path.basename(file)))
+    return files
+
+
+class _Stdout:
+    '''
+     * Writes to stdout and remembers whether the output ends with a newline
+    '''
+
+    def __init__(self):
+        self.ended = True
+
+    def write(self, text):
+        if text:
+            sys.stdout.write(text)
+            self.ended = text.endswith('\n')
+
+    def finish(self):
+        sys.stdout.flush()
+        # // keep the messages and the summary on stderr off the last line of a
+        # // terminal, a redirected output is left as it is
+        if not self.ended and sys.stdout.isatty():
+            sys.stdout.write('\n')
+            sys.stdout.flush()
+
+
+def _summary(files, size, repairs, errors, seconds):
+    megabytes = size / (1 << 20)
+    return (f'{files} files, {size} bytes, {repairs} repairs, {errors} errors in {seconds:.3f}s '
+            f'({megabytes / seconds if seconds > 0 else 0:.3f} MB/s)')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m ssm_jsonrepair',
+                                     description='Repair JSON documents. Without paths, stdin is repaired to stdout.')
+    parser.add_argument('paths', nargs='*', help='files, directories or glob patterns, - for stdin')
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('-o', '--output-dir', help='write the repaired files to this directory')
+    target.add_argument('-i', '--in-place', action='store_true', help='replace the files by their repaired version')
+    parser.add_argument('--ndjson', action='store_true', help='repair newline delimited JSON record by record')
+    parser.add_argument('--skip-errors', action='store_true',
+                        help='with --ndjson, skip the records that cannot be repaired instead of failing the file')
+    formatting = parser.add_mutually_exclusive_group()
+    formatting.add_argument('--compact', action='store_true', help='drop all whitespace from the output')
+    formatting.add_argument('--indent', type=int, help='pretty print the output with this number of spaces')
+    parser.add_argument('--pattern', help=f'comma separated file name patterns of the files in directories, '
+                                          f'{DEFAULT_PATTERN} or with --ndjson {DEFAULT_NDJSON_PATTERN}')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='number of worker processes for multiple files')
+    parser.add_argument('-q', '--quiet', action='store_true', help='do not write the summary')
+    args = parser.parse_args(argv)
+
+    if args.skip_errors and not args.ndjson:
+        parser.error('--skip-errors requires --ndjson')
+    if args.indent is not None and args.ndjson:
+        parser.error('--indent cannot be used with --ndjson, every record is written on a single line')
+    formatting = (args.indent, (',', ':') if args.compact else None)
+    start = time.perf_counter()
+
+    if not args.paths or args.paths == ['-']:
+        if args.output_dir or args.in_place:
+            parser.error('--output-dir and --in-place need paths')
+        stdout = _Stdout()
+        size, repairs, messages, complete = _repairStream(sys.stdin.buffer, stdout.write, args.ndjson,
+                                                          args.skip_errors, *formatting)
+        stdout.finish()
+        for message in messages:
+            print(f'<stdin>: {message}', file=sys.stderr)
+        errors = len(messages)
+        files = 1
+    else:
+        patterns = (args.pattern or (DEFAULT_NDJSON_PATTERN if args.ndjson else DEFAULT_PATTERN)).split(',')
+        inputs = _expand(args.paths, [pattern.strip() for pattern in patterns])
+        if not args.output_dir and not args.in_place:
+            if len(inputs) != 1:
+                parser.error('give --output-dir or --in-place to repair more than one file')
+            if not os.path.isfile(inputs[0][0]):
+                parser.error(f'no such file: {inputs[0][0]}')
+            # // a single file is repaired to stdout
+            path = inputs[0][0]
+            stdout = _Stdout()
+            if _streamed(path, args.ndjson, *formatting):
+                size, repairs, messages, complete = _repairFile(path, stdout)
+            else:
+                with open(path, 'rb') as source:
+                    size, repairs, messages, complete = _repairStream(source, stdout.write, args.ndjson,
+                                                                      args.skip_errors, *formatting)
+            stdout.finish()
+            results = [(path, size, repairs, messages, complete)]
+        else:
+            tasks = []
+            sources = {}  # the input of every target
+            for file, relative in inputs:
+                target = file if args.in_place else os.path.join(args.output_dir, relative)
+                key = os.path.normcase(os.path.abspath(target))
+                if key in sources:
+                    if os.path.abspath(sources[key]) == os.path.abspath(file):
+                        # // the same file given twice, like by a path and a glob pattern
+                        continue
+                    parser.error(f'{sources[key]} and {file} would both be written to {target}')
+                sources[key] = file
+                tasks.append((file, target, args.ndjson, args.skip_errors, *formatting))
+            if args.workers <= 1 or len(tasks) <= 1:
+                results = map(_repairPath, tasks)
+                executor = None
+            else:
+                executor = ProcessPoolExecutor(max_workers=args.workers)
+                chunksize = max(1, min(_maxChunksize, len(tasks) // (4 * args.workers)))
+                results = executor.map(_repairPath, tasks, chunksize=chunksize)
+            try:
+                results = list(results)
+            finally:
+                if executor is not None:
+                    executor.shutdown()
+
+        files = len(results)
+        size = repairs = errors = 0
+        complete = True
+        for path, fileSize, fileRepairs, messages, fileComplete in results:
+            size += fileSize
+            repairs += fileRepairs
+            errors += len(messages)
+            complete = complete and fileComplete
+            for message in messages:
+                print(f'{path}: {message}', file=sys.stderr)
+
+    if not args.quiet:
+        print(_summary(files, size, repairs, errors, time.perf_counter() - start), file=sys.stderr)
+    return 0 if complete else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import asyncio
+from ssm_jsonrepair.jsonrepair import JSONRepairError, repair, repair_loads
+
+# documents shorter than this are repaired on the event loop, longer ones in the executor
+INLINE_THRESHOLD = 8192
+
+
+def _repair(text, loads):
+    return repair_loads(text) if loads else repair(text)
+
+
+async def arepair(text, executor=None, loads=False, inline_threshold=INLINE_THRESHOLD):
+    '''
+     * Repair a JSON document without blocking the event loop.
+     *
+     * A document of inline_threshold characters or more is repaired in the
+     * executor (the default executor of the loop when None), a shorter one
+     * directly on the event loop. Pass a ProcessPoolExecutor to repair large
+     * documents on other cores. Returns the repaired JSON text, or its Python
+     * objects when loads is True, and raises JSONRepairError like jsonrepair.
+    '''
+    if len(text) < inline_threshold:
+        return _repair(text, loads)
+    return await asyncio.get_running_loop().run_in_executor(executor, _repair, text, loads)
+
+
+async def _repairItem(text, executor, loads, inline_threshold):
+    try:
+        return await arepair(text, executor, loads, inline_threshold)
+    except JSONRepairError as err:
+        # // keep the error as the result of this document
+        return err
+
+
+async def arepair_iter(documents, executor=None, concurrency=4, ordered=True, loads=False,
+                       inline_threshold=INLINE_THRESHOLD):
+    '''
+     * Repair the documents of an async iterator (or a regular iterable), see
+     * arepair:
+     *
+     *   async for result in arepair_iter(source):
+     *       ...
+     *
+     * At most concurrency documents are taken from the source before their
+     * results have been consumed, so a burst of large documents waits in the
+     * source instead of piling up in memory or in the executor. A document that
+     * cannot be repaired yields its JSONRepairError instead of ending the
+     * iteration. With ordered=True the results come in the order of the
+     * documents, otherwise as soon as they are ready, as (index, result) tuples.
+    '''
+    if hasattr(documents, '__aiter__'):
+        source = documents.__aiter__()
+    else:
+        source = _aiter(documents)
+
+    pending = []  # tasks in the order of the documents
+    index = 0
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    text = await source.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                task = asyncio.ensure_future(_repairItem(text, executor, loads, inline_threshold))
+                pending.append((index, task))
+                index += 1
+            if not pending:
+                break
+
+            if ordered:
+                first, task = pending.pop(0)
+                yield await task
+            else:
+                await asyncio.wait([task for first, task in pending], return_when=asyncio.FIRST_COMPLETED)
+                for item in [item for item in pending if item[1].done()]:
+                    pending.remove(item)
+                    yield item[0], item[1].result()
+    finally:
+        for first, task in pending:
+            task.cancel()
+
+
+async def _aiter(iterable):
+    for item in iterable:
+        yield item
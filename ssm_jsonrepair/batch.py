@@ -0,0 +1,109 @@
+import itertools
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from ssm_jsonrepair.jsonrepair import JSONRepairError, repair, repair_loads
+
+# number of characters per batch sent to a worker process when chunksize is not given
+_batchCharacters = 1 << 18
+
+def _repairBatch(documents, loads):
+    repairDocument = repair_loads if loads else repair
+    results = []
+    for document in documents:
+        try:
+            results.append(repairDocument(document))
+        except JSONRepairError as err:
+            # // keep the error as the result of this document
+            results.append(err)
+    return results
+
+
+def _batches(documents, chunksize):
+    batch = []
+    size = 0
+    for document in documents:
+        batch.append(document)
+        size += len(document)
+        if (len(batch) >= chunksize) if chunksize else (size >= _batchCharacters):
+            yield batch
+            batch = []
+            size = 0
+    if batch:
+        yield batch
+
+
+def repair_many(documents, workers=None, chunksize=None, ordered=True, loads=False, inline_threshold=1 << 16):
+    '''
+     * Repair many documents in parallel in a pool of worker processes.
+     *
+     * Yields the repaired JSON text of every document, or its Python objects
+     * when loads is True. A document that cannot be repaired yields its
+     * JSONRepairError instead of ending the whole batch.
+     *
+     * The documents are sent to the workers in batches of chunksize documents.
+     * When chunksize is not given, the batches are sized by their number of
+     * characters: small documents are sent many at a time, large documents one
+     * by one. At most two batches per worker are in flight or waiting for their
+     * turn, so the documents are read lazily.
+     *
+     * With ordered=True the results come in the order of the documents.
+     * Otherwise they come as soon as they are ready, as (index, result) tuples.
+     *
+     * When the documents have less than inline_threshold characters in total,
+     * or workers is 1, they are repaired in the calling process: starting the
+     * worker processes would take longer than repairing them.
+    '''
+    if workers is None:
+        workers = os.cpu_count() or 1
+    batches = _batches(documents, chunksize)
+
+    # // look ahead until the threshold, to find out whether it pays to start the workers
+    head = []
+    size = 0
+    for batch in batches:
+        head.append(batch)
+        size += sum(len(document) for document in batch)
+        if size >= inline_threshold:
+            break
+
+    batches = itertools.chain(head, batches)
+    if workers <= 1 or size < inline_threshold:
+        index = 0
+        for batch in batches:
+            for result in _repairBatch(batch, loads):
+                yield result if ordered else (index, result)
+                index += 1
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}  # future -> (index of the first document, batch number)
+        done = {}  # results of completed batches by batch number, waiting for their turn
+        nextBatch = 0  # batch number of the next results to yield in order
+        submitted = 0
+        start = 0
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) + len(done) < 2 * workers:
+                batch = next(batches, None)
+                if batch is None:
+                    exhausted = True
+                else:
+                    pending[executor.submit(_repairBatch, batch, loads)] = (start, submitted)
+                    submitted += 1
+                    start += len(batch)
+            if not pending:
+                break
+
+            completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in completed:
+                first, number = pending.pop(future)
+                results = future.result()
+                if ordered:
+                    done[number] = results
+                else:
+                    for offset, result in enumerate(results):
+                        yield first + offset, result
+
+            while nextBatch in done:
+                yield from done.pop(nextBatch)
+                nextBatch += 1
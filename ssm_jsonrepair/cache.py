@@ -0,0 +1,88 @@
+import threading
+from collections import OrderedDict
+from ssm_jsonrepair.jsonrepair import JsonRepair, JSONRepairError, decodeInput
+from ssm_jsonrepair.limits import JSONRepairLimitError
+
+
+class RepairCache:
+    '''
+     * Least recently used cache of repair results, in front of a JsonRepair
+     * engine. Inputs that were repaired before are not parsed again, and an
+     * input that could not be repaired raises its JSONRepairError again.
+     *
+     * The entries are keyed by the input text itself, which is hashed without
+     * a copy and compared only when the hashes are equal. So the cache keeps
+     * the inputs alive: for valid JSON the cached result is the input itself.
+     * The cache is bounded by its number of entries and by the total number of
+     * characters of the cached inputs and results, where an input that is its
+     * own result counts once. hits, misses and evictions count the
+     * lookups since the cache was created or cleared. The cache can be shared
+     * between threads: the entries are guarded by a lock, the repairs run
+     * outside of it.
+    '''
+
+    def __init__(self, engine=None, maxEntries=1024, maxSize=64 << 20):
+        self.engine = engine if engine is not None else JsonRepair()
+        self.maxEntries = maxEntries
+        self.maxSize = maxSize
+        self.entries = OrderedDict()  # text -> (result or JSONRepairError, size)
+        self.size = 0  # number of characters of the cached inputs and results
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def jsonrepair(self, text):
+        text = decodeInput(text)
+        with self.lock:
+            entry = self.entries.get(text)
+            if entry is not None:
+                self.entries.move_to_end(text)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if entry is None:
+            try:
+                result = self.engine.jsonrepair(text)
+            except JSONRepairLimitError:
+                # // not cached: a timeout depends on the load of the machine, not only on the text
+                raise
+            except JSONRepairError as err:
+                # // a copy without the traceback, which refers to the whole parse state
+                self.add(text, JSONRepairError(*err.args), len(text) + len(err.args[0]))
+                raise
+            self.add(text, result, len(text) if result is text else len(text) + len(result))
+            return result
+
+        result = entry[0]
+        if isinstance(result, JSONRepairError):
+            # // a new exception, the cached one can be raised in another thread right now
+            raise JSONRepairError(*result.args)
+        return result
+
+    def add(self, key, result, size):
+        if size > self.maxSize:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                # // repaired by another thread at the same time
+                self.size -= previous[1]
+            self.entries[key] = (result, size)
+            self.size += size
+            while len(self.entries) > self.maxEntries or self.size > self.maxSize:
+                evicted, (result, size) = self.entries.popitem(last=False)
+                self.size -= size
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
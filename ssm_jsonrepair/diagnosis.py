@@ -0,0 +1,200 @@
+from ssm_jsonrepair.jsonrepair import JsonRepair, JSONRepairError, ScanningContext, decodeInput, _validator
+
+_whitespace = ' \t\n\r'
+_scan = _validator.scan_once
+
+
+class Diagnosis:
+    '''
+     * What a repair of a document would do, see diagnose:
+     *
+     *   valid       the document is valid JSON, it needs no repairs
+     *   repairable  the document can be repaired, error is None. None when
+     *               the diagnosis stopped at the first repair
+     *   offset      offset in the input of the first problem, None when valid
+     *   repairs     {kind: count} of the repairs, the REPAIR_* constants of
+     *               ssm_jsonrepair.jsonrepair
+     *   error       the JSONRepairError of a document that cannot be repaired
+     *   complete    the whole document was diagnosed
+    '''
+    __slots__ = ('repairs', 'offset', 'error', 'complete')
+
+    def __init__(self):
+        self.repairs = {}
+        self.offset = None
+        self.error = None
+        self.complete = True
+
+    @property
+    def valid(self):
+        return self.error is None and not self.repairs
+
+    @property
+    def repairable(self):
+        if self.error is None and not self.complete:
+            return None
+        return self.error is None
+
+    def __repr__(self):
+        return f'Diagnosis(valid={self.valid}, repairable={self.repairable}, offset={self.offset}, ' \
+               f'repairs={self.repairs}, error={self.error!r}, complete={self.complete})'
+
+    def recordRepair(self, kind, offset):
+        self.repairs[kind] = self.repairs.get(kind, 0) + 1
+        # // some repairs are found after the ones that follow them, like a missing end quote
+        if self.offset is None or offset < self.offset:
+            self.offset = offset
+
+    def recordFirstRepair(self, kind, offset):
+        self.recordRepair(kind, offset)
+        self.complete = False
+        raise _FirstRepair()
+
+
+class _FirstRepair(Exception):
+    # // ends a diagnosis that stops at the first repair
+    pass
+
+
+class DiagnosisOutput:
+    '''
+     * Output of a diagnosis, which does not keep the repaired text. It only
+     * keeps what the parser reads back from its output: whether it ends with a
+     * comma or a newline, to detect newline delimited JSON. Its length is 0,
+     * so the maxExpansion of RepairLimits does not apply.
+    '''
+    __slots__ = ('comma', 'newline', 'commaNewline')
+
+    # the parser appends only a newline for the whitespace of the input, see
+    # RepairContext.parseWhitespace
+    dropsWhitespace = True
+
+    def __init__(self):
+        self.comma = False  # the last token is a comma
+        self.newline = False  # the whitespace after the last token has a newline
+        self.commaNewline = False  # the whitespace in front of the last comma has a newline
+
+    def __len__(self):
+        return 0
+
+    def getvalue(self):
+        return None
+
+    def append(self, text):
+        char = text[0]
+        if char == ' ' or char == '\n' or char == '\t' or char == '\r':
+            self.newline = self.newline or ('\n' in text)
+            return
+        self.comma = char == ','
+        if self.comma:
+            self.commaNewline = self.newline
+        # // a repaired string can end with the whitespace that followed it
+        self.newline = text[-1] in _whitespace and '\n' in text[len(text.rstrip(_whitespace)):]
+
+    def appendValid(self, text, openers=(), end=None):
+        if end is not None:
+            text = text[0:end]
+        stripped = text.rstrip(_whitespace)
+        self.comma = stripped.endswith(',')
+        if self.comma:
+            self.commaNewline = '\n' in stripped[len(stripped[0:-1].rstrip(_whitespace)):]
+        self.newline = '\n' in text[len(stripped):]
+
+    def appendScanned(self, text, i):
+        # // a valid object or array, see ScanningContext.scanValue
+        end = _scan(text, i)[1]
+        self.comma = False
+        self.newline = False
+        return end
+
+    def appendMember(self, text, match):
+        # // a member that needs no repair parser, see ScanningContext.skipMembers
+        after = match.group('after')
+        self.comma = False
+        self.newline = after is not None and '\n' in after
+
+    def prepend(self, text):
+        pass
+
+    def insertBeforeLastWhitespace(self, textToInsert):
+        self.comma = textToInsert == ','
+        if self.comma:
+            self.commaNewline = False
+
+    def stripLastOccurrence(self, textToStrip, stripRemainingText=False):
+        if textToStrip == ',' or stripRemainingText:
+            self.comma = False
+        if stripRemainingText:
+            self.newline = False
+        elif textToStrip == ',':
+            # // the whitespace in front of the comma is the last one now
+            self.newline = self.newline or self.commaNewline
+
+    def removeAt(self, start, count):
+        pass
+
+    def truncateRecord(self, length):
+        self.comma = False
+        self.newline = False
+
+    def endsWithCommaOrNewline(self):
+        return self.comma or self.newline
+
+
+_engine = JsonRepair()
+
+
+def diagnose(text, engine=None, stop_at_first=False):
+    '''
+     * Find out whether and how a document would be repaired, without building
+     * the repaired text: returns a Diagnosis with the first problem offset,
+     * the kinds of repairs and whether it can be repaired at all.
+     *
+     * The valid objects and arrays are skipped by the scanner, and the plain
+     * members of the broken ones by a regular expression, so this is several
+     * times faster than a repair for a document that is mostly valid or of
+     * which the repairs are in its quotes, commas, constants or concatenated
+     * strings. Strings with control characters or escapes that need a repair,
+     * unquoted strings and the members around comments in broken objects and
+     * arrays are parsed by the repair parser, about as fast as a repair. When
+     * stop_at_first is True, the diagnosis stops at the first repair that is found: it tells
+     * whether the document needs repairs and the offset and kind of that
+     * repair, and repairable is None. A problem in front of it that is found
+     * later, like a missing end quote, is missed then.
+     *
+     * The validateFirst and the RepairLimits of engine, a JsonRepair, apply: a
+     * JSONRepairLimitError is raised as usual, the objects and arrays that are
+     * skipped by the scanner do not count for maxDepth and maxSteps, and the
+     * members that are skipped by the regular expression not for maxSteps. The
+     * telemetry of engine is not updated.
+     * The offsets are the ones of the decoded text of a bytes-like input, see
+     * decodeInput, except for invalid UTF-8 which has the byte offset.
+    '''
+    if engine is None:
+        engine = _engine
+    if engine.limits is not None:
+        engine.limits.checkLength(text)
+    diagnosis = Diagnosis()
+    try:
+        text = decodeInput(text)
+    except JSONRepairError as err:
+        diagnosis.error = err
+        diagnosis.offset = err.args[1]
+        return diagnosis
+
+    context = ScanningContext(text, DiagnosisOutput())
+    context.onRepair = diagnosis.recordFirstRepair if stop_at_first else diagnosis.recordRepair
+    if engine.limits is not None:
+        engine.limits.begin(context)
+    try:
+        context.repair(engine.validateFirst)
+    except _FirstRepair:
+        pass
+    except JSONRepairError as err:
+        if type(err) is not JSONRepairError:
+            # // a JSONRepairLimitError ends the diagnosis
+            raise
+        diagnosis.error = err
+        if diagnosis.offset is None or err.args[1] < diagnosis.offset:
+            diagnosis.offset = err.args[1]
+    return diagnosis
@@ -0,0 +1,314 @@
+import codecs
+
+_whitespace = ' \t\n\r'
+
+
+class EditList:
+    '''
+     * Output of the repair parser that keeps the repaired document as edits of
+     * the input, instead of as text, see JsonRepair.edits.
+     *
+     * The output is a list of segments: input that is copied as it is, as a
+     * [start, end] range, and text that is inserted, as a str. A token of the
+     * parser is a copy when it is the text at the end of the last copy, or
+     * right before or at the index of the parser. Adjacent copies are merged,
+     * so a document that needs a few repairs has a few segments, whatever its
+     * size. The repairs that edit the end of the output split the segments.
+    '''
+
+    # the parser appends the whitespace of the input, see RepairContext.parseWhitespace
+    dropsWhitespace = False
+
+    def __init__(self, text):
+        self.text = text
+        self.context = None  # the RepairContext that writes to this output, its index locates the tokens
+        self.segments = []  # [start, end] of copied input, or inserted str
+        self.length = 0  # length of the repaired document
+        self.copied = 0  # end of the last copied input, copies only go forward
+
+    def __len__(self):
+        return self.length
+
+    def segmentText(self, segment):
+        if type(segment) is str:
+            return segment
+        return self.text[segment[0]:segment[1]]
+
+    def append(self, text):
+        if not text:
+            return
+        self.length += len(text)
+        start = self.locate(text)
+        if start is None:
+            self.segments.append(text)
+            return
+
+        end = start + len(text)
+        self.copied = end
+        segments = self.segments
+        if segments and type(segments[-1]) is list and segments[-1][1] == start:
+            segments[-1][1] = end
+        else:
+            segments.append([start, end])
+
+    # /**
+    #  * The start of text in the input when the parser copied it from there, or None
+    #  */
+    def locate(self, text):
+        source = self.text
+        copied = self.copied
+        if source.startswith(text, copied):
+            return copied
+        i = self.context.i
+        for start in (i - len(text), i):
+            if start >= copied and source.startswith(text, start):
+                return start
+        return None
+
+    def prepend(self, text):
+        self.segments.insert(0, text)
+        self.length += len(text)
+
+    # /**
+    #  * Append a valid JSON text, like the valid part in front of the first error.
+    #  * openers are the offsets of the opening brackets of the containers that
+    #  * are still open at its end. Only text[0:end] is appended when end is given
+    #  */
+    def appendValid(self, text, openers=(), end=None):
+        if end is not None:
+            text = text[0:end]
+        self.append(text)
+
+    # /**
+    #  * Insert text before the whitespace at the end of the output
+    #  */
+    def insertBeforeLastWhitespace(self, textToInsert):
+        segments = self.segments
+        index = len(segments)
+        while index > 0:
+            segment = segments[index - 1]
+            if type(segment) is str:
+                stripped = segment.rstrip(_whitespace)
+                if not stripped:
+                    index -= 1
+                    continue
+                if len(stripped) < len(segment):
+                    segments[index - 1:index] = [stripped, segment[len(stripped):]]
+                break
+
+            start, end = segment
+            split = end
+            while split > start and self.text[split - 1] in _whitespace:
+                split -= 1
+            if split == start:
+                index -= 1
+                continue
+            if split < end:
+                segments[index - 1:index] = [[start, split], [split, end]]
+            break
+
+        segments.insert(index, textToInsert)
+        self.length += len(textToInsert)
+
+    # /**
+    #  * Strip last occurrence of textToStrip from the output
+    #  */
+    def stripLastOccurrence(self, textToStrip, stripRemainingText=False):
+        segments = self.segments
+        for index in range(len(segments) - 1, -1, -1):
+            segment = segments[index]
+            if type(segment) is str:
+                found = segment.rfind(textToStrip)
+                if found == -1:
+                    continue
+                if stripRemainingText:
+                    self.length -= sum(len(self.segmentText(other)) for other in segments[index + 1:])
+                    self.length -= len(segment) - found
+                    del segments[index + 1:]
+                    segments[index] = segment[0:found]
+                else:
+                    self.length -= len(textToStrip)
+                    segments[index] = segment[0:found] + segment[found + len(textToStrip):]
+                return
+
+            start, end = segment
+            found = self.text.rfind(textToStrip, start, end)
+            if found == -1:
+                continue
+            if stripRemainingText:
+                self.length -= sum(len(self.segmentText(other)) for other in segments[index + 1:])
+                self.length -= end - found
+                del segments[index + 1:]
+                segments[index] = [start, found]
+            else:
+                self.length -= len(textToStrip)
+                segments[index:index + 1] = [[start, found], [found + len(textToStrip), end]]
+            return
+
+    # /**
+    #  * Remove count characters at position start of the output, where start lies
+    #  * in the last segments
+    #  */
+    def removeAt(self, start, count):
+        segments = self.segments
+        offset = self.length
+        index = len(segments)
+        while index > 0 and offset > start:
+            index -= 1
+            offset -= len(self.segmentText(segments[index]))
+
+        # // the removed characters can span multiple segments
+        while count > 0 and index < len(segments):
+            segment = segments[index]
+            length = len(self.segmentText(segment))
+            begin = start - offset
+            end = min(length, begin + count)
+            if type(segment) is str:
+                segments[index] = segment[0:begin] + segment[end:]
+                index += 1
+            else:
+                segments[index:index + 1] = [[segment[0], segment[0] + begin], [segment[0] + end, segment[1]]]
+                index += 2
+            removed = end - begin
+            count -= removed
+            self.length -= removed
+            offset += length - removed
+            start = offset
+
+    def truncate(self, length):
+        segments = self.segments
+        while self.length > length:
+            segment = segments.pop()
+            size = len(self.segmentText(segment))
+            self.length -= size
+            if self.length < length:
+                keep = length - self.length
+                segments.append(segment[0:keep] if type(segment) is str else [segment[0], segment[0] + keep])
+                self.length = length
+
+    # /**
+    #  * Undo the output of a root level record that could not be repaired
+    #  */
+    def truncateRecord(self, length):
+        self.truncate(length)
+
+    # /**
+    #  * Test whether the output ends with a newline or comma character and optional whitespace
+    #  */
+    def endsWithCommaOrNewline(self):
+        for index in range(len(self.segments) - 1, -1, -1):
+            segment = self.segments[index]
+            if type(segment) is str:
+                stripped = segment.rstrip(' \t\r')
+                if stripped:
+                    return stripped[-1] == ',' or stripped[-1] == '\n'
+                continue
+            start, end = segment
+            while end > start and self.text[end - 1] in ' \t\r':
+                end -= 1
+            if end > start:
+                return self.text[end - 1] == ',' or self.text[end - 1] == '\n'
+        return False
+
+    # /**
+    #  * The edits: (offset in the input, number of deleted characters, inserted text)
+    #  */
+    def getvalue(self):
+        edits = []
+        position = 0  # end of the last copied input
+        inserted = []
+        for segment in self.segments:
+            if type(segment) is str:
+                if segment:
+                    inserted.append(segment)
+                continue
+            start, end = segment
+            if start == end:
+                continue
+            if start > position or inserted:
+                self.addEdit(edits, position, start, ''.join(inserted))
+                inserted = []
+            position = end
+        if position < len(self.text) or inserted:
+            self.addEdit(edits, position, len(self.text), ''.join(inserted))
+        return edits
+
+    # /**
+    #  * Add the edit that replaces the input from start to end with inserted,
+    #  * without the characters they have in common at their start and end
+    #  */
+    def addEdit(self, edits, start, end, inserted):
+        text = self.text
+        # // inserted is never more than a repaired token longer than the deleted input
+        limit = min(end - start, len(inserted))
+        prefix = 0
+        while prefix < limit and text[start + prefix] == inserted[prefix]:
+            prefix += 1
+        limit -= prefix
+        suffix = 0
+        while suffix < limit and text[end - 1 - suffix] == inserted[len(inserted) - 1 - suffix]:
+            suffix += 1
+        start += prefix
+        end -= suffix
+        inserted = inserted[prefix:len(inserted) - suffix]
+
+        if end - start == len(inserted) > 2 and text.startswith(inserted[1:-1], start + 1):
+            # // a token of which only the first and last character are replaced, like the
+            # // quotes of a string
+            edits.append((start, 1, inserted[0]))
+            edits.append((end - 1, 1, inserted[-1]))
+        elif end > start or inserted:
+            edits.append((start, end - start, inserted))
+
+
+def encodeEdits(data, text, edits):
+    '''
+     * The edits of the text decoded from the UTF-8 bytes data, with byte
+     * offsets and lengths and UTF-8 inserted bytes. A byte order mark is
+     * deleted, like decodeInput does.
+    '''
+    bom = 3 if bytes(data[0:3]) == codecs.BOM_UTF8 else 0
+    result = [(0, 3, b'')] if bom else []
+    if text.isascii():
+        for offset, deleted, inserted in edits:
+            result.append((offset + bom, deleted, inserted.encode('utf-8')))
+        return result
+
+    position = 0  # character offset of the last edit
+    bytePosition = bom
+    for offset, deleted, inserted in edits:
+        bytePosition += len(text[position:offset].encode('utf-8', 'surrogatepass'))
+        deletedBytes = len(text[offset:offset + deleted].encode('utf-8', 'surrogatepass'))
+        result.append((bytePosition, deletedBytes, inserted.encode('utf-8', 'surrogatepass')))
+        position = offset + deleted
+        bytePosition += deletedBytes
+    return result
+
+
+def iter_apply_edits(text, edits):
+    '''
+     * Yield the repaired document as the slices of the input between the
+     * edits and their inserted texts, in order. text is the input as given to
+     * JsonRepair.edits, a str or a bytes-like object: slices of a bytes-like
+     * input are memoryviews, so the input is not copied.
+    '''
+    if not isinstance(text, str):
+        text = memoryview(text)
+    position = 0
+    for offset, deleted, inserted in edits:
+        if offset > position:
+            yield text[position:offset]
+        if inserted:
+            yield inserted
+        position = offset + deleted
+    if position < len(text):
+        yield text[position:]
+
+
+def apply_edits(text, edits):
+    '''
+     * The repaired document: text with the edits applied, in one pass. A str
+     * for a str input, bytes for a bytes-like input.
+    '''
+    empty = '' if isinstance(text, str) else b''
+    return empty.join(iter_apply_edits(text, edits))
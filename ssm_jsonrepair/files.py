@@ -0,0 +1,231 @@
+import codecs
+import mmap
+import os
+import shutil
+import tempfile
+from ssm_jsonrepair.incremental import IncrementalJsonRepair
+from ssm_jsonrepair.jsonrepair import JSONRepairError, RepairContext, REPAIR_NDJSON
+
+# number of bytes of the file that are decoded and parsed at a time
+CHUNK_SIZE = 1 << 20
+
+
+def _windows(buffer, chunk_size):
+    # // decode the buffer window by window: a character that is split between two
+    # // windows is kept by the decoder until the next one
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    view = memoryview(buffer)
+    try:
+        for start in range(0, len(view), chunk_size):
+            try:
+                yield decoder.decode(view[start:start + chunk_size])
+            except UnicodeDecodeError as err:
+                position = start + err.start
+                raise JSONRepairError(f'Invalid UTF-8 byte sequence at byte {position}', position) from None
+        yield decoder.decode(b'', True)
+    finally:
+        view.release()
+
+
+def repair_file(path, output=None, chunk_size=CHUNK_SIZE, engine=None):
+    '''
+     * Repair the JSON document in the file at path, which is read as UTF-8.
+     *
+     * The file is memory mapped and decoded chunk_size bytes at a time, and the
+     * parse state is kept like IncrementalJsonRepair does, at the last member
+     * boundary of the root value. Neither the whole file nor a decoded copy of
+     * it is kept in memory: only the last member that is still being parsed.
+     *
+     * output is a path or a text file to write the repaired document to,
+     * returns None then. The repaired output is written to a temporary file as
+     * soon as it is final: next to the path, which is replaced by it when the
+     * repair succeeds, so a failing repair leaves the path as it was, or an
+     * anonymous one that is copied to the text file at the end. Without
+     * output, the repaired document is returned as a str.
+     *
+     * Newline delimited JSON is repaired too, but kept in memory after its
+     * first record: repair large ones with iter_repair_ndjson. When its first
+     * record is larger than chunk_size, the output written before the records
+     * turn out to need a root array is copied once more behind the '['.
+     *
+     * Every character is parsed by the repair parser: the file is not validated
+     * by the json module first, and a valid file is not returned untouched,
+     * because that needs the whole decoded text in memory. When it fits,
+     * jsonrepair of the text of the file is faster for valid or mostly valid
+     * files.
+     *
+     * The RepairTelemetry and RepairLimits of engine, a JsonRepair, apply to
+     * the file as a whole: maxLength is the size of the file in bytes, every
+     * repair is reported once, with its offset in the decoded text. indent and
+     * separators are not applied.
+    '''
+    if output is None:
+        parts = []
+        if _repairFile(path, parts.append, chunk_size, engine):
+            parts.insert(0, '[\n')
+        return ''.join(parts)
+
+    if not isinstance(output, (str, bytes, os.PathLike)):
+        with tempfile.TemporaryFile('w+', encoding='utf-8') as file:
+            if _repairFile(path, file.write, chunk_size, engine):
+                output.write('[\n')
+            file.seek(0)
+            shutil.copyfileobj(file, output, chunk_size)
+        return
+
+    directory = os.path.dirname(os.path.abspath(output))
+    temporary = None
+    try:
+        file, temporary = _temporaryFile(directory)
+        with file:
+            ndjson = _repairFile(path, file.write, chunk_size, engine)
+        if ndjson:
+            # // put the '[' of the array in front of the output in a second temporary file
+            written = temporary
+            file, temporary = _temporaryFile(directory)
+            try:
+                with file, open(written, encoding='utf-8') as source:
+                    file.write('[\n')
+                    shutil.copyfileobj(source, file, chunk_size)
+            finally:
+                os.remove(written)
+        if os.path.exists(output):
+            # // keep the permissions of the file that is replaced
+            shutil.copymode(output, temporary)
+        os.replace(temporary, output)
+    finally:
+        if temporary is not None and os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def _temporaryFile(directory):
+    # // like tempfile.mkstemp, but created with the permissions that open gives a new file
+    while True:
+        temporary = os.path.join(directory, f'.jsonrepair-{os.urandom(6).hex()}')
+        try:
+            return open(temporary, 'x', encoding='utf-8'), temporary
+        except FileExistsError:
+            pass
+
+
+def _repairFile(path, write, chunk_size, engine):
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            # // an empty file cannot be mapped
+            return _repairWindows([''], write, chunk_size, engine)
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            if engine is not None and engine.limits is not None:
+                engine.limits.checkLength(buffer)
+            windows = _windows(buffer, chunk_size)
+            try:
+                return _repairWindows(windows, write, chunk_size, engine)
+            finally:
+                # // release the view on the buffer before it is closed
+                windows.close()
+
+
+class _FileRepair(IncrementalJsonRepair):
+    '''
+     * IncrementalJsonRepair that reports every repair once to report, the
+     * repair hook of an engine: the text after the checkpoint is parsed again,
+     * so only the repairs in front of the checkpoint are final after a parse
+    '''
+
+    def __init__(self, context):
+        super().__init__()
+        self.context = context
+        self.report = context.onRepair
+        context.onRepair = self.recordRepair
+        self.repairs = []  # (kind, offset in the whole text) of the repairs of the last parse
+        self.final = 0  # number of those in front of the last checkpoint
+        self.ndjson = False  # whether the document turned out to be newline delimited JSON
+
+    def advance(self):
+        self.repairs = []
+        self.final = 0
+        # // the scan of a string that the text ended in is not continued, so
+        # // every parse reports all the repairs after the checkpoint
+        self.openString = None
+        return super().advance()
+
+    def recordCheckpoint(self):
+        super().recordCheckpoint()
+        self.final = len(self.repairs)
+
+    def recordRepair(self, kind, offset):
+        if kind == REPAIR_NDJSON:
+            self.ndjson = True
+        if self.report is not None:
+            self.repairs.append((kind, self.offset + offset))
+
+    def reportRepairs(self, final):
+        if self.report is not None:
+            for kind, offset in self.repairs[0:final]:
+                self.report(kind, offset)
+
+
+def _repairWindows(windows, write, chunk_size, engine):
+    '''
+     * Repair the decoded windows and write the output. Returns True when the
+     * document turned out to be newline delimited JSON after output had been
+     * written: the '[' of the array has to be put in front of that output.
+     * Output is only written once chunk_size characters of it are final, so
+     * that is rare: only a first record of more than chunk_size needs it.
+    '''
+    repairer = _FileRepair(engine.context('', None) if engine is not None else RepairContext('', None))
+    written = False
+    held = []  # final output that is not written yet
+    heldLength = 0
+    pending = 0  # number of characters fed since the last parse
+    retryAt = 0  # number of pending characters after which to parse again
+    ended = False  # whether the root value ended in front of the text fed so far
+    for text in windows:
+        repairer.feed(text)
+        if ended:
+            # // no checkpoints follow the root value: the next values, like the
+            # // records of newline delimited JSON, are parsed once by the snapshot
+            continue
+        pending += len(text)
+        if pending < retryAt:
+            continue
+        pending = 0
+        start = repairer.offset
+        try:
+            processed = repairer.advance()
+        except JSONRepairError as err:
+            if type(err) is not JSONRepairError:
+                # // a JSONRepairLimitError ends the repair, with its position in the whole text
+                err.args = (err.args[0], err.args[1] + start)
+                raise
+            # // the text so far may be broken in a way that the next windows repair,
+            # // the final snapshot raises the error when they do not. Parse again
+            # // when the text after the checkpoint has doubled, so the reparses of a
+            # // broken tail do not add up to quadratic time
+            retryAt = len(repairer.chunks[0])
+            continue
+        repairer.reportRepairs(repairer.final)
+        # // the same for a checkpoint that did not move, like in a long string
+        retryAt = len(repairer.chunks[0]) if repairer.offset == start else 0
+        ended = processed and repairer.context.i < len(repairer.context.text)
+        output = repairer.takeOutput()
+        if output:
+            held.append(output)
+            heldLength += len(output)
+            if heldLength >= chunk_size:
+                write(''.join(held))
+                held = []
+                heldLength = 0
+                written = True
+
+    result = repairer.snapshot()
+    repairer.reportRepairs(None)
+    if repairer.ndjson and (held or written):
+        # // the '[\n' was put in front of the output after the held and written parts
+        if not written:
+            write('[\n')
+        write(''.join(held))
+        write(result[2:])
+        return written
+    write(''.join(held))
+    write(result)
+    return False
@@ -0,0 +1,189 @@
+import re
+from ssm_jsonrepair.outputbuffer import OutputBuffer, _blockSize
+
+# the tokens of valid JSON: whitespace, strings, structural characters, numbers and keywords
+_token = re.compile(r'[ \t\n\r]+|"(?:[^"\\]|\\.)*"|[{}\[\],:]|[^ \t\n\r"{}\[\],:]+')
+# the strings of valid JSON, to split the text into strings and the parts between them
+_string = re.compile(r'("[^"\\]*(?:\\.[^"\\]*)*")')
+
+_whitespace = ' \t\n\r'
+
+
+class FormattingBuffer(OutputBuffer):
+    '''
+     * Output of the repair parser that formats the repaired document like
+     * json.dumps does with indent and separators, instead of keeping the
+     * whitespace of the input.
+     *
+     * The parser does not append the whitespace of the input, only a newline
+     * when it had one, to detect newline delimited JSON. The separators and
+     * the indentation are written in front of the next token, so the output
+     * never ends with whitespace: inserting before the last whitespace is a
+     * plain append. A comma is held back until the next value, so stripping a
+     * trailing comma does not touch the output.
+    '''
+
+    # the parser appends only a newline for the whitespace of the input, see
+    # RepairContext.parseWhitespace
+    dropsWhitespace = True
+
+    def __init__(self, indent=None, separators=None):
+        super().__init__()
+        if indent is not None and not isinstance(indent, str):
+            indent = ' ' * indent
+        if separators is None:
+            separators = (',', ': ') if indent is not None else (', ', ': ')
+        self.indent = indent
+        self.itemSeparator, self.keySeparator = separators
+        self.depth = 0  # number of open objects and arrays
+        self.opened = False  # the last token opened an object or array
+        self.comma = False  # a comma that is written in front of the next value
+        self.endsWithNewline = False
+
+    def append(self, text):
+        char = text[0]
+        if char in _whitespace:
+            if '\n' in text:
+                self.endsWithNewline = True
+            return
+
+        self.endsWithNewline = False
+        if char == ',':
+            self.comma = True
+            return
+        if char == ':':
+            text = self.keySeparator
+        elif char == '}' or char == ']':
+            self.close(text)
+            return
+        else:
+            if char == '"' and text[-1] in _whitespace:
+                # // a repaired string can end with the whitespace that followed it
+                stripped = text.rstrip(_whitespace)
+                self.endsWithNewline = '\n' in text[len(stripped):]
+                text = stripped
+            if self.comma or self.opened:
+                text = self.separator() + text
+            if char == '{' or char == '[':
+                self.depth += 1
+                self.opened = True
+
+        # // OutputBuffer.append, inlined because every token of the parser comes here
+        chunks = self.chunks
+        chunks.append(text)
+        self.length += len(text)
+        if len(chunks) - self.frozen >= 2 * _blockSize:
+            self.compact()
+
+    # /**
+    #  * The separator and indentation in front of the next member
+    #  */
+    def separator(self):
+        if self.comma:
+            self.comma = False
+            separator = self.itemSeparator
+        elif self.opened:
+            separator = ''
+        else:
+            return ''
+        self.opened = False
+        if self.indent is not None:
+            separator += '\n' + self.indent * self.depth
+        return separator
+
+    def close(self, text):
+        self.comma = False
+        if self.depth == 0:
+            # // closing bracket of the NDJSON array
+            OutputBuffer.append(self, text if self.indent is None else '\n' + text)
+            return
+
+        self.depth -= 1
+        if self.opened:
+            # // empty object or array
+            self.opened = False
+            OutputBuffer.append(self, text)
+        elif self.indent is not None:
+            OutputBuffer.append(self, '\n' + self.indent * self.depth + text)
+        else:
+            OutputBuffer.append(self, text)
+
+    def prepend(self, text):
+        # // newline delimited JSON: the root values are wrapped in an array
+        if self.indent is None:
+            OutputBuffer.prepend(self, '[')
+        else:
+            # // the formatted output has no newlines in its strings, only in its indentation
+            indent = self.indent
+            text = '[\n' + indent + str(self).replace('\n', '\n' + indent)
+            self.chunks = [text]
+            self.length = len(text)
+            self.frozen = 1
+
+    # /**
+    #  * Append a valid JSON text, like the valid part in front of the first error.
+    #  * openers are the offsets of the opening brackets of the containers that
+    #  * are still open at its end. Only text[0:end] is appended when end is given
+    #  */
+    def appendValid(self, text, openers=(), end=None):
+        if end is not None:
+            text = text[0:end]
+        if self.indent is not None:
+            append = self.append
+            for token in _token.findall(text):
+                append(token)
+            return
+
+        # // without indentation, the parts between the strings are formatted in bulk,
+        # // joined by a NUL character which valid JSON does not have. Outside of the
+        # // strings there is no other whitespace than the one of JSON
+        parts = _string.split(text)
+        between = ''.join('\0'.join(parts[0::2]).split())
+        self.depth += between.count('{') + between.count('[') - between.count('}') - between.count(']')
+        if self.itemSeparator != ',' or self.keySeparator != ':':
+            between = between.translate({ord(','): self.itemSeparator, ord(':'): self.keySeparator})
+        parts[0::2] = between.split('\0')
+        formatted = ''.join(parts)
+        if formatted:
+            OutputBuffer.append(self, self.separator() + formatted)
+            self.opened = formatted[-1] == '{' or formatted[-1] == '['
+        self.endsWithNewline = '\n' in text[len(text.rstrip(_whitespace)):]
+
+    def insertBeforeLastWhitespace(self, textToInsert):
+        if textToInsert == '"':
+            # // the end quote of the string that was stripped for a concatenation,
+            # // which is the last token: like in an OutputBuffer, it goes in front of the
+            # // whitespace its content ends with, and that whitespace is dropped
+            OutputBuffer.insertBeforeLastWhitespace(self, '"')
+            whitespace = self.trailingWhitespace()
+            if whitespace:
+                self.truncate(self.length - len(whitespace))
+        else:
+            # // the dropped whitespace stays behind the inserted text
+            endsWithNewline = self.endsWithNewline
+            self.append(textToInsert)
+            self.endsWithNewline = endsWithNewline
+
+    def stripLastOccurrence(self, textToStrip, stripRemainingText=False):
+        if textToStrip == ',':
+            self.comma = False
+        else:
+            OutputBuffer.stripLastOccurrence(self, textToStrip, stripRemainingText)
+            if stripRemainingText:
+                # // the whitespace after it is stripped too
+                self.endsWithNewline = False
+
+    # /**
+    #  * Undo the output of a root level record that could not be repaired, the
+    #  * output had length characters before it. Every record after the first
+    #  * one follows a comma.
+    #  */
+    def truncateRecord(self, length):
+        self.truncate(length)
+        self.depth = 0
+        self.opened = False
+        self.comma = length > 0
+        self.endsWithNewline = False
+
+    def endsWithCommaOrNewline(self):
+        return self.comma or self.endsWithNewline
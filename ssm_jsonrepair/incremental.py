@@ -0,0 +1,140 @@
+from ssm_jsonrepair.jsonrepair import JSONRepairError, RepairContext, STATE_MEMBER
+from ssm_jsonrepair.outputbuffer import OutputBuffer
+
+
+class IncrementalJsonRepair:
+    '''
+     * Repair a JSON document that arrives in chunks, like the tokens of a
+     * language model, and get the repaired document so far at any time.
+     *
+     *   repairer = IncrementalJsonRepair()
+     *   for chunk in chunks:
+     *       repairer.feed(chunk)
+     *       print(repairer.snapshot())
+     *
+     * snapshot() repairs the text as if it ended there: open strings, arrays
+     * and objects are closed like jsonrepair does for truncated JSON. The parse
+     * state is kept at the last member boundary (the comma after a complete
+     * member of an array or object) that has been reached: the open containers,
+     * the repaired output in front of it and the remaining text. A snapshot only
+     * parses the text after that boundary, so the cost of a snapshot follows the
+     * size of the last member that is still being parsed plus the nesting depth,
+     * not the size of the document. A string that the text ends in is not
+     * scanned again either: its scan continues where the previous snapshot
+     * stopped, so a snapshot of a long string that streams in only scans the
+     * new text.
+    '''
+
+    def __init__(self):
+        self.context = RepairContext('', None)
+        self.chunks = []  # text after the checkpoint
+        self.offset = 0  # length of the text in front of the checkpoint
+        self.prefix = []  # chunks of the repaired output in front of the checkpoint, without trailing whitespace
+        self.prefixLength = 0  # length of the repaired output in front of the checkpoint
+        self.whitespace = ''  # the whitespace at the end of the repaired output in front of the checkpoint
+        self.frames = []  # open containers at the checkpoint
+        self.checkpoint = None  # (index, output length, whitespace, frames) of the last member boundary
+        self.openString = ()  # scan state of the string that the text ends in, see RepairContext.openString
+
+    def feed(self, chunk):
+        if chunk:
+            self.chunks.append(chunk)
+
+    def snapshot(self):
+        context = self.context
+        offset = self.offset
+        try:
+            if not self.advance():
+                context.throwUnexpectedEnd()
+            return context.parseRootEnd()
+        except JSONRepairError as err:
+            # // position in the whole text instead of the text after the checkpoint, the
+            # // error keeps its type, like a JSONRepairLimitError of the limits of the context
+            message, position = err.args
+            err.args = (message, position + offset)
+            raise
+
+    def advance(self):
+        '''
+         * Parse the text fed so far up to its end and move the checkpoint, without
+         * building a snapshot. Returns whether the root value was processed. The
+         * errors have the position in the text after the previous checkpoint.
+        '''
+        context = self.context
+        text = ''.join(self.chunks)
+        self.chunks = [text]
+        context.i = 0
+        context.text = text
+        context.output = output = OutputBuffer.fromChunks(self.prefix, self.prefixLength)
+        output.append(self.whitespace)
+        context.stack = [frame.copy() for frame in self.frames]
+        context.openString = self.openString
+        self.checkpoint = None
+        context.onCheckpoint = self.recordCheckpoint
+        try:
+            if context.stack:
+                processed = context.parseStack(0, None)
+            else:
+                processed = context.parseValue()
+        finally:
+            context.onCheckpoint = None
+            self.openString = context.openString
+            context.openString = None
+
+        if self.checkpoint is not None:
+            # // move the checkpoint: the text in front of it is never parsed again
+            index, length, whitespace, frames = self.checkpoint
+            self.movePrefix(output, length)
+            self.whitespace = whitespace
+            self.frames = frames
+            self.chunks = [text[index:]]
+            self.offset += index
+            self.openString = shiftOpenString(self.openString, index)
+        return processed
+
+    def movePrefix(self, output, length):
+        prefix = self.prefix
+        count = len(prefix)
+        if output.frozen >= count and output.chunks[0:count] == prefix:
+            # // the output in front of the checkpoint was only appended to: add the new part
+            prefix.append(''.join(output.chunks[count:])[0:length - self.prefixLength])
+            # // join the chunks like a binary counter, their number stays logarithmic
+            while len(prefix) > 1 and len(prefix[-2]) <= len(prefix[-1]):
+                prefix[-2:] = [prefix[-2] + prefix[-1]]
+        else:
+            self.prefix = [str(output)[0:length]]
+        self.prefixLength = length
+
+    def takeOutput(self):
+        '''
+         * Remove the repaired output in front of the checkpoint and return it.
+         * This output is final, so a consumer that writes it away keeps the
+         * memory of the repairer bounded. The next snapshots only contain the
+         * output after it.
+        '''
+        output = ''.join(self.prefix)
+        self.prefix = []
+        self.prefixLength = 0
+        return output
+
+    def recordCheckpoint(self):
+        context = self.context
+        frames = [frame.copy() for frame in context.stack]
+        # // continue with the comma of the next member
+        frames[-1].state = STATE_MEMBER
+        frames[-1].initial = False
+        # // the repairs after the checkpoint can insert text before the whitespace
+        # // in front of it, like a closing bracket when the comma turns out to be a
+        # // trailing comma: the whitespace is kept apart from the prefix
+        whitespace = context.output.trailingWhitespace()
+        self.checkpoint = (context.i, len(context.output) - len(whitespace), whitespace, frames)
+
+
+def shiftOpenString(openString, index):
+    # // positions in the text after a checkpoint that moved by index
+    if not openString or openString[0] < index:
+        return ()
+    start, isEndQuote, i, str1, stop = openString
+    if stop is not None:
+        stop = (stop[0] - index,) + stop[1:]
+    return start - index, isEndQuote, i - index, str1, stop
@@ -1,12 +1,177 @@
 import json
+import re
+import threading
+from ssm_jsonrepair import structuralindex
+from ssm_jsonrepair.editlist import EditList, encodeEdits
+from ssm_jsonrepair.formattingbuffer import FormattingBuffer
+from ssm_jsonrepair.objectbuilder import ObjectBuilder
+from ssm_jsonrepair.outputbuffer import OutputBuffer
 from ssm_jsonrepair.stringutils import *
 
+# the path taken by JsonRepair.jsonrepair, see JsonRepair.lastPath
+PATH_VALID = 'valid'  # the input was valid JSON and is returned untouched
+PATH_RESUMED = 'resumed'  # the valid prefix was copied, repair started at the first failure
+PATH_REPAIRED = 'repaired'  # the input was repaired from the start
+
 
 class JSONRepairError(Exception):
     pass
 
 
-class JsonRepair:
+def _rejectConstant(name):
+    # NaN, Infinity and -Infinity are accepted by the json module but are not valid JSON
+    raise ValueError(name)
+
+
+# kinds of repairs, reported to RepairContext.onRepair with the offset in the input
+REPAIR_MISSING_COMMA = 'missing comma'
+REPAIR_LEADING_COMMA = 'leading comma'
+REPAIR_TRAILING_COMMA = 'trailing comma'
+REPAIR_MISSING_COLON = 'missing colon'
+REPAIR_MISSING_VALUE = 'missing value'
+REPAIR_MISSING_END_BRACKET = 'missing end bracket'
+REPAIR_REDUNDANT_END_BRACKET = 'redundant end bracket'
+REPAIR_QUOTES = 'quotes'  # single or special quotes replaced with double quotes
+REPAIR_MISSING_QUOTE = 'missing quote'
+REPAIR_UNESCAPED_QUOTE = 'unescaped quote'
+REPAIR_ESCAPED_STRING = 'escaped string'
+REPAIR_INVALID_ESCAPE = 'invalid escape'
+REPAIR_INVALID_UNICODE = 'invalid unicode'
+REPAIR_CONTROL_CHARACTER = 'control character'
+REPAIR_STRING_RETRY = 'string retry'  # a string is parsed again, stopping at the first delimiter
+REPAIR_CONCATENATED_STRING = 'concatenated string'
+REPAIR_SPECIAL_WHITESPACE = 'special whitespace'
+REPAIR_COMMENT = 'comment'
+REPAIR_ELLIPSIS = 'ellipsis'
+REPAIR_PYTHON_CONSTANT = 'python constant'
+REPAIR_UNQUOTED_STRING = 'unquoted string'
+REPAIR_FUNCTION_CALL = 'function call'  # MongoDB data type or JSONP callback
+REPAIR_LEADING_ZEROS = 'leading zeros'
+REPAIR_TRUNCATED_NUMBER = 'truncated number'
+REPAIR_NDJSON = 'ndjson'
+
+# C accelerated validator used for the validate-first fast path
+_validator = json.JSONDecoder(parse_constant=_rejectConstant)
+
+# objects and arrays nested deeper than this are parsed without trying the
+# scanner of the json module first, see ScanningContext
+SCAN_MAX_DEPTH = 32
+
+# a failing scan costs a count of the lines in front of it, see ScanningContext
+SCAN_FAILURE_BUDGET = 64
+
+# strings, lone (unterminated) quotes and the structural characters of a valid JSON prefix
+_structuralToken = re.compile(r'"(?:[^"\\]|\\.)*"|["{}\[\],]')
+
+# the start of a root level record of newline delimited JSON: a value at the start of a line
+_recordBoundary = re.compile('\n(?=[\\[{\\w\\-"\u201c\u201d\'\u2018\u2019`\u00b4])')
+
+# kinds of the containers on the parse stack
+FRAME_OBJECT = '{'
+FRAME_ARRAY = '['
+FRAME_CALL = '('  # a MongoDB or JSONP function call like NumberLong(2) or callback({...})
+
+# what a container on the parse stack is waiting for
+STATE_OPEN = 0  # just opened
+STATE_MEMBER = 1  # the next member, or the end of the container
+STATE_KEY = 2  # an object key has been parsed, continue with the colon and the value
+STATE_VALUE = 3  # the value of the current member has been parsed
+
+# returned by the parse functions when they opened a container on the parse stack,
+# the value is complete when that container is closed
+PENDING = 'pending'
+
+# the closing bracket of an object or array on the parse stack
+_closingBrackets = {FRAME_OBJECT: '}', FRAME_ARRAY: ']'}
+
+# returned by scanString when the string has to be parsed again, stopping at the first delimiter
+_retryString = 'retry'
+
+# the values of the keywords, the Python ones are repaired
+_keywords = {'true': 'true', 'false': 'false', 'null': 'null', 'True': 'true', 'False': 'false', 'None': 'null'}
+
+
+class Frame:
+    '''
+     * An object, array or function call that is open on the parse stack
+    '''
+    __slots__ = ('kind', 'state', 'initial', 'processedColon', 'truncatedText', 'isValue')
+
+    def __init__(self, kind, state=STATE_OPEN, isValue=True):
+        self.kind = kind
+        self.state = state
+        self.initial = True  # no member parsed yet
+        self.processedColon = False
+        self.truncatedText = False
+        self.isValue = isValue  # opened by parseValue, which skips the whitespace after it
+
+    def copy(self):
+        frame = Frame(self.kind, self.state, self.isValue)
+        frame.initial = self.initial
+        frame.processedColon = self.processedColon
+        frame.truncatedText = self.truncatedText
+        return frame
+
+
+class Lookahead:
+    '''
+     * Skips the whitespace and comments after the end quote candidates of a
+     * string without parsing them. It remembers what it skipped, so the
+     * lookahead of all candidates of a string takes linear time, also when
+     * candidates are inside the comments that were skipped for earlier ones.
+    '''
+    __slots__ = ('text', 'known', 'found')
+
+    def __init__(self, text):
+        self.text = text
+        self.known = {}  # start of skipped whitespace or a comment -> index after all of them
+        self.found = {}  # substring -> (start, index) of the last search
+
+    def skip(self, i):
+        text = self.text
+        known = self.known
+        visited = []
+        while True:
+            end = known.get(i)
+            if end is not None:
+                break
+            visited.append(i)
+            if text.startswith('/*', i):
+                close = self.find('*/', i + 1)
+                i = close + 2 if close != -1 else len(text)
+            elif text.startswith('//', i):
+                close = self.find('\n', i)
+                i = close if close != -1 else len(text)
+            else:
+                match = regexWhitespaceRun.match(text, i)
+                if match is None:
+                    end = i
+                    break
+                i = match.end()
+
+        for start in visited:
+            known[start] = end
+        return end
+
+    def find(self, sub, start):
+        # // text.find(sub, start), answered by the last search for sub when it covers start
+        previous = self.found.get(sub)
+        if previous is not None and previous[0] <= start and (previous[1] == -1 or start <= previous[1]):
+            return previous[1]
+        index = self.text.find(sub, start)
+        self.found[sub] = (start, index)
+        return index
+
+
+class RepairContext:
+    '''
+     * The state of a single repair: the text, the current index in it, the
+     * generated output and the parse stack. All parse functions work on a
+     * context, so a JsonRepair engine holds its configuration only.
+    '''
+    __slots__ = ('i', 'text', 'output', 'stack', 'onCheckpoint', 'onRepair', 'path', 'stringRetry', 'limits',
+                 'skipped', 'openString')
+
     _controlCharacters = {
         '\b': '\\b',
         '\f': '\\f',
@@ -26,7 +191,7 @@ class JsonRepair:
         '"': '"',
         '\\': '\\',
         '/': '/',
-        #    b: '\b',
+        'b': '\b',
         'f': "\x0c",
         'n': '\n',
         'r': '\r',
@@ -34,10 +199,20 @@ class JsonRepair:
         # note that \u is handled separately in parseString()
     }
 
-    def __init__(self):
-        self.i = 0
-        self.text = ""
-        self.output = ""
+    def __init__(self, text, output):
+        self.i = 0  # current index in text
+        self.text = text
+        self.output = output  # generated output, an OutputBuffer, a FormattingBuffer or an ObjectBuilder
+        self.stack = []  # open objects, arrays and function calls
+        self.onCheckpoint = None  # called at every member boundary, see IncrementalJsonRepair
+        self.onRepair = None  # called with the kind and input offset of every repair, see RepairTelemetry
+        self.path = None  # the path taken by the repair, see JsonRepair.lastPath
+        self.stringRetry = None  # (text, isEndQuote, start, end) of the last string that stopped at a delimiter
+        self.limits = None  # checks the limits of the repair after every value and scan step, see RepairLimits
+        self.skipped = None  # (start, end, error) of the records that were skipped, see repairRecords
+        # (start, isEndQuote, index, str1, stop) of a string that the text ends in, to continue
+        # scanning it when more text comes in, see IncrementalJsonRepair. None when not kept
+        self.openString = None
 
     def escapeCharacters(self, char):
         if char in self._escapeCharacters:
@@ -45,49 +220,255 @@ class JsonRepair:
         else:
             return None
 
-    def jsonrepair(self, text):
-        self.i = 0  # current index in text
-        self.output = ''  # generated output
-        self.text = text
+    # // skips the members of an object or array that follow at a member boundary: returns
+    # // whether it did, or PENDING when it opened a nested value on the parse stack, see
+    # // ScanningContext. None: every member is parsed
+    skipMembers = None
+
+    def repair(self, validateFirst):
+        text = self.text
+        if validateFirst:
+            failure = None
+            try:
+                _validator.decode(text)
+            except json.JSONDecodeError as err:
+                # // resumed after the except block, so the errors of the repair are not chained to it
+                failure = err.pos
+            except ValueError:
+                # NaN or Infinity, let the repair parser handle it
+                pass
+            except RecursionError:
+                # nested too deep for the validator, the repair parser has no depth limit
+                pass
+            else:
+                # valid JSON: return the input as is, or formatted by a FormattingBuffer
+                self.countPath(PATH_VALID)
+                self.output.appendValid(text)
+                return self.output.getvalue()
+            if failure is not None and self.resumeAt(failure):
+                return self.parseRootEnd()
+
+        self.countPath(PATH_REPAIRED)
+        processed = self.parseValue()
+        if not processed:
+            self.throwUnexpectedEnd()
 
+        return self.parseRootEnd()
+
+    # /**
+    #  * Repair the text into the ObjectBuilder of this context, see JsonRepair.loads
+    #  */
+    def repairObjects(self, validateFirst, object_hook, parse_float, parse_int):
+        text = self.text
+        if validateFirst:
+            failure = None
+            try:
+                value = json.loads(text, object_hook=object_hook, parse_float=parse_float, parse_int=parse_int,
+                                   parse_constant=_rejectConstant)
+            except json.JSONDecodeError as err:
+                failure = err.pos
+            except (ValueError, RecursionError):
+                # // NaN or Infinity, or nested too deep: repair it from the start
+                pass
+            else:
+                self.countPath(PATH_VALID)
+                return value
+            # // the objects of the valid prefix are built by the json module as well
+            if failure is not None and self.resumeAt(failure):
+                return self.parseRootEnd()
+
+        self.countPath(PATH_REPAIRED)
         processed = self.parseValue()
         if not processed:
             self.throwUnexpectedEnd()
 
+        return self.parseRootEnd()
+
+    # /**
+    #  * Repair newline delimited JSON into an array of its records. A record that
+    #  * cannot be repaired is skipped: the repair continues at the next line that
+    #  * starts with a value, and (start, end, error) of the skipped text is added
+    #  * to self.skipped. See repair_ndjson
+    #  */
+    def repairRecords(self):
+        self.skipped = []
+        self.countPath(PATH_REPAIRED)
+        self.parseNewlineDelimitedJSON()
+
+        return self.output.getvalue()
+
+    def countPath(self, path):
+        self.path = path
+
+    # /**
+    #  * Resume repairing a document of which text[0:failure] is a valid JSON prefix.
+    #  * The prefix is copied as is up to the last comma or opening bracket of the
+    #  * innermost container, and the containers that are still open at that point
+    #  * are parsed and closed from there. Returns False when there is no such
+    #  * resume point, in that case the document must be repaired from the start.
+    #  */
+    def resumeAt(self, failure):
+        containers = None
+        if failure >= structuralindex.INDEX_THRESHOLD:
+            containers = structuralindex.openContainers(self.text, failure)
+        if containers is None:
+            containers = self.openContainers(failure)
+        openers, resume, initial, rootEnd = containers
+
+        if openers:
+            self.countPath(PATH_RESUMED)
+            self.i = resume
+            self.output.appendValid(self.text, openers, self.i)
+            for opener in openers:
+                # // the containers around the innermost one wait for their current value
+                frame = Frame(self.text[opener], STATE_VALUE)
+                frame.initial = False
+                frame.processedColon = True
+                self.stack.append(frame)
+            frame.initial = initial
+            frame.state = STATE_OPEN if frame.initial else STATE_MEMBER
+            self.parseStack(0, None)
+            return True
+
+        if rootEnd is not None:
+            # the root level object or array is valid, the failure comes after it
+            self.countPath(PATH_RESUMED)
+            self.i = rootEnd
+            self.output.appendValid(self.text, (), rootEnd)
+            self.parseWhitespaceAndSkipComments()
+            return True
+
+        return False
+
+    # /**
+    #  * Walk the tokens of the valid JSON prefix text[0:failure]. Returns the
+    #  * offsets of the opening brackets of the containers that are open at its
+    #  * end, the index of the last comma or opening bracket of the innermost one,
+    #  * whether that is its opening bracket, and the end of the root level object
+    #  * or array when it is closed. Long prefixes are indexed with NumPy instead,
+    #  * see structuralindex.
+    #  */
+    def openContainers(self, failure):
+        stack = []  # [opening bracket, resume index, initial] for every open container
+        rootEnd = None
+        for match in _structuralToken.finditer(self.text, 0, failure):
+            char = match.group()
+            if char == '{' or char == '[':
+                stack.append([match.start(), match.end(), True])
+            elif char == '}' or char == ']':
+                stack.pop()
+                if not stack:
+                    rootEnd = match.end()
+            elif char == ',':
+                stack[-1][1] = match.start()
+                stack[-1][2] = False
+            elif char == '"':
+                # unterminated string, the failure is inside of it
+                break
+
+        if not stack:
+            return [], None, False, rootEnd
+        return [opener for opener, resume, initial in stack], stack[-1][1], stack[-1][2], rootEnd
+
+    # /**
+    #  * Parse what follows after the root level value
+    #  */
+    def parseRootEnd(self):
         processedComma = self.parseCharacter(codeComma)
         if processedComma:
             self.parseWhitespaceAndSkipComments()
 
-        if (self.i < len(self.text)) and isStartOfValue(self.text[self.i]) and endsWithCommaOrNewline(self.output):
+        if (self.i < len(self.text)) and isStartOfValue(self.text[self.i]) and self.output.endsWithCommaOrNewline():
             # // start of a new value after end of the root level object: looks like
             # // newline delimited JSON -> turn into a root level array
             if not processedComma:
                 # // repair missing comma
-                self.output = insertBeforeLastWhitespace(self.output, ',')
+                if self.onRepair is not None:
+                    self.onRepair(REPAIR_MISSING_COMMA, self.i)
+                self.output.insertBeforeLastWhitespace(',')
 
             self.parseNewlineDelimitedJSON()
         elif processedComma:
             # // repair: remove trailing comma
-            self.output = stripLastOccurrence(self.output, ',')
+            if self.onRepair is not None:
+                self.onRepair(REPAIR_TRAILING_COMMA, self.i)
+            self.output.stripLastOccurrence(',')
 
         # // repair redundant end quotes
         while ((charCodeAt(self.text, self.i) == codeClosingBrace) or (
                 charCodeAt(self.text, self.i) == codeClosingBracket)):
+            if self.onRepair is not None:
+                self.onRepair(REPAIR_REDUNDANT_END_BRACKET, self.i)
+            if self.limits is not None:
+                self.limits.step(self)
             self.i = self.i + 1
             self.parseWhitespaceAndSkipComments()
 
         if self.i >= len(self.text):
             # // reached the end of the document properly
-            return self.output
+            return self.output.getvalue()
 
         self.throwUnexpectedCharacter()
 
+    # /**
+    #  * Parse a value. Objects, arrays and function calls are not parsed
+    #  * recursively: they are kept on self.stack, so there is no limit on the
+    #  * nesting depth.
+    #  */
     def parseValue(self):
+        base = len(self.stack)
+        processed = self.beginValue()
+        if processed is PENDING:
+            processed = self.parseStack(base, None)
+
+        return processed
+
+    # /**
+    #  * Parse a value, or open it on the parse stack and return PENDING when it
+    #  * is an object, array or function call
+    #  */
+    def beginValue(self):
         self.parseWhitespaceAndSkipComments()
-        processed = self.parseObject() or self.parseArray() or self.parseString() or self.parseNumber() or self.parseKeywords() or self.parseUnquotedString() or self.parseWhitespaceAndSkipComments()
+        # // the first character decides which parse function handles the value
+        parse = self.valueParsers.get(charAt(self.text, self.i))
+        if parse is not None:
+            processed = parse(self)
+        else:
+            processed = self.parseUnquotedString(True)
+        if self.limits is not None:
+            self.limits.check(self)
+        if processed is not PENDING:
+            self.parseWhitespaceAndSkipComments()
+
+        return processed
+
+    # /**
+    #  * Continue parsing the containers on the parse stack until it is back at
+    #  * depth base. processed is the result of the last parsed value.
+    #  */
+    def parseStack(self, base, processed):
+        stack = self.stack
+        while len(stack) > base:
+            frame = stack[-1]
+            if frame.kind == FRAME_OBJECT:
+                processed = self.continueObject(frame, processed)
+            elif frame.kind == FRAME_ARRAY:
+                processed = self.continueArray(frame, processed)
+            else:
+                processed = self.continueCall(frame, processed)
 
         return processed
 
+    # /**
+    #  * Close the container on top of the parse stack
+    #  */
+    def closeFrame(self, frame):
+        self.stack.pop()
+        if frame.isValue:
+            self.parseWhitespaceAndSkipComments()
+
+        return True
+
     def parseWhitespaceAndSkipComments(self):
         start = self.i
 
@@ -95,6 +476,8 @@ class JsonRepair:
         while True:
             changed = self.parseComment()
             if changed:
+                if self.limits is not None:
+                    self.limits.step(self)
                 changed = self.parseWhitespace()
             else:
                 break
@@ -102,39 +485,45 @@ class JsonRepair:
         return self.i > start
 
     def parseWhitespace(self):
-        whitespace = ''
-        normal = isWhitespace(charCodeAt(self.text, self.i))
-        while normal or isSpecialWhitespace(charCodeAt(self.text, self.i)):
-            if normal:
-                whitespace = whitespace + self.text[self.i]
-            else:
+        match = regexWhitespaceRun.match(self.text, self.i)
+        if match:
+            whitespace = match.group()
+            self.i = match.end()
+            if not whitespace.isascii():
                 # // repair special whitespace
-                whitespace = whitespace + ' '
-            normal = isWhitespace(charCodeAt(self.text, self.i))
-
-            self.i = self.i + 1
-
-        if len(whitespace) > 0:
-            self.output = self.output + whitespace
+                if self.onRepair is not None:
+                    self.onRepair(REPAIR_SPECIAL_WHITESPACE, match.start())
+                whitespace = whitespace.translate(specialWhitespaceToSpace)
+            if not self.output.dropsWhitespace:
+                self.output.append(whitespace)
+            elif '\n' in whitespace:
+                # // an output that drops the whitespace only keeps whether it had a newline
+                self.output.append('\n')
             return True
         else:
             return False
 
     def parseComment(self):
+        if not self.text.startswith('/', self.i):
+            return False
+
         # // find a block comment '/* ... */'
-        if (charCodeAt(self.text, self.i) == codeSlash) and charCodeAt(self.text, self.i + 1) == codeAsterisk:
+        if self.text.startswith('/*', self.i):
             # // repair block comment by skipping it
-            while self.i < len(self.text) and not self.atEndOfBlockComment(self.text, self.i):
-                self.i = self.i + 1
-            self.i = self.i + 2
+            if self.onRepair is not None:
+                self.onRepair(REPAIR_COMMENT, self.i)
+            end = self.text.find('*/', self.i + 1)
+            self.i = end + 2 if end != -1 else len(self.text)
 
             return True
 
         # // find a line comment '// ...'
-        if (charCodeAt(self.text, self.i) == codeSlash) and (charCodeAt(self.text, self.i + 1) == codeSlash):
+        if self.text.startswith('//', self.i):
             # // repair line comment by skipping it
-            while (self.i < len(self.text)) and (charCodeAt(self.text, self.i) != codeNewline):
-                self.i = self.i + 1
+            if self.onRepair is not None:
+                self.onRepair(REPAIR_COMMENT, self.i)
+            end = self.text.find('\n', self.i)
+            self.i = end if end != -1 else len(self.text)
 
             return True
 
@@ -142,7 +531,7 @@ class JsonRepair:
 
     def parseCharacter(self, code):
         if charCodeAt(self.text, self.i) == code:
-            self.output = self.output + self.text[self.i]
+            self.output.append(self.text[self.i])
             self.i = self.i + 1
             return True
         else:
@@ -171,6 +560,8 @@ class JsonRepair:
                 charCodeAt(self.text, self.i + 2) == codeDot
         ):
             # // repair: remove the ellipsis (three dots) and optionally a comma
+            if self.onRepair is not None:
+                self.onRepair(REPAIR_ELLIPSIS, self.i)
             self.i = self.i + 3
             self.parseWhitespaceAndSkipComments()
             self.skipCharacter(codeComma)
@@ -184,112 +575,217 @@ class JsonRepair:
     #  */
     def parseObject(self):
         if charCodeAt(self.text, self.i) == codeOpeningBrace:
-            self.output = self.output + '{'
+            self.output.append('{')
             self.i = self.i + 1
+            self.stack.append(Frame(FRAME_OBJECT))
+
+            return PENDING
+
+        return False
+
+    # /**
+    #  * Continue parsing the members of an object and its closing brace.
+    #  * Returns PENDING when a nested value is opened on the parse stack.
+    #  */
+    def continueObject(self, frame, processed):
+        state = frame.state
+        if state == STATE_OPEN:
             self.parseWhitespaceAndSkipComments()
 
             # // repair: skip leading comma like in {, message: "hi"}
             if self.skipCharacter(codeComma):
+                if self.onRepair is not None:
+                    self.onRepair(REPAIR_LEADING_COMMA, self.i - 1)
                 self.parseWhitespaceAndSkipComments()
+            state = STATE_MEMBER
 
-            initial = True
-            while (self.i < len(self.text)) and (charCodeAt(self.text, self.i) != codeClosingBrace):
-                if not initial:
+        while True:
+            if state == STATE_MEMBER:
+                if self.skipMembers is not None:
+                    skipped = self.skipMembers(frame)
+                    if skipped is PENDING:
+                        frame.state = STATE_VALUE
+                        return PENDING
+                    if skipped:
+                        continue
+                if (self.i >= len(self.text)) or (charCodeAt(self.text, self.i) == codeClosingBrace):
+                    break
+
+                if not frame.initial:
+                    if self.onCheckpoint is not None and self.text[self.i] == ',':
+                        self.onCheckpoint()
                     processedComma = self.parseCharacter(codeComma)
                     if not processedComma:
                         # // repair missing comma
-                        self.output = insertBeforeLastWhitespace(self.output, ',')
+                        if self.onRepair is not None:
+                            self.onRepair(REPAIR_MISSING_COMMA, self.i)
+                        self.output.insertBeforeLastWhitespace(',')
                     self.parseWhitespaceAndSkipComments()
                 else:
-                    processedComma = True
-                    initial = False
+                    frame.initial = False
 
                 self.skipEllipsis()
 
-                processedKey = self.parseString() or self.parseUnquotedString()
+                processedKey = self.parseString() or self.parseUnquotedString(False)
+                if processedKey is PENDING:
+                    frame.state = STATE_KEY
+                    return PENDING
                 if not processedKey:
                     if (
                             (charCodeAt(self.text, self.i) == codeClosingBrace) or
                             (charCodeAt(self.text, self.i) == codeOpeningBrace) or
                             (charCodeAt(self.text, self.i) == codeClosingBracket) or
                             (charCodeAt(self.text, self.i) == codeOpeningBracket) or
-                            (self.i > len(self.text))
+                            (self.i >= len(self.text))
                     ):
                         # // repair trailing comma
-                        self.output = stripLastOccurrence(self.output, ',')
+                        if self.onRepair is not None:
+                            self.onRepair(REPAIR_TRAILING_COMMA, self.i)
+                        self.output.stripLastOccurrence(',')
                     else:
                         self.throwObjectKeyExpected()
                     break
+                state = STATE_KEY
 
+            if state == STATE_KEY:
                 self.parseWhitespaceAndSkipComments()
                 processedColon = self.parseCharacter(codeColon)
                 truncatedText = (self.i >= len(self.text))
                 if not processedColon:
-                    if isStartOfValue(self.text[self.i]) or truncatedText:
+                    if truncatedText or isStartOfValue(self.text[self.i]):
                         # // repair missing colon
-                        self.output = insertBeforeLastWhitespace(self.output, ':')
+                        if self.onRepair is not None:
+                            self.onRepair(REPAIR_MISSING_COLON, self.i)
+                        self.output.insertBeforeLastWhitespace(':')
                     else:
                         self.throwColonExpected()
-                processedValue = self.parseValue()
-                if not processedValue:
-                    if processedColon or truncatedText:
+                frame.processedColon = processedColon
+                frame.truncatedText = truncatedText
+                processed = self.beginValue()
+                if processed is PENDING:
+                    frame.state = STATE_VALUE
+                    return PENDING
+                state = STATE_VALUE
+
+            if state == STATE_VALUE:
+                if not processed:
+                    if frame.processedColon or frame.truncatedText:
                         # // repair missing object value
-                        self.output = self.output + 'null'
+                        if self.onRepair is not None:
+                            self.onRepair(REPAIR_MISSING_VALUE, self.i)
+                        self.output.append('null')
                     else:
                         self.throwColonExpected()
+                state = STATE_MEMBER
 
-            if charCodeAt(self.text, self.i) == codeClosingBrace:
-                self.output += '}'
-                self.i = self.i + 1
-            else:
-                # // repair missing end bracket
-                self.output = insertBeforeLastWhitespace(self.output, '}')
-
-            return True
+        if charCodeAt(self.text, self.i) == codeClosingBrace:
+            self.output.append('}')
+            self.i = self.i + 1
+        else:
+            # // repair missing end bracket
+            if self.onRepair is not None:
+                self.onRepair(REPAIR_MISSING_END_BRACKET, self.i)
+            self.output.insertBeforeLastWhitespace('}')
 
-        return False
+        return self.closeFrame(frame)
 
     # /**
     #  * Parse an array like '["item1", "item2", ...]'
     #  */
     def parseArray(self):
         if charCodeAt(self.text, self.i) == codeOpeningBracket:
-            self.output += '['
+            self.output.append('[')
             self.i = self.i + 1
+            self.stack.append(Frame(FRAME_ARRAY))
+
+            return PENDING
+
+        return False
+
+    # /**
+    #  * Continue parsing the items of an array and its closing bracket.
+    #  * Returns PENDING when a nested value is opened on the parse stack.
+    #  */
+    def continueArray(self, frame, processed):
+        closing = False
+        if frame.state == STATE_OPEN:
             self.parseWhitespaceAndSkipComments()
 
             # // repair: skip leading comma like in [,1,2,3]
             if self.skipCharacter(codeComma):
+                if self.onRepair is not None:
+                    self.onRepair(REPAIR_LEADING_COMMA, self.i - 1)
                 self.parseWhitespaceAndSkipComments()
+        elif frame.state == STATE_VALUE and not processed:
+            # // repair trailing comma
+            if self.onRepair is not None:
+                self.onRepair(REPAIR_TRAILING_COMMA, self.i)
+            self.output.stripLastOccurrence(',')
+            closing = True
+
+        while not closing and self.i < len(self.text) and charCodeAt(self.text, self.i) != codeClosingBracket:
+            if self.skipMembers is not None:
+                skipped = self.skipMembers(frame)
+                if skipped is PENDING:
+                    frame.state = STATE_VALUE
+                    return PENDING
+                if skipped:
+                    continue
+            if not frame.initial:
+                if self.onCheckpoint is not None and self.text[self.i] == ',':
+                    self.onCheckpoint()
+                processedComma = self.parseCharacter(codeComma)
+                if not processedComma:
+                    # // repair missing comma
+                    if self.onRepair is not None:
+                        self.onRepair(REPAIR_MISSING_COMMA, self.i)
+                    self.output.insertBeforeLastWhitespace(',')
+            else:
+                frame.initial = False
+
+            self.skipEllipsis()
+
+            processedValue = self.beginValue()
+            if processedValue is PENDING:
+                frame.state = STATE_VALUE
+                return PENDING
+            if not processedValue:
+                # // repair trailing comma
+                if self.onRepair is not None:
+                    self.onRepair(REPAIR_TRAILING_COMMA, self.i)
+                self.output.stripLastOccurrence(',')
+                break
 
-            initial = True
-            while self.i < len(self.text) and charCodeAt(self.text, self.i) != codeClosingBracket:
-                if not initial:
-                    processedComma = self.parseCharacter(codeComma)
-                    if not processedComma:
-                        # // repair missing comma
-                        self.output = insertBeforeLastWhitespace(self.output, ',')
-                else:
-                    initial = False
-
-                self.skipEllipsis()
+        if charCodeAt(self.text, self.i) == codeClosingBracket:
+            self.output.append(']')
+            self.i = self.i + 1
+        else:
+            # // repair missing closing array bracket
+            if self.onRepair is not None:
+                self.onRepair(REPAIR_MISSING_END_BRACKET, self.i)
+            self.output.insertBeforeLastWhitespace(']')
 
-                processedValue = self.parseValue()
-                if not processedValue:
-                    # // repair trailing comma
-                    self.output = stripLastOccurrence(self.output, ',')
-                    break
+        return self.closeFrame(frame)
 
-            if charCodeAt(self.text, self.i) == codeClosingBracket:
-                self.output += ']'
+    # /**
+    #  * Continue parsing the argument of a function call like NumberLong("2")
+    #  * and skip its closing parenthesis
+    #  */
+    def continueCall(self, frame, processed):
+        if frame.state == STATE_OPEN:
+            processed = self.beginValue()
+            if processed is PENDING:
+                frame.state = STATE_VALUE
+                return PENDING
+
+        if charCodeAt(self.text, self.i) == codeCloseParenthesis:
+            # // repair: skip close bracket of function call
+            self.i = self.i + 1
+            if charCodeAt(self.text, self.i) == codeSemicolon:
+                # // repair: skip semicolon after JSONP call
                 self.i = self.i + 1
-            else:
-                # // repair missing closing array bracket
-                self.output = insertBeforeLastWhitespace(self.output, ']')
 
-            return True
-
-        return False
+        return self.closeFrame(frame)
 
     # /**
     #  * Parse and repair Newline Delimited JSON (NDJSON):
@@ -297,6 +793,8 @@ class JsonRepair:
     #  */
     def parseNewlineDelimitedJSON(self):
         # // repair NDJSON
+        if self.onRepair is not None and self.skipped is None:
+            self.onRepair(REPAIR_NDJSON, self.i)
         initial = True
         processedValue = True
         while processedValue:
@@ -305,18 +803,54 @@ class JsonRepair:
                 processedComma = self.parseCharacter(codeComma)
                 if not processedComma:
                     # // repair: add missing comma
-                    self.output = insertBeforeLastWhitespace(self.output, ',')
+                    if self.onRepair is not None:
+                        self.onRepair(REPAIR_MISSING_COMMA, self.i)
+                    self.output.insertBeforeLastWhitespace(',')
             else:
                 initial = False
 
-            processedValue = self.parseValue()
+            processedValue = self.parseRecord()
 
         if not processedValue:
             # // repair: remove trailing comma
-            self.output = stripLastOccurrence(self.output, ',')
+            if self.onRepair is not None:
+                self.onRepair(REPAIR_TRAILING_COMMA, self.i)
+            self.output.stripLastOccurrence(',')
 
         # // repair: wrap the output inside array brackets
-        self.output = '[\n${self.output}\n]'
+        self.output.prepend('[\n')
+        self.output.append('\n')
+        self.output.append(']')
+
+    # /**
+    #  * Parse a root level record of newline delimited JSON. When records are
+    #  * skipped (see repairRecords), a record that cannot be repaired is dropped
+    #  * from the output, and the next record is parsed in its place.
+    #  */
+    def parseRecord(self):
+        if self.skipped is None:
+            return self.parseValue()
+
+        while True:
+            self.parseWhitespaceAndSkipComments()
+            start = self.i
+            length = len(self.output)
+            try:
+                processed = self.parseValue()
+                if processed or self.i >= len(self.text):
+                    return processed
+                self.throwUnexpectedCharacter()
+            except JSONRepairError as err:
+                if type(err) is not JSONRepairError:
+                    # // a JSONRepairLimitError ends the whole repair
+                    raise
+                # // continue at the first line after the error that starts with a value
+                boundary = _recordBoundary.search(self.text, max(start, err.args[1]))
+                end = boundary.end() if boundary is not None else len(self.text)
+                self.skipped.append((start, end, err))
+                self.output.truncateRecord(length)
+                self.stack = []
+                self.i = end
 
     # /**
     #  * Parse a string enclosed by double quotes "...". Can contain escaped quotes
@@ -326,14 +860,36 @@ class JsonRepair:
     #  * The function can run in two stages:
     #  * - First, it assumes the string has a valid end quote
     #  * - If it turns out that the string does not have a valid end quote followed
-    #  *   by a delimiter (which should be the case), the function runs again in a
-    #  *   more conservative way, stopping the string at the first next delimiter
-    #  *   and fixing the string by inserting a quote there.
+    #  *   by a delimiter (which should be the case), the string ends at the first
+    #  *   next delimiter instead (stopAtDelimiter), and the missing end quote is
+    #  *   inserted there
+    #  *
+    #  * Both stages are done in a single forward pass: the first stage remembers
+    #  * where the second stage would stop, and which strings the second stage is
+    #  * needed for (see stopString). The lookahead after an end quote does not
+    #  * touch the output. So the time stays linear in the length of the text,
+    #  * whatever the number of stray quotes.
+    #  *
+    #  * Concatenated strings like "a" + "b" are merged into one string,
+    #  * unless concatenate is False.
     #  */
-    def parseString(self, stopAtDelimiter=False):
+    def parseString(self, stopAtDelimiter=False, concatenate=True):
+        while True:
+            processed = self.scanString(stopAtDelimiter, concatenate)
+            if processed is not _retryString:
+                return processed
+
+            # // retry parsing the string, stopping at the first next delimiter
+            if self.onRepair is not None:
+                self.onRepair(REPAIR_STRING_RETRY, self.i)
+            stopAtDelimiter = True
+
+    def scanString(self, stopAtDelimiter, concatenate):
         skipEscapeChars = charCodeAt(self.text, self.i) == codeBackslash
         if skipEscapeChars:
             # // repair: remove the first escape character
+            if self.onRepair is not None:
+                self.onRepair(REPAIR_ESCAPED_STRING, self.i)
             self.i = self.i + 1
             skipEscapeChars = True
 
@@ -350,79 +906,122 @@ class JsonRepair:
                 isEndQuote = isSingleQuoteLike
             else:
                 isEndQuote = isDoubleQuoteLike
+            if self.onRepair is not None and isEndQuote is not isDoubleQuote:
+                self.onRepair(REPAIR_QUOTES, self.i)
 
             iBefore = self.i
-            oBefore = len(self.output)
+            if not stopAtDelimiter and not skipEscapeChars:
+                retry = self.stringRetry
+                if (retry is not None and retry[0] is self.text and retry[1] is isEndQuote and
+                        retry[2] < iBefore < retry[3]):
+                    # // a previous string of this kind, starting in front of this one, needed
+                    # // to stop at a delimiter because of a quote or the end of the text after
+                    # // this string: the first stage of this string would find the same
+                    if self.onRepair is not None:
+                        self.onRepair(REPAIR_STRING_RETRY, iBefore)
+                    if retry[3] >= len(self.text):
+                        self.onCheckpoint = None
+                    stopAtDelimiter = True
+            regexRun = regexStringRunUntilDelimiter if stopAtDelimiter else regexStringRun
+            # // (index, length of str1) where the string stops when stopping at delimiters,
+            # // and whether it stops at an end quote there
+            stop = None
+            lookahead = None
 
             str1 = '"'
             self.i = self.i + 1
 
+            # // the scan of a string up to an index depends on the text in front of that
+            # // index only, so a string that the text ended in continues where it was
+            keepOpen = self.openString is not None and not stopAtDelimiter and not skipEscapeChars
+            if keepOpen:
+                openString = self.openString
+                if openString and openString[0] == iBefore and openString[1] is isEndQuote:
+                    self.i, str1, stop = openString[2:]
+            # // the scan state to continue from, None after an escape character that the text cut off
+            progress = None
+            # // a run of valid characters or a character that needs a repair is a step of the limits
+            limits = self.limits
+
             while True:
+                if limits is not None:
+                    limits.step(self)
+                if keepOpen:
+                    progress = (self.i, str1, stop) if progress is not False else False
                 if self.i >= len(self.text):
+                    if progress:
+                        self.openString = (iBefore, isEndQuote) + progress
                     # // end of text, we are missing an end quote
                     iPrev = self.prevNonWhitespaceIndex(self.i - 1)
                     if not stopAtDelimiter and isDelimiter(charAt(self.text, iPrev)):
                         # // if the text ends with a delimiter, like ["hello],
                         # // so the missing end quote should be inserted before this delimiter
-                        # // retry parsing the string, stopping at the first next delimiter
-                        self.i = iBefore
-                        self.output = self.output.substring(0, oBefore)
+                        # // the string now depends on where the text ends, which can still
+                        # // change in an incremental repair: no more checkpoints after it
+                        self.onCheckpoint = None
 
-                        return self.parseString(True)
+                        return self.stopString(iBefore, isEndQuote, skipEscapeChars, stop, str1, concatenate)
 
                     # // repair missing quote
+                    if self.onRepair is not None:
+                        self.onRepair(REPAIR_MISSING_QUOTE, self.i)
                     str1 = insertBeforeLastWhitespace(str1, '"')
-                    self.output += str1
+                    self.output.append(str1)
 
                     return True
                 elif isEndQuote(charCodeAt(self.text, self.i)):
                     # // end quote
-                    # // let us check what is before and after the quote to verify whether this is a legit end quote
+                    # // let us check what is after and before the quote to verify whether this is a legit end quote
                     iQuote = self.i
-                    oQuote = len(str1)
-                    str1 += '"'
-                    self.i = self.i + 1
-                    self.output += str1
-
-                    self.parseWhitespaceAndSkipComments()
-
+                    if stop is None:
+                        stop = (iQuote, len(str1), True)
+                    self.i = iQuote + 1
+                    if not stopAtDelimiter:
+                        # // look over the whitespace and comments after the quote without parsing them
+                        ahead = regexWhitespaceRun.match(self.text, self.i)
+                        ahead = ahead.end() if ahead is not None else self.i
+                        if self.text.startswith(('/*', '//'), ahead):
+                            if lookahead is None:
+                                lookahead = Lookahead(self.text)
+                            ahead = lookahead.skip(ahead)
                     if (
                             stopAtDelimiter or
-                            self.i >= len(self.text) or
-                            isDelimiter(charAt(self.text, self.i)) or
-                            isQuote(charCodeAt(self.text, self.i)) or
-                            isDigit(charCodeAt(self.text, self.i))
+                            ahead >= len(self.text) or
+                            (charClasses.get(self.text[ahead], 0) & (classDelimiter | classQuote | classDigit))
                     ):
                         # // The quote is followed by the end of the text, a delimiter, or a next value
                         # // so the quote is indeed the end of the string
-                        self.parseConcatenatedString()
+                        str1 += '"'
+                        self.output.append(str1)
+                        self.parseWhitespaceAndSkipComments()
+                        if concatenate:
+                            self.parseConcatenatedString()
 
                         return True
 
                     if isDelimiter(charAt(self.text, self.prevNonWhitespaceIndex(iQuote - 1))):
                         # // This is not the right end quote: it is preceded by a delimiter,
                         # // and NOT followed by a delimiter. So, there is an end quote missing
-                        # // parse the string again and then stop at the first next delimiter
-                        self.i = iBefore
-                        self.output = self.output[0:oBefore]
-
-                        return self.parseString(True)
-
-                    # // revert to right after the quote but before any whitespace, and continue parsing the string
-                    self.output = self.output[0:oBefore]
-                    self.i = iQuote + 1
-
-                    # // repair unescaped quote
-                    str1 = str1.substring(0, oQuote) + '\\' + str1.substring(oQuote)
+                        # // stop the string at the first next delimiter
+                        self.i = iQuote
+                        return self.stopString(iBefore, isEndQuote, skipEscapeChars, stop, str1, concatenate)
+
+                    # // repair unescaped quote, and continue parsing the string right after it
+                    if self.onRepair is not None:
+                        self.onRepair(REPAIR_UNESCAPED_QUOTE, iQuote)
+                    str1 += '\\"'
                 elif stopAtDelimiter and isDelimiter(self.text[self.i]):
                     # // we're in the mode to stop the string at the first delimiter
                     # // because there is an end quote missing
 
                     # // repair missing quote
+                    if self.onRepair is not None:
+                        self.onRepair(REPAIR_MISSING_QUOTE, self.i)
                     str1 = insertBeforeLastWhitespace(str1, '"')
-                    self.output += str1
+                    self.output.append(str1)
 
-                    self.parseConcatenatedString()
+                    if concatenate:
+                        self.parseConcatenatedString()
 
                     return True
                 elif charCodeAt(self.text, self.i) == codeBackslash:
@@ -442,25 +1041,55 @@ class JsonRepair:
                             self.i += 6
                         elif self.i + j >= len(self.text):
                             # // repair invalid or truncated unicode char at the end of the text
+                            if self.onRepair is not None:
+                                self.onRepair(REPAIR_INVALID_UNICODE, self.i)
+                            if keepOpen:
+                                self.openString = (iBefore, isEndQuote) + progress
+                                progress = False
                             # // by removing the unicode char and ending the string here
                             self.i = len(self.text)
                         else:
                             self.throwInvalidUnicodeCharacter()
                     else:
                         # // repair invalid escape character: remove it
-                        str1 += char
+                        if self.onRepair is not None:
+                            self.onRepair(REPAIR_INVALID_ESCAPE, self.i)
+                        if char is not None:
+                            str1 += char
+                        elif keepOpen:
+                            self.openString = (iBefore, isEndQuote) + progress
+                            progress = False
                         self.i += 2
                 else:
+                    # // consume content that needs no repair in one go
+                    run = regexRun.match(self.text, self.i)
+                    if run:
+                        if stop is None and not stopAtDelimiter:
+                            delimiter = regexDelimiterInRun.search(self.text, self.i, run.end())
+                            if delimiter is not None:
+                                stop = (delimiter.start(), len(str1) + delimiter.start() - self.i, False)
+                        str1 += run.group()
+                        self.i = run.end()
+                        if skipEscapeChars:
+                            self.skipEscapeCharacter()
+                        continue
+
                     # // handle regular characters
                     char = charAt(self.text, self.i)
                     code = charCodeAt(self.text, self.i)
 
                     if code == codeDoubleQuote and charCodeAt(self.text, self.i - 1) != codeBackslash:
                         # // repair unescaped double quote
+                        if self.onRepair is not None:
+                            self.onRepair(REPAIR_UNESCAPED_QUOTE, self.i)
                         str1 += '\\' + char
                         self.i = self.i + 1
                     elif isControlCharacter(code):
                         # // unescaped control character
+                        if stop is None and code == codeNewline:
+                            stop = (self.i, len(str1), False)
+                        if self.onRepair is not None:
+                            self.onRepair(REPAIR_CONTROL_CHARACTER, self.i)
                         str1 += self.controlCharacters(char)
                         self.i = self.i + 1
                     else:
@@ -475,6 +1104,48 @@ class JsonRepair:
 
         return False
 
+    def stopString(self, iBefore, isEndQuote, skipEscapeChars, stop, str1, concatenate):
+        '''
+         * End the string where the second stage of parseString, which stops at the
+         * first delimiter, would end it: at stop, found by the first stage. self.i
+         * is the quote or the end of the text that made the first stage fail.
+        '''
+        if skipEscapeChars:
+            # // the second stage keeps the escape characters that the first stage
+            # // skipped: parse the string again
+            self.i = iBefore
+            return _retryString
+
+        if self.onRepair is not None:
+            self.onRepair(REPAIR_STRING_RETRY, iBefore)
+        # // the next strings of this kind in front of self.i fail in the same way
+        self.stringRetry = (self.text, isEndQuote, iBefore, self.i)
+
+        if stop is None:
+            # // no delimiter and no end quote till the end of the text
+            if self.onRepair is not None:
+                self.onRepair(REPAIR_MISSING_QUOTE, self.i)
+            self.output.append(insertBeforeLastWhitespace(str1, '"'))
+            return True
+
+        index, length, endQuote = stop
+        str1 = str1[0:length]
+        if endQuote:
+            self.i = index + 1
+            self.output.append(str1 + '"')
+            self.parseWhitespaceAndSkipComments()
+        else:
+            # // repair missing quote
+            self.i = index
+            if self.onRepair is not None:
+                self.onRepair(REPAIR_MISSING_QUOTE, self.i)
+            self.output.append(insertBeforeLastWhitespace(str1, '"'))
+
+        if concatenate:
+            self.parseConcatenatedString()
+
+        return True
+
     # /**
     #  * Repair concatenated strings like "hello" + "world", change this into "helloworld"
     #  */
@@ -488,15 +1159,20 @@ class JsonRepair:
             self.parseWhitespaceAndSkipComments()
 
             # // repair: remove the end quote of the first string
-            self.output = stripLastOccurrence(self.output, '"', True)
+            if self.onRepair is not None:
+                self.onRepair(REPAIR_CONCATENATED_STRING, self.i)
+            self.output.stripLastOccurrence('"', True)
             start = len(self.output)
-            parsedStr = self.parseString()
+            parsedStr = self.parseString(concatenate=False)
             if parsedStr:
                 # // repair: remove the start quote of the second string
-                self.output = removeAtIndex(self.output, start, 1)
+                self.output.removeAt(start, 1)
+                self.parseWhitespaceAndSkipComments()
             else:
                 # // repair: remove the + because it is not followed by a string
-                self.output = insertBeforeLastWhitespace(self.output, '"')
+                if self.onRepair is not None:
+                    self.onRepair(REPAIR_CONCATENATED_STRING, self.i)
+                self.output.insertBeforeLastWhitespace('"')
 
         return processed
 
@@ -504,6 +1180,15 @@ class JsonRepair:
     #  * Parse a number like 2.4 or 2.4e6
     #  */
     def parseNumber(self):
+        # // a number that needs no repair, in one go
+        match = regexNumber.match(self.text, self.i)
+        if match is not None:
+            end = match.end()
+            if end >= len(self.text) or (charClasses.get(self.text[end], 0) & (classDelimiter | classWhitespace)):
+                self.output.append(match.group())
+                self.i = end
+                return True
+
         start = self.i
         if charCodeAt(self.text, self.i) == codeMinus:
             self.i = self.i + 1
@@ -533,7 +1218,8 @@ class JsonRepair:
             while isDigit(charCodeAt(self.text, self.i)):
                 self.i = self.i + 1
 
-        if (charCodeAt(self.text, self.i) == codeLowercaseE) or (charCodeAt(self.text, self.i) == codeUppercaseE):
+        if ((charCodeAt(self.text, self.i) == codeLowercaseE) or (charCodeAt(self.text, self.i) == codeUppercaseE)) and (
+                isDigit(charCodeAt(self.text, self.i - 1))):
             self.i = self.i + 1
             if (charCodeAt(self.text, self.i) == codeMinus) or (charCodeAt(self.text, self.i) == codePlus):
                 self.i = self.i + 1
@@ -557,13 +1243,14 @@ class JsonRepair:
         if self.i > start:
             # // repair a number with leading zeros like "00789"
             num = self.text[start:self.i]
-            mask = re.compile(r'^0\d')
-            hasInvalidLeadingZero = mask.match(num)
+            hasInvalidLeadingZero = regexLeadingZero.match(num)
 
             if hasInvalidLeadingZero:
-                self.output += f'"{num}"'
+                if self.onRepair is not None:
+                    self.onRepair(REPAIR_LEADING_ZEROS, start)
+                self.output.append(f'"{num}"')
             else:
-                self.output += num
+                self.output.append(num)
             return True
 
         return False
@@ -573,57 +1260,61 @@ class JsonRepair:
     #  * Repair Python keywords True, False, None
     #  */
     def parseKeywords(self):
-        return (
-                self.parseKeyword('true', 'true') or
-                self.parseKeyword('false', 'false') or
-                self.parseKeyword('null', 'null') or
-                # // repair Python keywords True, False, None
-                self.parseKeyword('True', 'true') or
-                self.parseKeyword('False', 'false') or
-                self.parseKeyword('None', 'null')
-        )
-
-    def parseKeyword(self, name, value):
-        if self.text[self.i:self.i + len(name)] == name:
-            self.output = self.output + value
-            self.i = self.i + len(name)
-            return True
+        match = regexKeyword.match(self.text, self.i)
+        if match is None:
+            return False
 
-        return False
+        name = match.group()
+        value = _keywords[name]
+        if self.onRepair is not None and name != value:
+            self.onRepair(REPAIR_PYTHON_CONSTANT, self.i)
+        self.output.append(value)
+        self.i = match.end()
+        return True
+
+    # /**
+    #  * Parse functions of values that start with a character that can start
+    #  * more kinds of values, see valueParsers: when the value turns out not to
+    #  * be of the first kind, the next kinds are tried in the order of parseValue
+    #  */
+    def parseNumberOrUnquotedString(self):
+        return self.parseNumber() or self.parseUnquotedString(True)
+
+    def parseKeywordsOrUnquotedString(self):
+        return self.parseKeywords() or self.parseUnquotedString(True)
+
+    def parseEscapedStringOrValue(self):
+        return self.parseString() or self.parseNumber() or self.parseKeywords() or self.parseUnquotedString(True)
 
     # /**
     #  * Repair an unquoted string by adding quotes around it
     #  * Repair a MongoDB function call like NumberLong("2")
     #  * Repair a JSONP function call like callback({...});
     #  */
-    def parseUnquotedString(self):
+    def parseUnquotedString(self, isValue):
         # // note that the symbol can end with whitespaces: we stop at the next delimiter
         # // also, note that we allow strings to contain a slash / in order to support repairing regular expressions
         start = self.i
-        while ((self.i < len(self.text)) and not isDelimiterExceptSlash(self.text[self.i]) and not isQuote(
-                charCodeAt(self.text, self.i))):
-            self.i = self.i + 1
+        match = regexUnquotedRun.match(self.text, self.i)
+        if match:
+            self.i = match.end()
 
         if self.i > start:
             if ((charCodeAt(self.text, self.i) == codeOpenParenthesis) and isFunctionName(
                     self.text[start:self.i].strip())):
                 # // repair a MongoDB function call like NumberLong("2")
                 # // repair a JSONP function call like callback({...});
+                if self.onRepair is not None:
+                    self.onRepair(REPAIR_FUNCTION_CALL, start)
                 self.i = self.i + 1
+                self.stack.append(Frame(FRAME_CALL, STATE_OPEN, isValue))
 
-                self.parseValue()
-
-                if charCodeAt(self.text, self.i) == codeCloseParenthesis:
-                    # // repair: skip close bracket of function call
-                    self.i = self.i + 1
-                    if charCodeAt(self.text, self.i) == codeSemicolon:
-                        # // repair: skip semicolon after JSONP call
-                        self.i = self.i + 1
-
-                return True
+                return PENDING
             else:
                 # // repair unquoted string
                 # // also, repair undefined into null
+                if self.onRepair is not None:
+                    self.onRepair(REPAIR_UNQUOTED_STRING, start)
 
                 # // first, go back to prevent getting trailing whitespaces in the string
                 while isWhitespace(charCodeAt(self.text, self.i - 1)) and (self.i > 0):
@@ -631,9 +1322,9 @@ class JsonRepair:
 
                 symbol = self.text[start:self.i]
                 if symbol is None:
-                    self.output += 'null'
+                    self.output.append('null')
                 else:
-                    self.output += json.dumps(symbol)
+                    self.output.append(json.dumps(symbol))
 
                 if charCodeAt(self.text, self.i) == codeDoubleQuote:
                     # // we had a missing start quote, but now we encountered the end quote, so we can skip that one
@@ -641,6 +1332,8 @@ class JsonRepair:
 
                 return True
 
+        return False
+
     def prevNonWhitespaceIndex(self, start):
         prev = start
 
@@ -650,14 +1343,15 @@ class JsonRepair:
         return prev
 
     def atEndOfNumber(self):
-        return (self.i >= len(self.text)) or isDelimiter(self.text[self.i]) or isWhitespace(
-            charCodeAt(self.text, self.i))
+        return (self.i >= len(self.text)) or (charClasses.get(self.text[self.i], 0) & (classDelimiter | classWhitespace))
 
     def repairNumberEndingWithNumericSymbol(self, start):
         # // repair numbers cut off at the end
         # // this will only be called when we end after a '.', '-', or 'e' and does not
         # // change the number more than it needs to make it valid JSON
-        self.output += self.text[start:self.i] + '0'
+        if self.onRepair is not None:
+            self.onRepair(REPAIR_TRUNCATED_NUMBER, self.i)
+        self.output.append(self.text[start:self.i] + '0')
 
     def throwInvalidCharacter(self, char):
         raise JSONRepairError('Invalid character ' + json.dumps(char), self.i)
@@ -678,8 +1372,312 @@ class JsonRepair:
         chars = self.text[self.i:self.i + 6]
         raise JSONRepairError(f"Invalid unicode character {chars}", self.i)
 
-    def atEndOfBlockComment(self, text, i):
-        return text[i] == '*' and text[i + 1] == '/'
+    # parse function of a value by its first character, other characters start an unquoted string
+    valueParsers = {
+        '{': parseObject,
+        '[': parseArray,
+        '\\': parseEscapedStringOrValue,
+        **dict.fromkeys('"\u201c\u201d\'\u2018\u2019`\u00b4', parseString),
+        **dict.fromkeys('-.0123456789eE', parseNumberOrUnquotedString),
+        **dict.fromkeys('tfnTFN', parseKeywordsOrUnquotedString),
+    }
+
+
+class ScanningContext(RepairContext):
+    '''
+     * RepairContext that first tries to scan an object or array with the C
+     * accelerated scanner of the json module: a valid one needs no repairs
+     * and goes to the output as a whole, see appendScanned of the output. The
+     * members of the objects and arrays that contain a problem are skipped
+     * with a regular expression as long as their repairs are known from it,
+     * like quotes or a missing comma, and go to the output one by one, see
+     * skipMembers and appendMember. Only the rest is parsed by the repair
+     * parser. Its output is a DiagnosisOutput or an ObjectBuilder, which do
+     * not keep the repaired text. Scanning stops at a depth of
+     * SCAN_MAX_DEPTH, which bounds the rescanning of deeply nested broken
+     * documents.
+     *
+     * The JSONDecodeError of a failing scan counts the lines in front of it.
+     * Scanning stops when the offsets of the failing scans add up to
+     * SCAN_FAILURE_BUDGET times the length of the text, so documents of which
+     * most objects are broken, like the repr of Python objects, stay linear.
+    '''
+    __slots__ = ('scanBudget',)
+
+    def __init__(self, text, output):
+        super().__init__(text, output)
+        self.scanBudget = SCAN_FAILURE_BUDGET * len(text)
+
+    def scanValue(self):
+        if len(self.stack) < SCAN_MAX_DEPTH and self.scanBudget > 0:
+            try:
+                self.i = self.output.appendScanned(self.text, self.i)
+            except (StopIteration, ValueError, RecursionError):
+                # // invalid, NaN or Infinity, a too long int, or nested too deep
+                self.scanBudget -= self.i
+                return False
+            return True
+        return False
+
+    def parseObject(self):
+        if charCodeAt(self.text, self.i) == codeOpeningBrace and self.scanValue():
+            return True
+        return RepairContext.parseObject(self)
+
+    def parseArray(self):
+        if charCodeAt(self.text, self.i) == codeOpeningBracket and self.scanValue():
+            return True
+        return RepairContext.parseArray(self)
+
+    def skipMembers(self, frame):
+        '''
+         * Skip the members of an object or the items of an array that follow,
+         * see regexPlainMember, and report their repairs: a missing comma,
+         * quotes, a Python constant or concatenated strings. A nested object or
+         * array is scanned or opened on the parse stack, and its members are
+         * skipped in turn. It is closed here when its members end at its
+         * closing bracket or at the end of the text, else it is left open for
+         * the repair parser. Returns whether a member was skipped, or PENDING
+         * when a nested object or array is left open.
+        '''
+        text = self.text
+        if self.i >= len(text):
+            return False
+        retry = self.stringRetry
+        if retry is not None and self.i < retry[3]:
+            # // the strings in front of retry[3] stop at the first delimiter
+            return False
+        stack = self.stack
+        output = self.output
+        onRepair = self.onRepair
+        opened = 0  # the objects and arrays on top of frame that were opened here
+        skipped = False
+        while True:
+            match = (regexPlainMember if frame.kind == FRAME_OBJECT else regexPlainItem).match(text, self.i)
+            if match is None:
+                if opened and (self.i >= len(text) or text[self.i] == _closingBrackets[frame.kind]):
+                    if self.i < len(text):
+                        output.append(text[self.i])
+                        self.i = self.i + 1
+                        self.closeFrame(frame)
+                    else:
+                        # // like continueObject and continueArray at the end of the text
+                        if onRepair is not None:
+                            onRepair(REPAIR_MISSING_END_BRACKET, self.i)
+                        output.insertBeforeLastWhitespace(_closingBrackets[frame.kind])
+                        stack.pop()
+                    opened = opened - 1
+                    frame = stack[-1]
+                    if opened:
+                        frame.state = STATE_MEMBER
+                    continue
+                break
+            if match.group('comma') is None:
+                if not frame.initial and onRepair is not None:
+                    onRepair(REPAIR_MISSING_COMMA, self.i)
+            elif frame.initial:
+                # // a leading comma
+                break
+            frame.initial = False
+            skipped = True
+            if onRepair is not None:
+                if frame.kind == FRAME_OBJECT and match.group('singleKey') is not None:
+                    onRepair(REPAIR_QUOTES, match.start('singleKey'))
+                if match.group('singleValue') is not None:
+                    onRepair(REPAIR_QUOTES, match.start('singleValue'))
+                elif match.group('python') is not None:
+                    onRepair(REPAIR_PYTHON_CONSTANT, match.start('python'))
+                elif match.group('concatenated') is not None:
+                    position = match.start('concatenated')
+                    while position < match.end('concatenated'):
+                        concatenation = regexConcatenation.match(text, position)
+                        onRepair(REPAIR_CONCATENATED_STRING, concatenation.start(1))
+                        position = concatenation.end()
+            output.appendMember(text, match)
+            if match.group('open') is not None:
+                self.i = match.start('open')
+                # // like beginValue, the whitespace in front of the value has been matched
+                processed = self.parseObject() if text[self.i] == '{' else self.parseArray()
+                if self.limits is not None:
+                    self.limits.check(self)
+                self.parseWhitespaceAndSkipComments()
+                if processed is PENDING:
+                    if opened:
+                        frame.state = STATE_VALUE
+                    frame = stack[-1]
+                    opened = opened + 1
+                    if charCodeAt(text, self.i) == codeComma:
+                        # // a leading comma
+                        return PENDING
+                    frame.state = STATE_MEMBER
+                continue
+            self.i = match.end()
+        if opened:
+            return PENDING
+        return skipped
+
+    valueParsers = {**RepairContext.valueParsers, '{': parseObject, '[': parseArray}
+
+
+def decodeInput(text):
+    '''
+     * The text of an input: a str as it is, a bytes-like object (bytes,
+     * bytearray, memoryview, mmap) decoded as UTF-8, without a byte order mark.
+     * Invalid UTF-8 raises a JSONRepairError with the byte offset.
+    '''
+    if isinstance(text, str):
+        return text
+    try:
+        return str(text, 'utf-8-sig')
+    except UnicodeDecodeError as err:
+        raise JSONRepairError(f'Invalid UTF-8 byte sequence at byte {err.start}', err.start) from None
+
+
+class JsonRepair:
+    '''
+     * The repair engine. It holds the configuration only: every call keeps its
+     * state in its own RepairContext, so a single engine can be shared between
+     * threads and used reentrantly, without locks.
+     *
+     * lastPath and pathCounts are statistics of the calls. lastPath is the path
+     * of the last call in the current thread, pathCounts counts the calls of all
+     * threads and is updated under a lock.
+     *
+     * By default the repaired text keeps the whitespace of the input. When
+     * indent or separators is given, the whitespace of the input is dropped
+     * and the repaired text is formatted like json.dumps does with them:
+     * JsonRepair(separators=(',', ':')) gives the most compact output,
+     * JsonRepair(indent=2) pretty prints it. This takes about as long as a
+     * repair that keeps the whitespace.
+    '''
+    __slots__ = ('validateFirst', 'telemetry', 'limits', 'indent', 'separators', 'pathCounts', 'lock', 'local')
+
+    def __init__(self, validateFirst=True, telemetry=None, limits=None, indent=None, separators=None):
+        self.validateFirst = validateFirst
+        self.telemetry = telemetry  # a RepairTelemetry that collects the repairs, or None
+        self.limits = limits  # the RepairLimits of every repair, or None
+        self.indent = indent  # indentation of the repaired text, a number of spaces or a string
+        self.separators = separators  # (item separator, key separator) of the repaired text
+        self.pathCounts = {PATH_VALID: 0, PATH_RESUMED: 0, PATH_REPAIRED: 0}
+        self.lock = threading.Lock()  # guards pathCounts
+        self.local = threading.local()  # state of the current thread: the path of its last call
+
+    @property
+    def lastPath(self):
+        return getattr(self.local, 'path', None)
+
+    def jsonrepair(self, text):
+        if self.limits is not None:
+            self.limits.checkLength(text)
+        text = decodeInput(text)
+        context = self.context(text, self.textOutput())
+        try:
+            return context.repair(self.validateFirst)
+        finally:
+            self.countPath(context.path)
+
+    # /**
+    #  * Repair the text and return the Python objects of the repaired document,
+    #  * like json.loads(self.jsonrepair(text)) but without building the repaired
+    #  * text. object_hook, parse_float and parse_int work like in json.loads.
+    #  *
+    #  * The objects of the valid part in front of the first error are built by
+    #  * the json module, and so are the valid objects and arrays after it and the
+    #  * plain members of the broken ones, see ScanningContext. Only the rest is
+    #  * built token by token. This is several times faster than
+    #  * json.loads(self.jsonrepair(text)) for a document of which the repairs are
+    #  * in its quotes, commas, constants, concatenated strings or comments, and
+    #  * the repaired text is never held in memory. With telemetry every member is
+    #  * parsed by the repair parser, so its parse functions are timed.
+    #  */
+    def loads(self, text, object_hook=None, parse_float=None, parse_int=None):
+        if self.limits is not None:
+            self.limits.checkLength(text)
+        text = decodeInput(text)
+        context = self.context(text, ObjectBuilder(object_hook, parse_float, parse_int), ScanningContext)
+        try:
+            return context.repairObjects(self.validateFirst, object_hook, parse_float, parse_int)
+        finally:
+            self.countPath(context.path)
+
+    # /**
+    #  * Repair the text and return the repairs as a list of edits of the input,
+    #  * instead of the repaired text: (offset, number of deleted characters,
+    #  * inserted text), ordered by offset and not overlapping. Valid JSON has no
+    #  * edits. For a bytes-like input the offsets and lengths count bytes and the
+    #  * inserted texts are UTF-8 bytes. apply_edits(text, edits) is the repaired
+    #  * text, iter_apply_edits streams it. indent and separators are not applied.
+    #  */
+    def edits(self, text):
+        if self.limits is not None:
+            self.limits.checkLength(text)
+        source = text
+        text = decodeInput(text)
+        output = EditList(text)
+        context = self.context(text, output)
+        output.context = context
+        try:
+            edits = context.repair(self.validateFirst)
+        finally:
+            self.countPath(context.path)
+        if source is not text:
+            edits = encodeEdits(source, text, edits)
+        return edits
+
+    def textOutput(self):
+        '''
+         * The output of a repair to text, formatted when indent or separators is given
+        '''
+        if self.indent is None and self.separators is None:
+            return OutputBuffer()
+        return FormattingBuffer(self.indent, self.separators)
+
+    def context(self, text, output, contextClass=RepairContext):
+        '''
+         * The context of a repair into output. contextClass is RepairContext or
+         * ScanningContext, a repair with telemetry always uses the instrumented
+         * RepairContext, so the parse functions are timed.
+        '''
+        if self.telemetry is not None:
+            context = self.telemetry.context(text, output)
+        else:
+            context = contextClass(text, output)
+        if self.limits is not None:
+            self.limits.begin(context)
+        return context
+
+    def countPath(self, path):
+        if path is not None:
+            self.local.path = path
+            with self.lock:
+                self.pathCounts[path] += 1
+
+
+# shared engine of the module level functions
+_engine = JsonRepair()
+
+
+def repair(text):
+    '''
+     * Repair a JSON document, see JsonRepair.jsonrepair. The text is a str or
+     * a UTF-8 bytes-like object, see decodeInput. Safe to call from multiple
+     * threads at the same time.
+    '''
+    return _engine.jsonrepair(text)
+
+
+def repair_loads(text, object_hook=None, parse_float=None, parse_int=None):
+    '''
+     * Repair a JSON document and return its Python objects, see JsonRepair.loads
+    '''
+    return _engine.loads(text, object_hook=object_hook, parse_float=parse_float, parse_int=parse_int)
+
+
+def repair_edits(text):
+    '''
+     * Repair a JSON document and return the repairs as edits of the input, see JsonRepair.edits
+    '''
+    return _engine.edits(text)
 
 
 if __name__ == "__main__":
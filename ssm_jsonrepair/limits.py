@@ -0,0 +1,114 @@
+import time
+from ssm_jsonrepair.jsonrepair import JSONRepairError
+
+# number of steps between two checks of the timeout
+CHECK_INTERVAL = 256
+
+# output that is allowed on top of maxExpansion times the input, for the brackets
+# and quotes that short inputs need
+EXPANSION_ALLOWANCE = 64
+
+
+class JSONRepairLimitError(JSONRepairError):
+    '''
+     * Raised when a repair exceeds one of its RepairLimits. The args are the
+     * message and the offset in the input that was reached, like for any
+     * JSONRepairError, limit is the name of the limit, like 'maxDepth'.
+    '''
+
+    def __init__(self, message, position, limit=None):
+        super().__init__(message, position)
+        self.limit = limit
+
+
+class RepairLimits:
+    '''
+     * Limits on the work of a single repair, to shed untrusted input that would
+     * take too long or produce too much:
+     *
+     *   engine = JsonRepair(limits=RepairLimits(maxLength=1 << 20, maxDepth=100, timeout=0.05))
+     *
+     * maxLength     characters of a str input, bytes of a bytes-like input
+     * maxDepth      nested objects, arrays and function calls
+     * maxExpansion  length of the repaired output relative to the input parsed so far
+     * maxRepairs    repairs applied
+     * maxSteps      steps of the parser: values, comments, and the runs and
+     *               repaired characters of strings
+     * timeout       seconds of wall-clock time of a single repair
+     *
+     * A limit that is None is not checked. Exceeding a limit raises a
+     * JSONRepairLimitError. maxLength is checked before anything else, the
+     * other limits while repairing: valid JSON is returned as it is. The time
+     * is checked every CHECK_INTERVAL steps, so a long string, or a long run of
+     * comments or redundant brackets, is stopped as well. The limits hold configuration
+     * only, so an engine with limits can be shared between threads.
+    '''
+
+    def __init__(self, maxLength=None, maxDepth=None, maxExpansion=None, maxRepairs=None, maxSteps=None,
+                 timeout=None):
+        self.maxLength = maxLength
+        self.maxDepth = maxDepth
+        self.maxExpansion = maxExpansion
+        self.maxRepairs = maxRepairs
+        self.maxSteps = maxSteps
+        self.timeout = timeout
+
+    def checkLength(self, text):
+        if self.maxLength is not None and len(text) > self.maxLength:
+            raise JSONRepairLimitError(f'Input of {len(text)} exceeds the maximum length of {self.maxLength}',
+                                       self.maxLength, 'maxLength')
+
+    def begin(self, context):
+        '''
+         * Start checking the limits of the repair of a RepairContext
+        '''
+        check = LimitCheck(self)
+        context.limits = check
+        if self.maxRepairs is not None:
+            check.onRepair = context.onRepair
+            context.onRepair = check.recordRepair
+        return check
+
+
+class LimitCheck:
+    '''
+     * The counters of the limits of a single repair, see RepairLimits.
+     * RepairContext.beginValue calls check after every value it begins, the
+     * scans of strings, comments and redundant brackets call step.
+    '''
+    __slots__ = ('limits', 'steps', 'repairs', 'deadline', 'onRepair')
+
+    def __init__(self, limits):
+        self.limits = limits
+        self.steps = 0
+        self.repairs = 0
+        self.deadline = time.perf_counter() + limits.timeout if limits.timeout is not None else None
+        self.onRepair = None  # the repair hook that was set before, like the one of a RepairTelemetry
+
+    def step(self, context):
+        limits = self.limits
+        self.steps += 1
+        if limits.maxSteps is not None and self.steps > limits.maxSteps:
+            raise JSONRepairLimitError(f'Maximum number of {limits.maxSteps} steps exceeded', context.i,
+                                       'maxSteps')
+        if (self.deadline is not None and self.steps % CHECK_INTERVAL == 0 and
+                time.perf_counter() > self.deadline):
+            raise JSONRepairLimitError(f'Timeout of {limits.timeout} seconds exceeded', context.i, 'timeout')
+
+    def check(self, context):
+        self.step(context)
+        limits = self.limits
+        if limits.maxDepth is not None and len(context.stack) > limits.maxDepth:
+            raise JSONRepairLimitError(f'Maximum depth of {limits.maxDepth} exceeded', context.i, 'maxDepth')
+        if (limits.maxExpansion is not None and
+                len(context.output) > limits.maxExpansion * context.i + EXPANSION_ALLOWANCE):
+            raise JSONRepairLimitError(f'Output exceeds {limits.maxExpansion} times the input', context.i,
+                                       'maxExpansion')
+
+    def recordRepair(self, kind, offset):
+        self.repairs += 1
+        if self.repairs > self.limits.maxRepairs:
+            raise JSONRepairLimitError(f'Maximum number of {self.limits.maxRepairs} repairs exceeded', offset,
+                                       'maxRepairs')
+        if self.onRepair is not None:
+            self.onRepair(kind, offset)
@@ -0,0 +1,135 @@
+import re
+from ssm_jsonrepair.jsonrepair import JsonRepair, JSONRepairError, decodeInput
+from ssm_jsonrepair.objectbuilder import ObjectBuilder
+
+# brackets outside of strings. Strings cannot span lines, an unterminated
+# string runs till the end of the line
+_bracketToken = re.compile(r'"(?:[^"\\\n]|\\.)*"?|\'(?:[^\'\\\n]|\\.)*\'?|[{}\[\]]')
+
+# returned by the repair of a record that is skipped
+_skip = object()
+
+
+def _depthChange(line, depth):
+    for match in _bracketToken.finditer(line):
+        char = match.group()
+        if char == '{' or char == '[':
+            depth += 1
+        elif (char == '}' or char == ']') and depth > 0:
+            depth -= 1
+    return depth
+
+
+def iter_repair_ndjson(lines, loads=False, positions=False, encoding='utf-8', engine=None, skipped=None, **kwargs):
+    '''
+     * Repair newline delimited JSON record by record.
+     *
+     * lines is a file (text or binary) or any iterable of lines. The input is
+     * read line by line and only the lines of the current record are kept, so
+     * memory stays proportional to the largest record instead of the input.
+     * A record normally is a single line. It continues on the next lines as
+     * long as it has unclosed brackets, unless the next line starts with an
+     * opening brace or bracket: then the record is truncated and the next line
+     * starts a new record. Blank lines are skipped.
+     *
+     * Yields the repaired JSON text of every record, or its Python objects when
+     * loads is True (the keyword arguments are passed to JsonRepair.loads).
+     * When positions is True, (record, offset, line) is yielded instead, where
+     * offset is the byte offset of the first line of the record and line its
+     * 1-based line number. Open files in binary mode to get exact byte offsets
+     * when the file has \\r\\n line endings.
+     *
+     * A record that cannot be repaired raises a JSONRepairError that mentions
+     * the line number of the record. When skipped is a list, such a record is
+     * appended to it as (offset, line, error) instead, and the next records
+     * are repaired as usual. The records are repaired by engine, a JsonRepair.
+    '''
+    repairer = engine if engine is not None else JsonRepair()
+    record = []  # lines of the current record
+    depth = 0  # number of unclosed brackets of the current record
+    start = (0, 0)  # (offset, line) of the current record
+    offset = 0
+
+    def repair(text, start):
+        try:
+            if loads:
+                value = repairer.loads(text, **kwargs)
+            else:
+                value = repairer.jsonrepair(text)
+        except JSONRepairError as err:
+            message, position = err.args
+            error = JSONRepairError(f'{message} in record at line {start[1]}', position)
+            if skipped is None or type(err) is not JSONRepairError:
+                raise error from None
+            skipped.append((start[0], start[1], error))
+            return _skip
+        if positions:
+            return value, start[0], start[1]
+        return value
+
+    for lineNumber, line in enumerate(lines, 1):
+        if isinstance(line, (bytes, bytearray)):
+            size = len(line)
+            line = line.decode(encoding)
+        else:
+            size = len(line.encode(encoding)) if positions or skipped is not None else 0
+
+        text = line.strip()
+        if text:
+            if record and depth > 0 and (text[0] == '{' or text[0] == '[') and not line[0].isspace():
+                # // a new record starts: the previous record is truncated
+                value = repair(''.join(record).strip(), start)
+                if value is not _skip:
+                    yield value
+                record = []
+                depth = 0
+            if not record:
+                start = (offset, lineNumber)
+            record.append(line)
+            depth = _depthChange(text, depth)
+            if depth == 0:
+                value = repair(''.join(record).strip(), start)
+                if value is not _skip:
+                    yield value
+                record = []
+        offset += size
+
+    if record:
+        value = repair(''.join(record).strip(), start)
+        if value is not _skip:
+            yield value
+
+
+def repair_ndjson(text, loads=False, engine=None, object_hook=None, parse_float=None, parse_int=None):
+    '''
+     * Repair newline delimited JSON in a single pass, skipping the records that
+     * cannot be repaired instead of failing the whole document.
+     *
+     * Returns (result, skipped). result is the repaired JSON array of the
+     * records, or its Python list when loads is True. skipped has a
+     * (start, end, error) tuple for every record that was skipped, where
+     * text[start:end] is the skipped text (offsets of the decoded text when it
+     * is bytes) and error the JSONRepairError of the record:
+     *
+     *   result, skipped = repair_ndjson(text)
+     *   for start, end, error in skipped:
+     *       quarantine.write(text[start:end])
+     *
+     * After a failing record, the repair continues at the first line after the
+     * error that starts with a value: a record on a single line, or a record
+     * that spans several lines with indented contents, is skipped as a whole.
+     * The RepairLimits and RepairTelemetry of the engine apply, a
+     * JSONRepairLimitError is raised as usual.
+    '''
+    if engine is None:
+        engine = JsonRepair()
+    if engine.limits is not None:
+        engine.limits.checkLength(text)
+    text = decodeInput(text)
+    output = ObjectBuilder(object_hook, parse_float, parse_int) if loads else engine.textOutput()
+    context = engine.context(text, output)
+    try:
+        result = context.repairRecords()
+    finally:
+        engine.countPath(context.path)
+    return result, context.skipped
@@ -0,0 +1,376 @@
+import json
+import re
+from json.decoder import scanstring
+from ssm_jsonrepair.stringutils import regexConcatenation
+
+# pending key of an open object that has no key yet
+_noKey = object()
+
+# the values of the keywords of a member, see appendMember
+_constants = {'true': True, 'false': False, 'null': None, 'True': True, 'False': False, 'None': None}
+
+_whitespace = re.compile(r'[ \t\n\r]*')
+
+
+def _rejectConstant(name):
+    # // NaN, Infinity and -Infinity are not valid JSON, they are left to the repair parser
+    raise ValueError(name)
+
+
+class ObjectBuilder:
+    '''
+     * Builds the Python objects of the repaired document, as a replacement of
+     * the OutputBuffer of the repair parser.
+     *
+     * The parser emits whole tokens: brackets, commas, colons, whitespace,
+     * string literals, numbers and keywords. They are turned into dicts,
+     * lists, strings, numbers, booleans and None as they come in, so the
+     * repaired document is never held as text. The repairs that edit the
+     * output (inserting before trailing whitespace, stripping a comma,
+     * undoing a string, concatenating strings) are mapped onto the objects.
+     * The valid objects and arrays and the plain members that a
+     * ScanningContext skips come in whole, see appendScanned and appendMember.
+    '''
+
+    # the parser appends only a newline for the whitespace of the input, see
+    # RepairContext.parseWhitespace
+    dropsWhitespace = True
+
+    def __init__(self, object_hook=None, parse_float=None, parse_int=None):
+        self.objectHook = object_hook
+        self.parseFloat = parse_float or float
+        self.parseInt = parse_int or int
+        self.memo = {}  # object keys, so repeated keys share one string
+        # // the scanner of the json module shares the keys of a single scan only: the
+        # // many small scans of the members and of the objects and arrays of a
+        # // repair share them through self.memo, see memoizeKeys
+        self.scanOnce = json.JSONDecoder(object_hook=object_hook, parse_float=parse_float, parse_int=parse_int,
+                                         parse_constant=_rejectConstant).scan_once
+        self.scanMemoized = json.JSONDecoder(object_hook=self.memoizeKeys, parse_float=parse_float,
+                                             parse_int=parse_int, parse_constant=_rejectConstant).scan_once
+        self.stack = []  # [container, pending key] for every open dict and list
+        self.roots = []  # root level values, more than one for newline delimited JSON
+        self.wrapped = False  # the root values are wrapped in an array (NDJSON)
+        self.length = 0  # number of tokens, see truncate
+        self.last = None  # (token index, stack entry or None, key, concatenated prefix) of the last value
+        self.lastString = None  # literal of the last string, up to its end quote
+        self.concatenate = False  # the next string is concatenated to the last one
+        self.endsWithComma = False
+        self.endsWithNewline = False
+        self.newlineBeforeComma = False  # the whitespace in front of the last comma has a newline
+
+    def __len__(self):
+        return self.length
+
+    def getvalue(self):
+        if self.wrapped:
+            return self.roots
+        return self.roots[0] if self.roots else None
+
+    def append(self, text):
+        char = text[0]
+        if char == ' ' or char == '\n' or char == '\t' or char == '\r':
+            self.endsWithNewline = self.endsWithNewline or ('\n' in text)
+            return
+
+        self.endsWithComma = char == ','
+        if self.endsWithComma:
+            self.newlineBeforeComma = self.endsWithNewline
+        self.endsWithNewline = False
+        if char == '"':
+            value, end = scanstring(text, 1, False)
+            self.lastString = text[0:end]
+            self.addString(value)
+            # // a repaired string can end with the whitespace that followed it
+            self.endsWithNewline = '\n' in text[end:]
+        elif char == '{':
+            self.stack.append([{}, _noKey])
+        elif char == '[':
+            self.stack.append([[], None])
+        elif char == '}' or char == ']':
+            self.close()
+        elif char == ',' or char == ':':
+            pass
+        elif char == 't':
+            self.addValue(True)
+        elif char == 'f':
+            self.addValue(False)
+        elif char == 'n':
+            self.addValue(None)
+        elif '.' in text or 'e' in text or 'E' in text:
+            self.addValue(self.parseFloat(text))
+        else:
+            self.addValue(self.parseInt(text))
+        self.length += 1
+
+    def memoizeKeys(self, obj):
+        memo = self.memo
+        obj = {memo.setdefault(key, key): value for key, value in obj.items()}
+        if self.objectHook is not None:
+            obj = self.objectHook(obj)
+        return obj
+
+    # /**
+    #  * Append a valid JSON text, the valid part in front of the first error, or
+    #  * only text[0:end] when end is given. It is a complete root value, or ends
+    #  * inside of the containers that are still open, of which openers are the
+    #  * offsets of the opening brackets. Their complete members are built by the
+    #  * scanner of the json module, the members of an array in one go, and the
+    #  * open containers are pushed like opening brackets.
+    #  */
+    def appendValid(self, text, openers=(), end=None):
+        if end is None:
+            end = len(text)
+        if not openers:
+            self.addValue(self.scanOnce(text, _whitespace.match(text).end())[0])
+
+        for level, opener in enumerate(openers):
+            # // the members end at the next open container or at the end of the text
+            membersEnd = openers[level + 1] if level + 1 < len(openers) else end
+            if text[opener] == '[':
+                while membersEnd > opener + 1 and text[membersEnd - 1] in ' \t\n\r':
+                    membersEnd -= 1
+                if text[membersEnd - 1] == ',':
+                    membersEnd -= 1
+                items = []
+                if membersEnd > opener + 1:
+                    items = self.scanOnce('[' + text[opener + 1:membersEnd] + ']', 0)[0]
+                self.stack.append([items, None])
+            else:
+                self.stack.append([{}, _noKey])
+                self.appendMembers(text, opener + 1, membersEnd)
+
+        self.length += 1
+        self.last = None
+        self.endsWithComma = False
+        trailing = end
+        while trailing > 0 and text[trailing - 1] in ' \t\n\r':
+            trailing -= 1
+        self.endsWithNewline = text.find('\n', trailing, end) >= 0
+
+    # /**
+    #  * Add the members of the valid JSON text[i:end] to the open object. When end
+    #  * is the offset of an open container, the last member has no value yet.
+    #  */
+    def appendMembers(self, text, i, end):
+        entry = self.stack[-1]
+        container = entry[0]
+        match = _whitespace.match
+        while True:
+            i = match(text, i).end()
+            if i >= end:
+                break
+            if text[i] == ',':
+                i += 1
+                continue
+            key, i = scanstring(text, i + 1)
+            key = self.memo.setdefault(key, key)
+            # // the colon and the whitespace around it
+            i = match(text, match(text, i).end() + 1).end()
+            if i >= end:
+                entry[1] = key
+                break
+            container[key], i = self.scanMemoized(text, i)
+
+    # /**
+    #  * Append the valid object or array at text[i], built by the scanner of the
+    #  * json module. Returns its end, see ScanningContext.scanValue. Raises a
+    #  * ValueError or StopIteration when it is not valid.
+    #  */
+    def appendScanned(self, text, i):
+        value, end = self.scanMemoized(text, i)
+        self.addValue(value)
+        self.length += 1
+        self.endsWithComma = False
+        self.endsWithNewline = False
+        return end
+
+    # /**
+    #  * Append a member of an object or an item of an array that was matched by
+    #  * regexPlainMember or regexPlainItem, see ScanningContext.skipMembers.
+    #  * Its value is decoded from the match, or is opened next when it is an
+    #  * object or array.
+    #  */
+    def appendMember(self, text, match):
+        entry = self.stack[-1]
+        container, key = entry
+        if key is not None:
+            start = match.start('key')
+            if start >= 0:
+                key = scanstring(text, start + 1)[0]
+            else:
+                key = match.group('singleKey')[1:-1]
+            key = self.memo.setdefault(key, key)
+
+        start = match.start('string')
+        if start >= 0:
+            value = scanstring(text, start + 1)[0]
+            if match.start('concatenated') >= 0:
+                # // repair concatenated strings like "hello" + "world"
+                pieces = [value]
+                position = match.start('concatenated')
+                while position < match.end('concatenated'):
+                    concatenation = regexConcatenation.match(text, position)
+                    pieces.append(scanstring(text, concatenation.start(1) + 1)[0])
+                    position = concatenation.end()
+                value = ''.join(pieces)
+        else:
+            literal = match.group('number')
+            if literal is not None:
+                if '.' in literal or 'e' in literal or 'E' in literal:
+                    value = self.parseFloat(literal)
+                else:
+                    value = self.parseInt(literal)
+            elif match.start('open') >= 0:
+                # // the value is the object or array that is parsed next
+                entry[1] = key
+                self.endsWithComma = False
+                self.endsWithNewline = False
+                return
+            else:
+                literal = match.group('singleValue')
+                if literal is not None:
+                    value = literal[1:-1]
+                else:
+                    value = _constants[match.group('constant') or match.group('python')]
+
+        if key is None:
+            container.append(value)
+        else:
+            container[key] = value
+            entry[1] = _noKey
+        self.last = (self.length, entry, key, None)
+        self.length += 1
+        self.endsWithComma = False
+        self.endsWithNewline = '\n' in match.group('after')
+
+    def prepend(self, text):
+        # // newline delimited JSON: the root values are wrapped in an array
+        self.wrapped = True
+
+    def close(self):
+        if not self.stack:
+            # // closing bracket of the NDJSON array
+            return
+
+        container, key = self.stack.pop()
+        if self.objectHook is not None and type(container) is dict:
+            container = self.objectHook(container)
+        self.addValue(container)
+
+    def addString(self, value):
+        prefix = None
+        if self.concatenate:
+            # // repair concatenated strings like "hello" + "world"
+            self.concatenate = False
+            prefix = self.removeLast()
+            value = prefix + value
+        self.addValue(value, prefix)
+
+    def addValue(self, value, prefix=None):
+        if not self.stack:
+            self.roots.append(value)
+            self.last = (self.length, None, None, prefix)
+            return
+
+        entry = self.stack[-1]
+        container, key = entry
+        if key is None:
+            container.append(value)
+            self.last = (self.length, entry, None, prefix)
+        elif key is _noKey:
+            # // the value is an object key
+            if type(value) is not str:
+                value = json.dumps(value)
+            entry[1] = self.memo.setdefault(value, value)
+            self.last = (self.length, entry, _noKey, prefix)
+        else:
+            container[key] = value
+            entry[1] = _noKey
+            self.last = (self.length, entry, key, prefix)
+
+    def removeLast(self):
+        index, entry, key, prefix = self.last
+        self.last = None
+        if entry is None:
+            return self.roots.pop()
+        if key is None:
+            return entry[0].pop()
+        if key is _noKey:
+            value = entry[1]
+            entry[1] = _noKey
+            return value
+        entry[1] = key
+        return entry[0].pop(key)
+
+    # /**
+    #  * Undo the tokens after the first length tokens. This is only used to
+    #  * undo a string that turned out to have no valid end quote.
+    #  */
+    def truncate(self, length):
+        self.length = length
+        if self.last is not None and self.last[0] >= length:
+            prefix = self.last[3]
+            self.removeLast()
+            if prefix is not None:
+                # // the string is parsed again, and concatenated again
+                self.addValue(prefix)
+                self.last = (-1,) + self.last[1:]
+                self.concatenate = True
+        self.endsWithComma = False
+        self.endsWithNewline = False
+
+    # /**
+    #  * Undo a root level record that could not be repaired, the first length
+    #  * tokens come before it. The open containers of the record are dropped,
+    #  * and its value when it was complete.
+    #  */
+    def truncateRecord(self, length):
+        self.stack = []
+        if self.last is not None and self.last[0] >= length and self.last[1] is None:
+            self.roots.pop()
+        self.length = length
+        self.last = None
+        self.concatenate = False
+        self.endsWithComma = False
+        self.endsWithNewline = False
+
+    def insertBeforeLastWhitespace(self, textToInsert):
+        if textToInsert == ',':
+            self.endsWithComma = True
+        elif textToInsert == '}' or textToInsert == ']':
+            self.endsWithComma = False
+            self.close()
+        elif textToInsert == '"':
+            # // the + of a string concatenation is not followed by a string: the end
+            # // quote goes back in front of the whitespace at the end of the last string
+            self.concatenate = False
+            literal = self.lastString[0:-1]
+            content = literal.rstrip(' \t\n\r')
+            if len(content) < len(literal) and self.last is not None:
+                index, entry, key, prefix = self.last
+                value = scanstring(content + '"', 1, False)[0]
+                self.removeLast()
+                self.addValue(value if prefix is None else prefix + value, prefix)
+                self.last = (index,) + self.last[1:]
+        else:
+            self.endsWithComma = False
+
+    def stripLastOccurrence(self, textToStrip, stripRemainingText=False):
+        if textToStrip == '"':
+            # // the end quote of a string that is concatenated with the next string
+            self.concatenate = True
+            if stripRemainingText:
+                self.endsWithComma = False
+                self.endsWithNewline = False
+        elif textToStrip == ',':
+            # // the whitespace in front of the comma is at the end again
+            self.endsWithComma = False
+            self.endsWithNewline = self.endsWithNewline or self.newlineBeforeComma
+
+    def removeAt(self, start, count):
+        # // the start quote of a concatenated string, see stripLastOccurrence
+        pass
+
+    def endsWithCommaOrNewline(self):
+        return self.endsWithComma or self.endsWithNewline
@@ -0,0 +1,197 @@
+_whitespace = ' \t\n\r'
+
+# number of chunks joined into one block when the buffer is compacted
+_blockSize = 1024
+
+
+class OutputBuffer:
+    '''
+     * Output of the repair parser, kept as a list of chunks.
+     *
+     * Appending is O(1) amortized, and the repairs that edit the end of the
+     * output (inserting before trailing whitespace, stripping the last comma,
+     * truncating) only touch the last few chunks instead of copying the whole
+     * output. Older chunks are joined into blocks from time to time so the
+     * number of chunks stays small.
+    '''
+
+    # the parser appends the whitespace of the input, see RepairContext.parseWhitespace
+    dropsWhitespace = False
+
+    def __init__(self, text=''):
+        self.chunks = [text] if text else []
+        self.length = len(text)
+        self.frozen = len(self.chunks)  # number of leading chunks that are joined blocks
+
+    @classmethod
+    def fromChunks(cls, chunks, length):
+        # // output that starts with chunks of the given total length, which are not edited
+        output = cls()
+        output.chunks = list(chunks)
+        output.length = length
+        output.frozen = len(output.chunks)
+        return output
+
+    def __len__(self):
+        return self.length
+
+    def __str__(self):
+        if len(self.chunks) > 1:
+            self.chunks = [''.join(self.chunks)]
+            self.frozen = 1
+        return self.chunks[0] if self.chunks else ''
+
+    def getvalue(self):
+        return str(self)
+
+    def append(self, text):
+        if text:
+            self.chunks.append(text)
+            self.length += len(text)
+            if len(self.chunks) - self.frozen >= 2 * _blockSize:
+                self.compact()
+
+    def prepend(self, text):
+        if text:
+            self.chunks.insert(0, text)
+            self.length += len(text)
+            self.frozen += 1
+
+    # /**
+    #  * Append a valid JSON text, like the valid part in front of the first error.
+    #  * openers are the offsets of the opening brackets of the containers that
+    #  * are still open at its end. Only text[0:end] is appended when end is given
+    #  */
+    def appendValid(self, text, openers=(), end=None):
+        if end is not None:
+            text = text[0:end]
+        self.append(text)
+        # // copied as it is: it is never edited, like a joined block
+        self.frozen = len(self.chunks)
+
+    def compact(self):
+        start = self.frozen
+        end = start + _blockSize
+        self.chunks[start:end] = [''.join(self.chunks[start:end])]
+        self.frozen += 1
+
+    def unfreeze(self, index):
+        # // chunk at index is about to be edited, it no longer counts as a block
+        if index < self.frozen:
+            self.frozen = index
+
+    def truncate(self, length):
+        chunks = self.chunks
+        while self.length > length:
+            chunk = chunks.pop()
+            self.length -= len(chunk)
+            if self.length < length:
+                chunks.append(chunk[0:length - self.length])
+                self.length = length
+        self.unfreeze(len(chunks))
+
+    # /**
+    #  * Undo the output of a root level record that could not be repaired, the
+    #  * output had length characters before it
+    #  */
+    def truncateRecord(self, length):
+        self.truncate(length)
+
+    # /**
+    #  * Insert text before the whitespace at the end of the output
+    #  */
+    def insertBeforeLastWhitespace(self, textToInsert):
+        chunks = self.chunks
+        index = len(chunks)
+        while index > 0:
+            chunk = chunks[index - 1]
+            stripped = chunk.rstrip(_whitespace)
+            if not stripped:
+                # // empty or whitespace only
+                index -= 1
+                continue
+            if len(stripped) < len(chunk):
+                # // split the chunk that ends with the whitespace
+                self.unfreeze(index - 1)
+                chunks[index - 1:index] = [stripped, chunk[len(stripped):]]
+            break
+
+        if index == len(chunks):
+            self.append(textToInsert)
+        else:
+            self.unfreeze(index)
+            chunks.insert(index, textToInsert)
+            self.length += len(textToInsert)
+
+    # /**
+    #  * Get the whitespace at the end of the output
+    #  */
+    def trailingWhitespace(self):
+        chunks = self.chunks
+        index = len(chunks)
+        while index > 0:
+            chunk = chunks[index - 1]
+            stripped = chunk.rstrip(_whitespace)
+            if stripped:
+                return chunk[len(stripped):] + ''.join(chunks[index:])
+            index -= 1
+        return ''.join(chunks)
+
+    # /**
+    #  * Strip last occurrence of textToStrip from the output
+    #  */
+    def stripLastOccurrence(self, textToStrip, stripRemainingText=False):
+        chunks = self.chunks
+        index = len(chunks) - 1
+        while index >= 0:
+            chunk = chunks[index]
+            found = chunk.rfind(textToStrip)
+            if found != -1:
+                self.unfreeze(index)
+                if stripRemainingText:
+                    self.length -= sum(len(c) for c in chunks[index + 1:])
+                    del chunks[index + 1:]
+                    self.length -= len(chunk) - found
+                    chunks[index] = chunk[0:found]
+                else:
+                    self.length -= len(textToStrip)
+                    chunks[index] = chunk[0:found] + chunk[found + len(textToStrip):]
+                return
+            index -= 1
+
+    # /**
+    #  * Remove count characters at position start of the output, where start lies
+    #  * in the last chunks
+    #  */
+    def removeAt(self, start, count):
+        chunks = self.chunks
+        offset = self.length
+        index = len(chunks)
+        while index > 0 and offset > start:
+            index -= 1
+            offset -= len(chunks[index])
+
+        self.unfreeze(index)
+        # // the removed characters can span multiple chunks
+        while count > 0 and index < len(chunks):
+            chunk = chunks[index]
+            begin = start - offset
+            end = min(len(chunk), begin + count)
+            chunks[index] = chunk[0:begin] + chunk[end:]
+            removed = end - begin
+            count -= removed
+            self.length -= removed
+            offset += len(chunks[index])
+            start = offset
+            index += 1
+
+    # /**
+    #  * Test whether the output ends with a newline or comma character and optional whitespace
+    #  */
+    def endsWithCommaOrNewline(self):
+        for index in range(len(self.chunks) - 1, -1, -1):
+            chunk = self.chunks[index]
+            stripped = chunk.rstrip(' \t\r')
+            if stripped:
+                return stripped[-1] == ',' or stripped[-1] == '\n'
+        return False
@@ -0,0 +1,263 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from ssm_jsonrepair.jsonrepair import (JsonRepair, JSONRepairError, RepairContext, PATH_REPAIRED, PATH_VALID,
+                                       REPAIR_ELLIPSIS, REPAIR_MISSING_END_BRACKET, REPAIR_NDJSON,
+                                       REPAIR_REDUNDANT_END_BRACKET, decodeInput, _validator)
+from ssm_jsonrepair.outputbuffer import OutputBuffer
+
+# number of characters of a slice of the root array when chunksize is not given,
+# at least, and about a quarter of the share of a worker for larger documents
+_sliceCharacters = 1 << 18
+
+# strings and comments that end on their line, to split the text into them and the parts between them.
+# A block comment stops at the next /*, so the failing matches of a line do not add up to quadratic time
+_token = re.compile(r'("[^"\\\n]*(?:\\.[^"\\\n]*)*"|\'[^\'\\\n]*(?:\\.[^\'\\\n]*)*\'|/\*(?:[^*/\n]|\*(?!/)|/(?!\*))*\*/|//[^\n]*)')
+
+# characters outside of strings and comments after which the repair parser could
+# split the elements elsewhere than the pre-scan does: stray quotes, escapes,
+# slashes and special quotes
+_unsafe = re.compile(r'["\'\\/\u201c\u201d\u2018\u2019`\u00b4]')
+
+# what follows on the end quote of a string that the repair parser ends there too: a
+# delimiter, or the start of a next value when a comma or colon is missing
+_stringEnds = frozenset(',:]}{["\'0123456789')
+
+# a comma, or the end of a string or container that is followed by whitespace: the
+# end of an element when the next element follows without a comma, see _elementEnd
+_boundary = re.compile(r',|(?<=[}\]"])(?=[ \t\r\n])')
+
+# the starts of the next element after a missing comma that are split at
+_elementStarts = ('"', "'", '{', '[')
+
+_leadingWhitespace = re.compile(r'[ \t\r\n]*')
+
+# repairs of a slice that end or add a container where the pre-scan does not, or
+# that can take the comma in front of the slice along, like an ellipsis
+_structuralRepairs = frozenset((REPAIR_MISSING_END_BRACKET, REPAIR_REDUNDANT_END_BRACKET, REPAIR_NDJSON,
+                                REPAIR_ELLIPSIS))
+_truncatedRepairs = _structuralRepairs - {REPAIR_MISSING_END_BRACKET}
+
+
+def _depthChange(text, start, end):
+    return (text.count('[', start, end) + text.count('{', start, end) -
+            text.count(']', start, end) - text.count('}', start, end))
+
+
+def _slices(text, chunksize):
+    '''
+     * Split the root array of text between its top level elements into
+     * slices of about chunksize characters. Returns (start of the root array,
+     * the boundary offsets, whether the root array is closed, the text with its
+     * strings and comments blanked out), or None when the text cannot be split
+     * safely: it is not an array, has strings or comments that do not end on
+     * their line, strings that are not followed by a delimiter or a next value,
+     * special quotes, or more closing than opening brackets. A boundary is a top level comma, or the end of an element that
+     * is followed by whitespace and a next element without a comma, which the
+     * repair inserts there.
+     *
+     * The strings and comments are blanked out, keeping the end quotes of the
+     * strings, so the nesting depth of a part of the text is a count of its
+     * brackets, and only the boundaries around the slice ends are looked at one
+     * by one. Brackets that do not match, or text after the root array, are
+     * left to the repair of the slices, see _repairSlice.
+    '''
+    start = _leadingWhitespace.match(text).end()
+    if not text.startswith('[', start):
+        return None
+
+    parts = _token.split(text)
+    for index in range(0, len(parts), 2):
+        if _unsafe.search(parts[index]):
+            return None
+    following = ''  # the first character after the token at index, skipping whitespace and comments
+    for index in range(len(parts) - 2, 0, -2):
+        token = parts[index]
+        after = parts[index + 1].lstrip(' \t\r\n')
+        if after:
+            following = after[0]
+        if token[0] == '/':
+            parts[index] = ' ' * len(token)
+        else:
+            if following and following not in _stringEnds:
+                return None
+            parts[index] = ' ' * (len(token) - 1) + '"'
+            following = '"'
+    blanked = ''.join(parts)
+
+    unclosed = _depthChange(blanked, start, len(blanked))
+    if unclosed < 0:
+        return None
+
+    boundaries = []
+    position = start + 1  # the depth is known up to here
+    depth = 1
+    target = start + chunksize
+    while target < len(blanked):
+        boundary = _boundary.search(blanked, target)
+        while boundary is not None:
+            end = boundary.start()
+            depth += _depthChange(blanked, position, end)
+            position = end
+            if depth <= 0:
+                # // the root array ends before the end of the text
+                return None
+            if depth == 1 and (blanked[end] == ',' or _elementEnd(text, end)):
+                break
+            boundary = _boundary.search(blanked, end + 1)
+        if boundary is None:
+            break
+        boundaries.append(end)
+        target = end + chunksize
+    return start, boundaries, unclosed == 0, blanked
+
+
+def _elementEnd(text, end):
+    # // only whitespace, no comments, between the element and the next one
+    return text.startswith(_elementStarts, _leadingWhitespace.match(text, end).end())
+
+
+class _SliceOutput(OutputBuffer):
+    '''
+     * OutputBuffer of a slice of the root array, that keeps whether a comma
+     * was to be stripped in front of the slice
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self.strippedOutside = False
+
+    def stripLastOccurrence(self, textToStrip, stripRemainingText=False):
+        length = len(self)
+        super().stripLastOccurrence(textToStrip, stripRemainingText)
+        if textToStrip == ',' and len(self) == length:
+            # // the repair of the whole array strips the comma in front of the slice
+            self.strippedOutside = True
+
+
+class _SliceRepair(JsonRepair):
+    '''
+     * JsonRepair of a slice of the root array, that keeps the kinds of the
+     * repairs it applies
+    '''
+    __slots__ = ('kinds',)
+
+    def __init__(self, validateFirst, limits):
+        super().__init__(validateFirst, limits=limits)
+        self.kinds = set()
+
+    def context(self, text, output):
+        context = RepairContext(text, output)
+        context.onRepair = self.recordRepair
+        if self.limits is not None:
+            self.limits.begin(context)
+        return context
+
+    def recordRepair(self, kind, offset):
+        self.kinds.add(kind)
+
+
+def _repairSlice(task):
+    '''
+     * Repair a slice of the root array, runs in a worker process. Returns
+     * None when the repair parser does not see the elements the pre-scan
+     * does, or cannot repair it: the document is repaired sequentially then,
+     * which also raises the error of the whole document.
+    '''
+    text, truncated, validateFirst, limits = task
+    engine = _SliceRepair(validateFirst, limits)
+    output = _SliceOutput()
+    context = engine.context(text, output)
+    try:
+        result = context.repair(validateFirst)
+    except JSONRepairError:
+        return None
+    if output.strippedOutside:
+        return None
+    # // the brackets of the slice match, so the repair must not end or add a container,
+    # // except for the containers of a truncated document
+    structural = _structuralRepairs if not truncated else _truncatedRepairs
+    if not engine.kinds.isdisjoint(structural):
+        return None
+    return result
+
+
+def repair_parallel(text, workers=None, chunksize=None, engine=None, inline_threshold=1 << 22):
+    '''
+     * Repair a large document of which the root value is an array, on all
+     * cores. The array is split between its top level elements by a pre-scan
+     * that tracks strings, comments, escapes and nesting, and the slices of its
+     * elements are repaired in a pool of worker processes, each as an array of
+     * its own. The repaired slices are joined with commas, so the result
+     * is the one of engine.jsonrepair(text).
+     *
+     * The slices have about chunksize characters. When the document has less
+     * than inline_threshold characters, when workers is 1, or when the
+     * pre-scan cannot split it safely (see _slices), the document is repaired
+     * by engine in the calling process. So is a document of which a slice
+     * cannot be repaired, to raise the JSONRepairError of the whole document.
+     *
+     * The validateFirst and the RepairLimits of engine apply to every slice,
+     * maxLength to the whole document. The telemetry and the indent and
+     * separators of engine are not supported: such engines repair sequentially.
+    '''
+    if engine is None:
+        engine = JsonRepair()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if engine.limits is not None:
+        engine.limits.checkLength(text)
+    text = decodeInput(text)
+    if (workers <= 1 or len(text) < inline_threshold or engine.telemetry is not None or
+            engine.indent is not None or engine.separators is not None):
+        return engine.jsonrepair(text)
+
+    if engine.validateFirst:
+        try:
+            _validator.decode(text)
+        except (ValueError, RecursionError):
+            pass
+        else:
+            engine.countPath(PATH_VALID)
+            return text
+
+    if chunksize is None:
+        chunksize = max(_sliceCharacters, len(text) // (4 * workers))
+    split = _slices(text, chunksize)
+    if split is None or not split[1]:
+        return engine.jsonrepair(text)
+
+    # // every slice but the last is closed by a bracket of its own, the last one
+    # // has the end of the root array, or is truncated like the document. A slice
+    # // after a missing comma starts with the whitespace in front of its element
+    start, boundaries, closed, blanked = split
+    starts = [start + 1] + [boundary + 1 if text[boundary] == ',' else boundary for boundary in boundaries]
+    ends = boundaries + [len(text)]
+    tasks = []
+    for begin, end in zip(starts, ends):
+        # // without its comments, which the repair removes as well
+        element = blanked[begin:end].strip(' \t\r\n')
+        if not element or element[0] == ',' or element[0] == ']' or (end != len(text) and element[-1] == ','):
+            # // an empty element, which the repair of the whole array removes with a comma
+            return engine.jsonrepair(text)
+        if end != len(text):
+            tasks.append(('[' + text[begin:end] + ']', False, engine.validateFirst, engine.limits))
+        else:
+            tasks.append(('[' + text[begin:end], not closed, engine.validateFirst, engine.limits))
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+        results = list(executor.map(_repairSlice, tasks))
+
+    parts = [text[0:start], '[']
+    last = len(results) - 1
+    for index, result in enumerate(results):
+        if result is None or not result[1:result.rfind(']')].strip(' \t\r\n'):
+            # // no elements left, like of an ellipsis: the repair of the whole array
+            # // removes the comma in front of it
+            return engine.jsonrepair(text)
+        if index < last:
+            parts.append(result[1:-1])
+            parts.append(',')
+        else:
+            parts.append(result[1:])
+    engine.countPath(PATH_REPAIRED)
+    return ''.join(parts)
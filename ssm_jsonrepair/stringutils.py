@@ -48,42 +48,117 @@ regexDelimiter = re.compile("^[,:[\]/{}()\n+]$")
 # alpha, number, minus, or opening bracket or brace
 regexStartOfValue = re.compile(r'^[\[\{\w\-]$')
 
+# runs of characters that the parser consumes in one step
+_quotes = '"\u201c\u201d\'\u2018\u2019`\u00b4'
+# including the special whitespace, en quad till hair space (0x2000-0x200a) are not included on purpose
+regexWhitespaceRun = re.compile('[ \n\t\r\u00a0\u202f\u205f\u3000]+')
+# a symbol of an unquoted string, up to the next delimiter (except slash) or quote
+regexUnquotedRun = re.compile('[^,:\\[\\]{}()\n+' + _quotes + ']+')
+# string content that needs no repair: no quotes, escape characters or control characters
+regexStringRun = re.compile('[^\\\\\x00-\x1f' + _quotes + ']+')
+regexStringRunUntilDelimiter = re.compile('[^\\\\\x00-\x1f,:\\[\\]/{}()+' + _quotes + ']+')
+# the first delimiter in a run of string content
+regexDelimiterInRun = re.compile('[,:\\[\\]/{}()+\n]')
+
+# a member of an object or an item of an array of which the repairs are known without the
+# repair parser, see ScanningContext.skipMembers: after an optional comma, a double or single
+# quoted string, double quoted strings concatenated with +, or a number or a keyword that is
+# followed by the end of the value or the text, and the whitespace after it, or the start of a
+# nested object or array. Strings with quotes, escapes or control characters that need a repair,
+# values that are not followed by a delimiter, a quote or the end of the text and comments are
+# left to the repair parser
+_plainWhitespace = '[ \t\n\r]*'
+_plainString = '"(?:[^"\\\\\x00-\x1f]|\\\\(?:["\\\\/bfnrt]|u[0-9a-fA-F]{4}))*"'
+_plainSingleQuoted = "'[^'\"\\\\\x00-\x1f]*'"
+# the + and the next string of concatenated strings
+regexConcatenation = re.compile(f'{_plainWhitespace}\\+{_plainWhitespace}({_plainString})')
+_plainValue = (f'(?:(?P<open>(?=[{{\\[]))|'
+               f'(?:(?P<string>{_plainString})'
+               f'(?P<concatenated>(?:{_plainWhitespace}\\+{_plainWhitespace}{_plainString})+)?|'
+               f'(?P<singleValue>{_plainSingleQuoted})|'
+               f'(?:(?P<number>-?(?:0|[1-9][0-9]*)(?:\\.[0-9]+)?(?:[eE][+-]?[0-9]+)?)|'
+               f'(?P<constant>true|false|null)|(?P<python>True|False|None))(?=[ \t\n\r,}}\\]]|\\Z))'
+               f'(?P<after>{_plainWhitespace})(?=[,}}\\]"\']|\\Z))')
+regexPlainMember = re.compile(f'(?P<comma>,)?{_plainWhitespace}(?:(?P<key>{_plainString})|'
+                              f'(?P<singleKey>{_plainSingleQuoted})){_plainWhitespace}:{_plainWhitespace}{_plainValue}')
+regexPlainItem = re.compile(f'(?P<comma>,)?{_plainWhitespace}{_plainValue}')
+
+# replace special whitespace characters with a regular space
+specialWhitespaceToSpace = str.maketrans('\u00a0\u202f\u205f\u3000', '    ')
+
+# character classes, combined into a bitmask per character by charClasses
+classDelimiter = 0x1
+classQuote = 0x2
+classDoubleQuoteLike = 0x4
+classSingleQuoteLike = 0x8
+classWhitespace = 0x10
+classDigit = 0x40
+classHex = 0x80
+classControlCharacter = 0x100
+classStartOfValue = 0x400
+
+
+def _buildCharClasses():
+  classes = {}
+
+  def add(chars, flag):
+    for char in chars:
+      classes[char] = classes.get(char, 0) | flag
+
+  add(',:[]/{}()\n+', classDelimiter)
+  add('"\u201c\u201d', classQuote | classDoubleQuoteLike)
+  add('\'\u2018\u2019`\u00b4', classQuote | classSingleQuoteLike)
+  add(' \n\t\r', classWhitespace)
+  add('0123456789', classDigit | classHex)
+  add('abcdefABCDEF', classHex)
+  add('\b\f\n\r\t', classControlCharacter)
+  # alpha, number, minus, or opening bracket or brace, or a quote.
+  # non-ascii alphanumeric characters are tested in isStartOfValue
+  add([chr(code) for code in range(0x80) if regexStartOfValue.match(chr(code))], classStartOfValue)
+  add('"\u201c\u201d\'\u2018\u2019`\u00b4', classStartOfValue)
+
+  return classes
+
+
+# bitmask of character classes by character and by character code.
+# Characters without any class are not in the tables.
+charClasses = _buildCharClasses()
+codeClasses = {ord(char): flags for char, flags in charClasses.items()}
+_charClass = charClasses.get
+_codeClass = codeClasses.get
+
+regexLeadingZero = re.compile(r'0\d')
+# a number that needs no repair, and the keywords (including the Python ones)
+regexNumber = re.compile(r'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?')
+regexKeyword = re.compile('true|false|null|True|False|None')
+regexCommaOrNewlineAtEnd = re.compile('[,\n][ \t\r]*$')
+regexFunctionName = re.compile(r'\w+$')
+
+
 def isHex(code):
-  return (
-    ((code >= codeZero) and (code <= codeNine)) or
-    ((code >= codeUppercaseA) and (code <= codeUppercaseF)) or
-    ((code >= codeLowercaseA) and (code <= codeLowercaseF))
-  )
+  return _codeClass(code, 0) & classHex
 
 
+# a comparison chain is faster than the table for the digits, see benchmarks/predicates.py
 def isDigit(code):
-  return (code >= codeZero) and (code <= codeNine)
+  return code is not None and (code >= codeZero) and (code <= codeNine)
 
 
+# a comparison is faster than the table as well, see benchmarks/predicates.py
 def isValidStringCharacter(code):
-  return (code >= 0x20) and (code <= 0x10ffff)
+  return code >= 0x20
 
 
 def isDelimiter(char):
-  return regexDelimiter.match(char)
-
-
-def isDelimiterExceptSlash(char):
-  return isDelimiter(char) and (char != '/')
+  return _charClass(char, 0) & classDelimiter
 
 
 def isStartOfValue(char):
-  return regexStartOfValue.match(char) or (char and isQuote(charCodeAt(char, 0)))
+  return (_charClass(char, 0) & classStartOfValue) or (char is not None and char > '\x7f' and char.isalnum())
 
 
 def isControlCharacter(code):
-  return (
-    (code == codeNewline) or
-    (code == codeReturn) or
-    (code == codeTab) or
-    (code == codeBackspace) or
-    (code == codeFormFeed)
-  )
+  return _codeClass(code, 0) & classControlCharacter
 
 
 '''
@@ -91,21 +166,7 @@ def isControlCharacter(code):
  * newline
 '''
 def isWhitespace(code):
-  return (code == codeSpace) or (code == codeNewline) or (code == codeTab) or (code == codeReturn)
-
-
-'''
- * Check if the given character is a special whitespace character, some
- * unicode variant
-'''
-def isSpecialWhitespace(code):
-  return (
-    (code == codeNonBreakingSpace) or
-    #((code >= codeEnQuad) and (code <= codeHairSpace)) or
-    (code == codeNarrowNoBreakSpace) or
-    (code == codeMediumMathematicalSpace) or
-    (code == codeIdeographicSpace)
-  )
+  return _codeClass(code, 0) & classWhitespace
 
 
 '''
@@ -113,8 +174,7 @@ def isSpecialWhitespace(code):
  * Also tests for special variants of quotes.
  '''
 def isQuote(code):
-  # // the first check double quotes, since that occurs most often
-  return isDoubleQuoteLike(code) or isSingleQuoteLike(code)
+  return _codeClass(code, 0) & classQuote
 
 
 '''
@@ -122,8 +182,7 @@ def isQuote(code):
  * Also tests for special variants of double quotes.
  '''
 def isDoubleQuoteLike(code):
-  # // the first check double quotes, since that occurs most often
-  return (code == codeDoubleQuote) or (code == codeDoubleQuoteLeft) or (code == codeDoubleQuoteRight)
+  return _codeClass(code, 0) & classDoubleQuoteLike
 
 
 # '''
@@ -139,13 +198,7 @@ def isDoubleQuote(code):
 #  * Also tests for special variants of single quotes.
 #  '''
 def isSingleQuoteLike(code):
-  return (
-    (code == codeQuote) or
-    (code == codeQuoteLeft) or
-    (code == codeQuoteRight) or
-    (code == codeGraveAccent) or
-    (code == codeAcuteAccent)
-  )
+  return _codeClass(code, 0) & classSingleQuoteLike
 
 
 # '''
@@ -170,13 +223,13 @@ def stripLastOccurrence(text, textToStrip, stripRemainingText = False):
     return text
 
 def charAt(text, i):
-  if len(text)>i:
+  if 0 <= i < len(text):
     return text[i]
   else:
     return None
 
 def charCodeAt(text, i):
-  if len(text)>i:
+  if 0 <= i < len(text):
     return ord(text[i])
   else:
     return None
@@ -192,18 +245,13 @@ def insertBeforeLastWhitespace(text, textToInsert):
   while (isWhitespace(charCodeAt(text,index - 1))):
     index= index-1
 
-  return text[0, index] + textToInsert + text[index,]
-
-def removeAtIndex(text, start, count):
-  return text[0, start] + text[start + count,]
+  return text[0:index] + textToInsert + text[index:]
 
 # '''
 #  * Test whether a string ends with a newline or comma character and optional whitespace
 #  '''
 def endsWithCommaOrNewline(text):
-  regex = re.compile('[,\n][ \t\r]*$')
-  return regex.match(text)
+  return regexCommaOrNewlineAtEnd.search(text)
 
 def isFunctionName(text):
-  regex = '^\w+$'
-  return regex.match(text)
+  return regexFunctionName.match(text)
@@ -0,0 +1,150 @@
+'''
+ * Structural index of a valid JSON prefix, built with vectorized NumPy
+ * operations in the spirit of the first stage of simdjson: the positions of
+ * the quotes that are not escaped, and of the brackets and commas outside of
+ * strings with their nesting depth.
+ *
+ * The index has a single use: RepairContext.resumeAt takes the containers
+ * that are open at the first error of a long document from it, instead of
+ * walking the tokens of the valid part in front of that error. The repair
+ * parser itself does not use the index: it parses the text after the resume
+ * point character by character and regex by regex as always, it does not
+ * skip from one structural position to the next. NumPy is optional: without
+ * it, or for texts shorter than INDEX_THRESHOLD, the tokens of the prefix are
+ * walked one by one, see RepairContext.openContainers.
+'''
+
+# texts from this number of characters on are indexed, when NumPy is installed
+INDEX_THRESHOLD = 1 << 18
+
+_numpy = None  # the numpy module once imported, False when it is not installed
+
+_codeQuote = 0x22
+_codeBackslash = 0x5c
+_codeComma = 0x2c
+
+
+def _importNumpy():
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            _numpy = False
+        else:
+            _numpy = numpy
+    return _numpy
+
+
+def available():
+    return bool(_importNumpy())
+
+
+class StructuralIndex:
+    '''
+     * Index of text[0:end], which must be a valid JSON prefix: it may end
+     * inside of a value or string, but has no errors in front of that.
+     *
+     *   quotes     positions of the quotes that start or end a string
+     *   positions  positions of the brackets and commas outside of strings
+     *   depths     nesting depth after each of those positions
+     *
+     * The positions are byte offsets in the UTF-8 encoding of the prefix,
+     * charOffsets converts them to character offsets.
+    '''
+
+    def __init__(self, text, end):
+        numpy = _importNumpy()
+        self.numpy = numpy
+        self.ascii = text.isascii()
+        encoded = text[0:end].encode('ascii' if self.ascii else 'utf-8', 'surrogatepass')
+        self.data = data = numpy.frombuffer(encoded, dtype=numpy.uint8)
+
+        self.quotes = self.findQuotes()
+
+        # // brackets and commas, of which the ones after an odd number of quotes are inside of a string
+        delta = numpy.zeros(256, dtype=numpy.int8)
+        delta[[ord('{'), ord('[')]] = 1
+        delta[[ord('}'), ord(']')]] = -1
+        structural = delta != 0
+        structural[_codeComma] = True
+        positions = numpy.flatnonzero(structural[data])
+        outside = (numpy.searchsorted(self.quotes, positions) & 1) == 0
+        self.positions = positions[outside]
+        self.kinds = data[self.positions]
+        self.deltas = delta[self.kinds]
+        self.depths = numpy.cumsum(self.deltas, dtype=numpy.int64)
+
+    def findQuotes(self):
+        numpy = self.numpy
+        data = self.data
+        quotes = numpy.flatnonzero(data == _codeQuote)
+        candidates = quotes[quotes > 0]
+        candidates = candidates[data[candidates - 1] == _codeBackslash]
+        if not len(candidates):
+            return quotes
+
+        # // a quote is escaped by an odd number of backslashes in front of it: find the
+        # // start of the run of backslashes that ends in front of every candidate
+        backslashes = numpy.flatnonzero(data == _codeBackslash)
+        runStart = numpy.ones(len(backslashes), dtype=bool)
+        runStart[1:] = numpy.diff(backslashes) != 1
+        starts = backslashes[runStart]
+        run = candidates - starts[numpy.searchsorted(starts, candidates - 1, side='right') - 1]
+        escaped = candidates[(run & 1) == 1]
+        return numpy.setdiff1d(quotes, escaped, assume_unique=True)
+
+    def charOffsets(self, offsets):
+        if self.ascii:
+            return offsets
+        # // every character starts with a byte that is not a continuation byte
+        continuations = self.numpy.flatnonzero((self.data & 0xc0) == 0x80)
+        return offsets - self.numpy.searchsorted(continuations, offsets)
+
+    # /**
+    #  * The containers that are open at the end of the prefix, like the token walk
+    #  * of RepairContext.openContainers: (offsets of their opening brackets,
+    #  * resume index, initial, root end), with character offsets. Returns None
+    #  * when the brackets do not nest, which a valid prefix does not have.
+    #  */
+    def openContainers(self):
+        numpy = self.numpy
+        positions = self.positions
+        depths = self.depths
+        depth = int(depths[-1]) if len(depths) else 0
+        if depth < 0 or (len(depths) and int(depths.min()) < 0):
+            return None
+
+        if depth == 0:
+            closed = numpy.flatnonzero((depths == 0) & (self.deltas < 0))
+            if not len(closed):
+                return [], None, False, None
+            rootEnd = self.charOffsets(positions[closed[-1:]] + 1)
+            return [], None, False, int(rootEnd[0])
+
+        # // the open container of each level is the last one opened at that level,
+        # // any later one would have closed it
+        opening = self.deltas > 0
+        levels = depths[opening]
+        levels, last = numpy.unique(levels[::-1], return_index=True)
+        openers = positions[opening][::-1][last[0:depth]]
+
+        innermost = openers[-1]
+        commas = numpy.flatnonzero((self.kinds == _codeComma) & (depths == depth))
+        if len(commas) and positions[commas[-1]] > innermost:
+            resume, initial = positions[commas[-1]], False
+        else:
+            resume, initial = innermost + 1, True
+        offsets = self.charOffsets(numpy.append(openers, resume)).tolist()
+        return offsets[0:-1], offsets[-1], initial, None
+
+
+def openContainers(text, failure):
+    '''
+     * The containers that are open at the end of the valid JSON prefix
+     * text[0:failure], see StructuralIndex.openContainers. None when NumPy is
+     * not installed.
+    '''
+    if not available():
+        return None
+    return StructuralIndex(text, failure).openContainers()
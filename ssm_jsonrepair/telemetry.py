@@ -0,0 +1,90 @@
+import time
+from ssm_jsonrepair.jsonrepair import RepairContext
+
+# parse functions of which the calls and the time are counted. The time of a
+# function includes the time of the functions it calls
+TIMED_FUNCTIONS = (
+    'repair', 'repairObjects', 'repairRecords', 'resumeAt', 'parseRootEnd', 'parseNewlineDelimitedJSON',
+    'parseObject', 'continueObject', 'parseArray', 'continueArray', 'continueCall',
+    'parseString', 'scanString', 'stopString', 'parseConcatenatedString', 'parseNumber', 'parseKeywords',
+    'parseUnquotedString', 'parseWhitespaceAndSkipComments', 'parseComment', 'skipEllipsis',
+)
+
+
+def _timed(name, function):
+    perfCounter = time.perf_counter
+
+    def timed(self, *args, **kwargs):
+        start = perfCounter()
+        try:
+            return function(self, *args, **kwargs)
+        finally:
+            telemetry = self.telemetry
+            telemetry.calls[name] += 1
+            telemetry.times[name] += perfCounter() - start
+
+    timed.__name__ = function.__name__
+    return timed
+
+
+class InstrumentedContext(RepairContext):
+    '''
+     * RepairContext of which the TIMED_FUNCTIONS are counted and timed. It is
+     * only used for repairs with a RepairTelemetry, so the parse functions of
+     * a plain RepairContext stay as they are.
+    '''
+    __slots__ = ('telemetry',)
+
+
+for _name in TIMED_FUNCTIONS:
+    setattr(InstrumentedContext, _name, _timed(_name, getattr(RepairContext, _name)))
+# // the values are dispatched to the timed parse functions too
+InstrumentedContext.valueParsers = {
+    char: getattr(InstrumentedContext, function.__name__) for char, function in RepairContext.valueParsers.items()
+}
+
+
+class RepairTelemetry:
+    '''
+     * Collects what the repairs of a JsonRepair engine do:
+     *
+     *   telemetry = RepairTelemetry()
+     *   JsonRepair(telemetry=telemetry).jsonrepair(text)
+     *   telemetry.lastRepairs   # [(kind, offset in the input), ...] of the last document
+     *   telemetry.repairCounts  # {kind: count} of all documents
+     *   telemetry.calls, telemetry.times  # calls and seconds per parse function,
+     *                                     # 'repair', 'repairObjects' and 'repairRecords'
+     *                                     # are the whole documents
+     *
+     * The kinds are the REPAIR_* constants of ssm_jsonrepair.jsonrepair.
+     * callback, when given, is called with the kind and the offset of every
+     * repair as it is applied. An engine without telemetry does not pay for it.
+     * The counters are not guarded by a lock: use a telemetry per thread.
+    '''
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.reset()
+
+    def reset(self):
+        self.documents = 0
+        self.characters = 0
+        self.lastRepairs = []
+        self.repairCounts = {}
+        self.calls = dict.fromkeys(TIMED_FUNCTIONS, 0)
+        self.times = dict.fromkeys(TIMED_FUNCTIONS, 0.0)
+
+    def context(self, text, output):
+        context = InstrumentedContext(text, output)
+        context.telemetry = self
+        context.onRepair = self.recordRepair
+        self.documents += 1
+        self.characters += len(text)
+        self.lastRepairs = []
+        return context
+
+    def recordRepair(self, kind, offset):
+        self.lastRepairs.append((kind, offset))
+        self.repairCounts[kind] = self.repairCounts.get(kind, 0) + 1
+        if self.callback is not None:
+            self.callback(kind, offset)
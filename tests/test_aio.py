@@ -0,0 +1,33 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from ssm_jsonrepair import JSONRepairError, arepair, arepair_iter, repair
+
+DOCUMENTS = ["{'a': 1}", '[1, 2', '{"b": }}} x', '"abc" + "def"', '[' + '1 ' * 5000 + ']']
+
+
+async def _collect(results):
+    return [result async for result in results]
+
+
+def test_arepair_repairs_short_documents_inline_and_long_documents_in_the_executor():
+    async def main():
+        with ThreadPoolExecutor(1) as executor:
+            return [await arepair(text, executor, inline_threshold=100) for text in (DOCUMENTS[0], DOCUMENTS[4])]
+
+    assert asyncio.run(main()) == [repair(DOCUMENTS[0]), repair(DOCUMENTS[4])]
+    assert asyncio.run(arepair('[1, 2', loads=True)) == [1, 2]
+
+
+def test_arepair_iter_yields_the_results_and_errors_of_the_documents():
+    async def source():
+        for text in DOCUMENTS:
+            yield text
+
+    results = asyncio.run(_collect(arepair_iter(source(), concurrency=2, inline_threshold=100)))
+    assert isinstance(results[2], JSONRepairError)
+    assert results[0:2] + results[3:] == [repair(text) for text in DOCUMENTS if text != DOCUMENTS[2]]
+
+    unordered = asyncio.run(_collect(arepair_iter(DOCUMENTS, ordered=False, loads=True, inline_threshold=100)))
+    assert sorted(index for index, result in unordered) == list(range(len(DOCUMENTS)))
+    assert dict(unordered)[1] == [1, 2]
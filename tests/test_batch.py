@@ -0,0 +1,22 @@
+import pytest
+
+from ssm_jsonrepair import JSONRepairError, repair, repair_many
+
+DOCUMENTS = ["{'a': %d}" % number if number % 7 else '{"b": }}} x' for number in range(60)]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_repair_many_yields_the_results_and_errors_in_order(workers):
+    results = list(repair_many(iter(DOCUMENTS), workers=workers, chunksize=8, inline_threshold=0))
+    assert len(results) == len(DOCUMENTS)
+    for text, result in zip(DOCUMENTS, results):
+        if text.startswith('{"b"'):
+            assert isinstance(result, JSONRepairError)
+        else:
+            assert result == repair(text)
+
+
+def test_repair_many_yields_the_index_of_every_result_when_unordered():
+    results = list(repair_many(DOCUMENTS, workers=2, chunksize=8, ordered=False, loads=True, inline_threshold=0))
+    assert sorted(index for index, result in results) == list(range(len(DOCUMENTS)))
+    assert dict(results)[1] == {'a': 1}
@@ -0,0 +1,30 @@
+import pytest
+
+from ssm_jsonrepair import JSONRepairError, RepairCache
+
+
+def test_cache_returns_the_repair_and_counts_hits():
+    cache = RepairCache()
+    assert cache.jsonrepair("{'a': 1}") == '{"a": 1}'
+    assert cache.jsonrepair("{'a': 1}") == '{"a": 1}'
+    assert cache.jsonrepair(b"{'a': 1}") == '{"a": 1}'
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_cache_raises_the_error_again():
+    cache = RepairCache()
+    for _ in range(2):
+        with pytest.raises(JSONRepairError):
+            cache.jsonrepair('[1, 2] x')
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_counts_the_inputs_in_its_size():
+    cache = RepairCache(maxSize=25)
+    valid = '[1, 2, 3]'
+    assert cache.jsonrepair(valid) is valid
+    assert cache.size == len(valid)
+    cache.jsonrepair('[1, 2')
+    assert cache.size == len(valid) + len('[1, 2') + len('[1, 2]')
+    cache.jsonrepair('[3, 4')
+    assert cache.evictions == 1 and len(cache) == 2
@@ -0,0 +1,40 @@
+import pytest
+
+from ssm_jsonrepair import JsonRepair, RepairTelemetry, diagnose
+
+
+def test_diagnose_counts_all_repairs():
+    diagnosis = diagnose("[1, 2, {'a': 3},]")
+    assert diagnosis.repairs == {'quotes': 1, 'trailing comma': 1}
+    assert diagnosis.repairable is True
+    assert diagnosis.complete
+
+
+def test_diagnose_stops_at_the_first_repair():
+    text = '[' + ', '.join(["{'a': 1}"] * 1000) + ']'
+    diagnosis = diagnose(text, stop_at_first=True)
+    assert not diagnosis.valid
+    assert diagnosis.offset == 2
+    assert diagnosis.repairs == {'quotes': 1}
+    assert diagnosis.repairable is None
+    assert not diagnosis.complete
+
+
+def test_diagnose_of_a_valid_document_stopping_at_the_first_repair():
+    diagnosis = diagnose('{"a": [1, 2]}', stop_at_first=True)
+    assert diagnosis.valid and diagnosis.repairable and diagnosis.complete
+
+
+@pytest.mark.parametrize('text', [
+    "[{'a': 1 'b': [True, None] \"c\": {\"d\": \"e\" + \"f\"}}\n{'a': 2}]",
+    '{"a": [1 2 {"b": [3 \'c\']}], "d": {"e": False',
+    '[{"k": [{"k": [[1',
+    "{'a': 'b', 'c': 'd' // e\n, 'f': [1, 2,]}",
+    "{'a': 'b'\n,[1]",
+])
+def test_diagnose_counts_the_repairs_of_a_repair(text):
+    telemetry = RepairTelemetry()
+    JsonRepair(telemetry=telemetry).jsonrepair(text)
+    diagnosis = diagnose(text)
+    assert diagnosis.repairs == telemetry.repairCounts
+    assert diagnosis.offset == min(offset for kind, offset in telemetry.lastRepairs)
@@ -0,0 +1,34 @@
+import pytest
+
+from benchmarks import corpora
+from ssm_jsonrepair import apply_edits, iter_apply_edits, repair, repair_edits
+
+DOCUMENTS = [
+    "{'a': [1, 2 3], b: True, /* c */ 'd': None,}",
+    '{"name": “Jörg”, "city": \'Zürich\', "note": "日本" + "語"}',
+    '[1, "two", {"three": 3} // four\n',
+    'callback({"a": [NaN, -Infinity]});',
+    '{"a": ObjectId("42"), "b": "x\u00e9"}',
+    '"abc',
+]
+
+
+@pytest.mark.parametrize('text', DOCUMENTS + [corpora.generate('comments', 4096)])
+def test_the_edits_of_a_text_give_its_repair(text):
+    edits = repair_edits(text)
+    assert apply_edits(text, edits) == repair(text)
+    assert ''.join(iter_apply_edits(text, edits)) == repair(text)
+    assert all(end <= start for (start, *_), (end, *_) in zip(edits[1:], edits))
+
+
+@pytest.mark.parametrize('text', DOCUMENTS)
+def test_the_edits_of_bytes_count_bytes(text):
+    data = b'\xef\xbb\xbf' + text.encode()
+    edits = repair_edits(data)
+    assert apply_edits(data, edits) == repair(text).encode()
+    assert all(isinstance(inserted, bytes) for offset, deleted, inserted in edits)
+
+
+def test_valid_json_has_no_edits():
+    assert repair_edits('{"a": [1, 2, "é"]}') == []
+    assert repair_edits(b'{"a": [1, 2, "\xc3\xa9"]}') == []
@@ -0,0 +1,79 @@
+import io
+import json
+
+import pytest
+
+from ssm_jsonrepair import (JsonRepair, JSONRepairError, JSONRepairLimitError, RepairLimits, RepairTelemetry, repair,
+                            repair_file)
+
+
+def test_repair_file_of_ndjson_over_several_windows(tmp_path):
+    text = ''.join(json.dumps({'id': index, 'tags': ['a', 'b']}) + '\n' for index in range(500))
+    path = tmp_path / 'records.ndjson'
+    path.write_text(text)
+
+    output = io.StringIO()
+    repair_file(path, output, chunk_size=1024)
+    assert output.getvalue() == repair(text)
+    assert repair_file(path, chunk_size=1024) == repair(text)
+
+
+def test_repair_file_of_a_document_over_several_windows(tmp_path):
+    text = json.dumps([{'id': index, 'text': 'x' * index} for index in range(500)])[:-100]
+    path = tmp_path / 'document.json'
+    path.write_text(text)
+
+    output = tmp_path / 'repaired.json'
+    repair_file(path, output, chunk_size=1024)
+    assert output.read_text() == repair(text)
+
+
+def test_repair_file_of_ndjson_with_a_first_record_over_several_windows(tmp_path):
+    text = ''.join(json.dumps(list(range(2000))) + '\n' for _ in range(20))
+    path = tmp_path / 'records.ndjson'
+    path.write_text(text)
+
+    output = io.StringIO()
+    repair_file(path, output, chunk_size=1024)
+    assert output.getvalue() == repair(text)
+    target = tmp_path / 'repaired.json'
+    repair_file(path, target, chunk_size=1024)
+    assert target.read_text() == repair(text)
+    assert sorted(file.name for file in tmp_path.iterdir()) == ['records.ndjson', 'repaired.json']
+
+
+def test_repair_file_that_fails_leaves_the_output_as_it_was(tmp_path):
+    path = tmp_path / 'document.json'
+    path.write_text(json.dumps([{'id': index} for index in range(500)]) + ' x')
+    target = tmp_path / 'repaired.json'
+    target.write_text('[]')
+
+    with pytest.raises(JSONRepairError):
+        repair_file(path, target, chunk_size=1024)
+    assert target.read_text() == '[]'
+    assert sorted(file.name for file in tmp_path.iterdir()) == ['document.json', 'repaired.json']
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 1024])
+def test_repair_file_reports_every_repair_once(tmp_path, chunk_size):
+    text = '{"a": [1, 2 3], "b": "line\nbreak", \'c\': "d, "e": tru'
+    path = tmp_path / 'document.json'
+    path.write_text(text)
+
+    expected = RepairTelemetry()
+    JsonRepair(telemetry=expected).jsonrepair(text)
+    telemetry = RepairTelemetry()
+    assert repair_file(path, chunk_size=chunk_size, engine=JsonRepair(telemetry=telemetry)) == repair(text)
+    assert sorted(telemetry.lastRepairs) == sorted(expected.lastRepairs)
+
+
+def test_repair_file_applies_the_limits_of_the_engine(tmp_path):
+    path = tmp_path / 'document.json'
+    path.write_text('[' + '[' * 100)
+
+    with pytest.raises(JSONRepairLimitError) as info:
+        repair_file(path, chunk_size=16, engine=JsonRepair(limits=RepairLimits(maxDepth=50)))
+    assert info.value.limit == 'maxDepth'
+    with pytest.raises(JSONRepairLimitError) as info:
+        repair_file(path, engine=JsonRepair(limits=RepairLimits(maxLength=100)))
+    assert info.value.limit == 'maxLength'
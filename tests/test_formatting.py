@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+from benchmarks import corpora
+from ssm_jsonrepair import JsonRepair, repair
+
+DOCUMENTS = [
+    "{'a': [1, 2 3], b: True, /* c */ 'd': None,}",
+    '{\n  "a": "b" + "c",\n  "d": {"e": [], "f": {}}\n}',
+    '[1, "two", {"three": 3} // four\n',
+    'callback({"a": [NaN, -Infinity]});',
+    '{"a":"b \\" c"  ,  "d" : [ true , false ] }',
+]
+
+
+@pytest.mark.parametrize('text', DOCUMENTS + [corpora.generate('missing-commas', 4096)])
+def test_compact_output_is_dumped_json(text):
+    compact = JsonRepair(separators=(',', ':')).jsonrepair(text)
+    assert compact == json.dumps(json.loads(repair(text)), separators=(',', ':'), ensure_ascii=False)
+
+
+@pytest.mark.parametrize('indent', [2, '\t'])
+@pytest.mark.parametrize('text', DOCUMENTS)
+def test_indented_output_is_dumped_json(text, indent):
+    indented = JsonRepair(indent=indent).jsonrepair(text)
+    assert indented == json.dumps(json.loads(repair(text)), indent=indent, ensure_ascii=False)
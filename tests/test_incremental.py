@@ -0,0 +1,39 @@
+from ssm_jsonrepair import IncrementalJsonRepair, repair
+from ssm_jsonrepair import jsonrepair
+
+
+class CountingPattern:
+    '''
+     * Compiled pattern that counts the characters its matches consume
+    '''
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.characters = 0
+
+    def match(self, text, position):
+        match = self.pattern.match(text, position)
+        if match is not None:
+            self.characters += match.end() - position
+        return match
+
+
+def test_snapshots_of_a_string_match_repair():
+    text = '{"a": [1, "b\\u00e9 \\"c\\" d\\nxx", \'e\', "f, g'
+    repairer = IncrementalJsonRepair()
+    for end in range(1, len(text) + 1):
+        repairer.feed(text[end - 1])
+        assert repairer.snapshot() == repair(text[0:end])
+
+
+def test_snapshots_of_a_streamed_string_scan_every_character_once(monkeypatch):
+    # // a snapshot continues the scan of the open string instead of scanning it again
+    run = CountingPattern(jsonrepair.regexStringRun)
+    monkeypatch.setattr(jsonrepair, 'regexStringRun', run)
+    chunk = 'lorem \\"ipsum\\" \\u00e9 dolor, sit '
+    repairer = IncrementalJsonRepair()
+    repairer.feed('{"text": "')
+    for _ in range(1000):
+        repairer.feed(chunk)
+        repairer.snapshot()
+    assert run.characters <= 1000 * len(chunk)
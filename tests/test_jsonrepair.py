@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from ssm_jsonrepair import JsonRepair, JSONRepairError, jsonrepair, repair, repair_loads
+
+
+@pytest.mark.parametrize('function', [repair, repair_loads])
+def test_repair_errors_are_not_chained_to_the_validation(function):
+    with pytest.raises(JSONRepairError) as info:
+        function('[1, 2] x')
+    assert info.value.__context__ is None
+    assert info.value.args == ('Unexpected character "x"', 7)
+
+
+def test_valid_json_is_returned_untouched():
+    text = '{"a": [1, 2.5, "\\u00e9"],\n "b": null}'
+    engine = JsonRepair()
+    assert engine.jsonrepair(text) is text
+    assert engine.lastPath == 'valid'
+
+
+@pytest.mark.parametrize('text', ['[1, NaN]', '{"a": Infinity}'])
+def test_constants_of_the_json_module_are_repaired(text):
+    engine = JsonRepair()
+    assert engine.jsonrepair(text) == JsonRepair(validateFirst=False).jsonrepair(text)
+    assert engine.lastPath != 'valid'
+
+
+@pytest.mark.parametrize('text', [
+    '[{"a": 1}, {"b": [2, 3]}, {"c": \'d\'}]',
+    '{"a": {"b": [1, 2, 3', '{"a": 1} // done',
+])
+def test_repair_resumes_at_the_first_failure(text):
+    engine = JsonRepair()
+    repaired = engine.jsonrepair(text)
+    assert engine.lastPath == 'resumed'
+    assert repaired == JsonRepair(validateFirst=False).jsonrepair(text)
+    # // the valid prefix in front of the failure is copied as it is
+    with pytest.raises(json.JSONDecodeError) as info:
+        json.loads(text)
+    prefix = text[0:text.rfind(',', 0, info.value.pos) + 1] or text[0:info.value.pos].rstrip()
+    assert repaired.startswith(prefix)
+
+
+def test_whitespace_strings_symbols_and_comments_are_scanned_in_runs(monkeypatch):
+    calls = []
+    charCodeAt = jsonrepair.charCodeAt
+    monkeypatch.setattr(jsonrepair, 'charCodeAt', lambda text, i: calls.append(i) or charCodeAt(text, i))
+    size = 10000
+    text = '[' + ' ' * size + '"' + 'a b' * size + '", ' + 'abc ' * size + ', /* ' + 'c' * size + ' */ 1, "d\n]'
+    assert repair(text) == ('[' + ' ' * size + '"' + 'a b' * size + '", "' + ('abc ' * size).rstrip() + '" ,  1, "d"\n]')
+    # // a few characters per token, not one call per character
+    assert len(calls) < 100
+
+
+def test_deep_nesting_is_parsed_without_recursion():
+    depth = 20000
+    assert repair('[' * depth) == '[' * depth + ']' * depth
+    # // valid, but nested too deep for the validator of the json module
+    text = '{"a": ' * depth + '1' + '}' * depth
+    assert repair(text) == text
+    assert repair('NumberLong(' * 1000 + '2' + ')' * 1000) == '2'
+
+    value = repair_loads('[{"a": ' * depth)
+    for _ in range(depth):
+        value = value[0]['a']
+    assert value is None
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('"a"', '"a"'), ("'a'", '"a"'), ('“a”', '"a"'), ('`a´', '"a"'),
+    ('-1', '-1'), ('2e3', '2e3'), ('1.', '1.0'), ('-', '-0'), ('0012', '"0012"'), ('-.5', '"-.5"'),
+    ('e', '"e"'), ('E5', '"E5"'), ('eel', '"eel"'),
+    ('true', 'true'), ('True', 'true'), ('None', 'null'), ('tru', '"tru"'), ('nul', '"nul"'),
+    ('abc', '"abc"'), ('été', '"\\u00e9t\\u00e9"'), ('NumberLong(2)', '2'), ('callback({"a": 1})', '{"a": 1}'),
+    ('[1]', '[1]'), ('{}', '{}'), ('/* c */ 1', ' 1'),
+])
+def test_the_first_character_of_a_value_selects_its_parser(text, expected):
+    # // like trying the parse functions one by one, as the original jsonrepair does
+    assert JsonRepair(validateFirst=False).jsonrepair(text) == expected
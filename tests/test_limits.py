@@ -0,0 +1,35 @@
+import pytest
+
+from ssm_jsonrepair import JsonRepair, JSONRepairLimitError, RepairLimits, repair
+
+# // inputs that begin few values, but take long to scan
+PATHOLOGICAL = {
+    'string of newlines': '"' + '\n' * 100000,
+    'string of stray quotes': '["a' + ' "b' * 20000 + ']',
+    'run of comments': '[1' + ' /* note */' * 20000 + ']',
+    'run of whitespace and redundant brackets': '[1]' + ' \n]' * 20000,
+}
+
+
+@pytest.mark.parametrize('text', PATHOLOGICAL.values(), ids=PATHOLOGICAL.keys())
+def test_a_long_scan_exceeds_the_timeout(text):
+    engine = JsonRepair(limits=RepairLimits(timeout=0))
+    with pytest.raises(JSONRepairLimitError) as info:
+        engine.jsonrepair(text)
+    assert info.value.limit == 'timeout'
+    assert 0 < info.value.args[1] < len(text)
+
+
+@pytest.mark.parametrize('text', PATHOLOGICAL.values(), ids=PATHOLOGICAL.keys())
+def test_a_long_scan_exceeds_the_steps(text):
+    engine = JsonRepair(limits=RepairLimits(maxSteps=1000))
+    with pytest.raises(JSONRepairLimitError) as info:
+        engine.jsonrepair(text)
+    assert info.value.limit == 'maxSteps'
+    assert 0 < info.value.args[1] < len(text)
+
+
+@pytest.mark.parametrize('text', PATHOLOGICAL.values(), ids=PATHOLOGICAL.keys())
+def test_a_long_scan_within_the_limits(text):
+    engine = JsonRepair(limits=RepairLimits(maxSteps=10 ** 6, timeout=60))
+    assert engine.jsonrepair(text) == repair(text)
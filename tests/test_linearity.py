@@ -0,0 +1,20 @@
+import pytest
+
+from benchmarks import linearity
+from ssm_jsonrepair import JsonRepair, RepairTelemetry
+
+
+@pytest.mark.parametrize('case', linearity.CASES)
+def test_adversarial_strings_take_a_number_of_parse_calls_linear_in_their_size(case):
+    calls = []
+    for size in (4000, 16000):
+        telemetry = RepairTelemetry()
+        JsonRepair(validateFirst=False, telemetry=telemetry).jsonrepair(linearity.CASES[case](size))
+        calls.append(sum(telemetry.calls.values()))
+    assert calls[1] <= 4.5 * calls[0]
+
+
+def test_adversarial_strings_take_a_time_linear_in_their_size():
+    # // a quadratic repair has a growth of 2, see benchmarks.linearity
+    growths = linearity.run(linearity.CASES, [16 * 1024, 128 * 1024], minTime=0.02, report=lambda line: None)
+    assert max(growths.values()) < 1.5
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from ssm_jsonrepair import JsonRepair, repair, repair_loads
+
+DOCUMENTS = [
+    "{'price': 1.10, tags: ['a', 'b',]}",
+    '[1, 2, {"a": [3, 4',
+    '{"a": {"b": [1, {"c": null}]}, "d": "e",',
+    '[1, 2], // done',
+    # // the end quote of a string followed by a + goes in front of its whitespace
+    '“*/...NumberLongb1 “+',
+    # // a stripped comma leaves the newline in front of it at the end: newline delimited JSON
+    '{"a": {"k1": [-2500.0,\n   "",\n ,  {\n    "b": true\n   }\n  ]\n }\n}',
+    # // plain members of broken objects and arrays, and valid ones after the first error
+    "[{'a': 'b', \"c\": None, 'd': [1, 2.5e3 True]} {\"e\": \"f\" + \"g\",\n 'h': {\"i\": [null]}}\n]",
+    '[/* c */ {"a": [1, {"b": "\\u00e9"}]}, {"c": NaN, "d": Infinity} {"e": -0}',
+    '{"a": 1}\n{"b": [2, \'c\']}\n',
+]
+
+
+@pytest.mark.parametrize('validateFirst', [True, False])
+@pytest.mark.parametrize('text', DOCUMENTS)
+def test_loads_matches_json_loads_of_repair(text, validateFirst):
+    engine = JsonRepair(validateFirst=validateFirst)
+    assert engine.loads(text) == json.loads(engine.jsonrepair(text))
+
+
+def test_loads_resumes_at_the_first_failure():
+    text = json.dumps([{'id': index, 'tags': ['a', {'b': None}]} for index in range(1000)])[:-40]
+    engine = JsonRepair()
+    assert engine.loads(text) == json.loads(repair(text))
+    assert engine.lastPath == 'resumed'
+
+
+def test_loads_applies_the_hooks_to_the_valid_prefix():
+    text = '[{"a": 1.5}, {"b": [2, {"c": 3}'
+    value = repair_loads(text, object_hook=lambda obj: ('hook', obj), parse_float=str, parse_int=lambda digits: -1)
+    assert value == [('hook', {'a': '1.5'}), ('hook', {'b': [-1, ('hook', {'c': -1})]})]
+
+
+def test_loads_applies_the_hooks_and_shares_the_keys_of_scanned_objects():
+    text = "[{'id': 1.5} /* c */, {\"id\": 2, \"n\": {\"id\": 3}}, {'id': 4, 'n': {\"id\": 5}},"
+    value = repair_loads(text, object_hook=dict, parse_float=str)
+    assert value == json.loads(repair(text), parse_float=str)
+    keys = [next(iter(obj)) for obj in (value[0], value[1], value[1]['n'], value[2], value[2]['n'])]
+    assert all(key is keys[0] for key in keys)
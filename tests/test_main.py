@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from ssm_jsonrepair import __main__
+from ssm_jsonrepair.__main__ import _repairPath, main
+
+
+@pytest.mark.skipif(not os.path.isdir('/proc/self/fd'), reason='counts the open file descriptors in /proc')
+def test_repair_path_of_a_missing_file_closes_the_temporary_file(tmp_path):
+    descriptors = len(os.listdir('/proc/self/fd'))
+    task = (str(tmp_path / 'missing.json'), str(tmp_path / 'out' / 'missing.json'), False, False, None, None)
+    path, size, repairs, messages, complete = _repairPath(task)
+    assert not complete and messages
+    assert len(os.listdir('/proc/self/fd')) == descriptors
+    assert os.listdir(tmp_path / 'out') == []
+
+
+def test_inputs_with_the_same_target_are_rejected(tmp_path, capsys):
+    for directory in ('x', 'y'):
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / 'a.json').write_text('[1, 2')
+    output = tmp_path / 'out'
+    with pytest.raises(SystemExit):
+        main([str(tmp_path / 'x' / 'a.json'), str(tmp_path / 'y' / '*.json'), '-o', str(output)])
+    assert 'would both be written to' in capsys.readouterr().err
+    assert not output.exists()
+
+
+def test_a_file_given_twice_is_repaired_once(tmp_path, capsys):
+    (tmp_path / 'a.json').write_text('[1, 2')
+    assert main([str(tmp_path / 'a.json'), str(tmp_path / '*.json'), '-o', str(tmp_path / 'out'), '-j', '1']) == 0
+    assert (tmp_path / 'out' / 'a.json').read_text() == '[1, 2]'
+    assert capsys.readouterr().err.startswith('1 files')
+
+
+def test_large_files_are_repaired_by_repair_file(tmp_path, monkeypatch, capsys):
+    text = "{'a': [1, 2 3], 'b': 'c"
+    path = tmp_path / 'a.json'
+    path.write_text(text)
+    assert main([str(path), '-o', str(tmp_path / 'whole'), '-j', '1']) == 0
+    summary = capsys.readouterr().err
+    monkeypatch.setattr(__main__, 'STREAM_SIZE', 0)
+    assert main([str(path), '-o', str(tmp_path / 'streamed'), '-j', '1']) == 0
+    assert (tmp_path / 'streamed' / 'a.json').read_text() == (tmp_path / 'whole' / 'a.json').read_text()
+    assert capsys.readouterr().err.split(' errors')[0] == summary.split(' errors')[0]
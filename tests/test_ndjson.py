@@ -0,0 +1,23 @@
+import io
+import json
+
+from ssm_jsonrepair import iter_repair_ndjson, repair_ndjson
+
+
+def test_skipped_records_have_their_offset_without_positions():
+    skipped = []
+    records = list(iter_repair_ndjson(io.StringIO('{"a":1}\n{"b": }}} x\n'), skipped=skipped))
+    assert records == ['{"a":1}']
+    assert [(offset, line) for offset, line, error in skipped] == [(8, 2)]
+
+
+def test_the_records_after_a_record_that_cannot_be_repaired_are_repaired():
+    text = '{"a": 1}\n{"b": "x\\u12"}\n{c: 4}\n[2, 3\n'
+    result, skipped = repair_ndjson(text)
+    assert json.loads(result) == [{'a': 1}, {'c': 4}, [2, 3]]
+    assert [text[start:end] for start, end, error in skipped] == ['{"b": "x\\u12"}\n']
+    assert skipped[0][2].args[1] == 17
+
+    values, skipped = repair_ndjson(text.encode(), loads=True)
+    assert values == [{'a': 1}, {'c': 4}, [2, 3]]
+    assert [(start, end) for start, end, error in skipped] == [(9, 24)]
@@ -0,0 +1,83 @@
+import random
+import re
+
+import pytest
+
+from ssm_jsonrepair.outputbuffer import OutputBuffer, _blockSize
+
+
+class StringOutput:
+    '''
+     * The edits of an OutputBuffer on a plain string, like the string
+     * functions of the original jsonrepair
+    '''
+
+    def __init__(self):
+        self.text = ''
+
+    def append(self, text):
+        self.text += text
+
+    def prepend(self, text):
+        self.text = text + self.text
+
+    def insertBeforeLastWhitespace(self, textToInsert):
+        index = len(self.text.rstrip(' \t\n\r'))
+        self.text = self.text[0:index] + textToInsert + self.text[index:]
+
+    def stripLastOccurrence(self, textToStrip, stripRemainingText=False):
+        index = self.text.rfind(textToStrip)
+        if index != -1:
+            self.text = self.text[0:index] + ('' if stripRemainingText else self.text[index + len(textToStrip):])
+
+    def removeAt(self, start, count):
+        self.text = self.text[0:start] + self.text[start + count:]
+
+    def truncate(self, length):
+        self.text = self.text[0:length]
+
+    def trailingWhitespace(self):
+        return self.text[len(self.text.rstrip(' \t\n\r')):]
+
+    def endsWithCommaOrNewline(self):
+        return re.search('[,\n][ \t\r]*$', self.text) is not None
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_edits_match_the_string_edits(seed):
+    rnd = random.Random(seed)
+    tokens = ['{', '}', '[', ']', ',', ':', ' ', '\n', '  \n ', '"a b"', '12', 'null', '"', ', ']
+    output = OutputBuffer()
+    expected = StringOutput()
+    # // enough appends to join the chunks into blocks
+    for _ in range(6 * _blockSize):
+        operation = rnd.random()
+        if operation < 0.8:
+            arguments = ('append', rnd.choice(tokens))
+        elif operation < 0.88:
+            arguments = ('insertBeforeLastWhitespace', rnd.choice([',', '}', '"']))
+        elif operation < 0.94:
+            arguments = ('stripLastOccurrence', rnd.choice([',', '"']), rnd.random() < 0.2)
+        elif operation < 0.97 and len(expected.text) > 8:
+            start = rnd.randrange(len(expected.text) - 8, len(expected.text))
+            arguments = ('removeAt', start, rnd.randint(0, len(expected.text) - start))
+        elif len(expected.text) > 4:
+            arguments = ('truncate', len(expected.text) - rnd.randint(0, 4))
+        else:
+            arguments = ('prepend', '[')
+        getattr(output, arguments[0])(*arguments[1:])
+        getattr(expected, arguments[0])(*arguments[1:])
+        assert len(output) == len(expected.text)
+        assert output.endsWithCommaOrNewline() == expected.endsWithCommaOrNewline()
+        assert output.trailingWhitespace() == expected.trailingWhitespace()
+    assert output.getvalue() == expected.text
+    assert len(output.chunks) < 3 * _blockSize
+
+
+def test_valid_text_is_appended_up_to_its_end():
+    output = OutputBuffer.fromChunks(['[1, ', '2, '], 7)
+    output.appendValid('{"a": 1} // b', (), 8)
+    output.insertBeforeLastWhitespace(']')
+    output.prepend('\n')
+    assert output.getvalue() == '\n[1, 2, {"a": 1}]'
+    assert len(output) == 17
@@ -0,0 +1,26 @@
+import pytest
+
+from benchmarks import corpora
+from ssm_jsonrepair import repair, repair_parallel
+from ssm_jsonrepair.parallel import _slices
+
+
+@pytest.mark.parametrize('category', ['missing-commas', 'comments', 'truncated', 'single-quoted'])
+def test_corpora_are_split(category):
+    text = corpora.generate(category, 1 << 16)
+    split = _slices(text, 4096)
+    assert split is not None and len(split[1]) >= 10
+    assert repair_parallel(text, workers=2, chunksize=4096, inline_threshold=0) == repair(text)
+
+
+def test_split_after_a_string_without_a_comma():
+    text = '[' + ' '.join(['"item"'] * 100) + ']'
+    assert _slices(text, 50)[1]
+    assert repair_parallel(text, workers=2, chunksize=50, inline_threshold=0) == repair(text)
+
+
+@pytest.mark.parametrize('chunksize', [1, 3, 5])
+@pytest.mark.parametrize('element', ['// note\n', '/* note */', ' /* a */ // b\n'])
+def test_an_element_of_only_comments_is_empty(element, chunksize):
+    text = '[1, ' + element + ', 2, 3]'
+    assert repair_parallel(text, workers=2, chunksize=chunksize, inline_threshold=0) == repair(text)
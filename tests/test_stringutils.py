@@ -0,0 +1,32 @@
+import pytest
+
+from ssm_jsonrepair.stringutils import (isControlCharacter, isDelimiter, isDigit, isDoubleQuoteLike, isHex, isQuote,
+                                        isSingleQuoteLike, isStartOfValue, isWhitespace, regexStartOfValue)
+
+_quotes = '"“”\'‘’`´'
+
+
+@pytest.mark.parametrize('start', range(0, 0x3100, 0x100))
+def test_the_character_classes_match_the_character_tests(start):
+    # // the tests of the original jsonrepair, of which the classes are a table
+    for char in map(chr, range(start, start + 0x100)):
+        code = ord(char)
+        assert bool(isDelimiter(char)) == (char in ',:[]/{}()\n+')
+        assert bool(isWhitespace(code)) == (char in ' \n\t\r')
+        assert bool(isQuote(code)) == (char in _quotes)
+        assert bool(isDoubleQuoteLike(code)) == (char in '"“”')
+        assert bool(isSingleQuoteLike(code)) == (char in '\'‘’`´')
+        assert bool(isDigit(code)) == (char in '0123456789')
+        assert bool(isHex(code)) == (char in '0123456789abcdefABCDEF')
+        assert bool(isControlCharacter(code)) == (char in '\b\f\n\r\t')
+        assert bool(isStartOfValue(char)) == (regexStartOfValue.match(char) is not None or char in _quotes)
+
+
+def test_the_end_of_the_text_has_no_character_class():
+    # // charAt and charCodeAt return None at the end of the text
+    assert not isDelimiter(None)
+    assert not isStartOfValue(None)
+    assert not isWhitespace(None)
+    assert not isQuote(None)
+    assert not isDigit(None)
+    assert not isHex(None)
@@ -0,0 +1,25 @@
+import pytest
+
+from benchmarks import corpora
+from ssm_jsonrepair import JsonRepair, RepairContext, structuralindex
+
+pytest.importorskip('numpy')
+
+DOCUMENT = '{"a": [1, {"b": "c]\\\\", "d": "e\\"}"}, [], "ü{"], "f": {"g": [[2], "日本"]}} '
+
+
+@pytest.mark.parametrize('failure', range(len(DOCUMENT) + 1))
+def test_the_index_finds_the_containers_of_the_token_walk(failure):
+    expected = RepairContext(DOCUMENT, None).openContainers(failure)
+    assert structuralindex.openContainers(DOCUMENT, failure) == expected
+
+
+@pytest.mark.parametrize('category', ['truncated', 'missing-commas', 'comments'])
+def test_the_repair_resumed_from_the_index_is_the_repair_of_the_token_walk(category, monkeypatch):
+    text = corpora.generate(category, 1 << 16)
+    expected = JsonRepair(validateFirst=False).jsonrepair(text)
+    engine = JsonRepair()
+    monkeypatch.setattr(structuralindex, 'INDEX_THRESHOLD', 0)
+    assert engine.jsonrepair(text) == expected
+    monkeypatch.setattr(structuralindex, 'INDEX_THRESHOLD', len(text) + 1)
+    assert engine.jsonrepair(text) == expected
@@ -0,0 +1,43 @@
+from ssm_jsonrepair import JsonRepair, RepairContext, RepairTelemetry
+
+
+def test_telemetry_reports_the_repairs_of_every_document():
+    reported = []
+    telemetry = RepairTelemetry(callback=lambda kind, offset: reported.append((kind, offset)))
+    engine = JsonRepair(telemetry=telemetry)
+
+    assert engine.jsonrepair("{'a': [1, 2 3], b: True,}") == '{"a": [1, 2, 3], "b": true}'
+    repairs = [('quotes', 1), ('missing comma', 12), ('unquoted string', 16), ('python constant', 19),
+               ('trailing comma', 24)]
+    assert telemetry.lastRepairs == repairs
+    assert reported == repairs
+
+    assert engine.jsonrepair('[1]') == '[1]'
+    assert telemetry.lastRepairs == []
+    assert engine.loads('[1, 2') == [1, 2]
+    assert telemetry.lastRepairs == [('missing end bracket', 5)]
+    assert telemetry.repairCounts == {'quotes': 1, 'missing comma': 1, 'unquoted string': 1, 'python constant': 1,
+                                      'trailing comma': 1, 'missing end bracket': 1}
+    assert (telemetry.documents, telemetry.characters) == (3, 33)
+
+
+def test_telemetry_times_the_parse_functions():
+    telemetry = RepairTelemetry()
+    engine = JsonRepair(telemetry=telemetry)
+    engine.jsonrepair('{"a": "b" "c": [1, 2]}')
+    engine.loads('["a", "b"')
+
+    assert telemetry.calls['repair'] == 1
+    assert telemetry.calls['repairObjects'] == 1
+    assert telemetry.calls['parseString'] >= 3
+    assert telemetry.times['repair'] >= telemetry.times['parseString'] > 0
+
+    telemetry.reset()
+    assert telemetry.documents == 0
+    assert not any(telemetry.calls.values())
+
+
+def test_an_engine_without_telemetry_uses_a_plain_context():
+    context = JsonRepair().context('[1]', None)
+    assert type(context) is RepairContext
+    assert context.onRepair is None
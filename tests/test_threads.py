@@ -0,0 +1,24 @@
+import threading
+
+from ssm_jsonrepair import JsonRepair
+
+
+def test_path_statistics_of_a_shared_engine():
+    engine = JsonRepair()
+    calls = 2000
+    paths = {}
+
+    def work(text):
+        for _ in range(calls):
+            engine.jsonrepair(text)
+        paths[text] = engine.lastPath
+
+    threads = [threading.Thread(target=work, args=(text,)) for text in ('[1, 2]', "'a'", '[1, 2')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert engine.pathCounts == {'valid': calls, 'resumed': calls, 'repaired': calls}
+    assert paths == {'[1, 2]': 'valid', "'a'": 'repaired', '[1, 2': 'resumed'}
+    assert engine.lastPath is None